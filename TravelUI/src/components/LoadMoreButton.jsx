@@ -0,0 +1,14 @@
+function LoadMoreButton({ hasMore, loading, onClick }) {
+  if (!hasMore) return null;
+  return (
+    <button
+      onClick={onClick}
+      disabled={loading}
+      className="w-full border border-blue-600 text-blue-600 p-3 rounded hover:bg-blue-50 mb-6"
+    >
+      {loading ? "Loading..." : "Load more journals"}
+    </button>
+  );
+}
+
+export default LoadMoreButton;
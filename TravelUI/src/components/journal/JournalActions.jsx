@@ -17,15 +17,8 @@ export const handleDeleteShare = async (
   setError
 ) => {
   try {
-    const share = (
-      await axiosInstance.get("/api/Journal/shared-journals/", {
-        params: { journal: journalId, user: currentUserId },
-      })
-    ).data[0];
-    if (share) {
-      await axiosInstance.delete(`/api/Journal/shared-journals/${share.id}/`);
-      fetchJournals();
-    }
+    await axiosInstance.delete(`/api/Journal/journals/${journalId}/share/`);
+    fetchJournals();
   } catch (err) {
     setError("Failed to delete shared journal");
     console.error("Delete share error:", err.response?.data || err.message);
@@ -47,52 +40,19 @@ export const handleLike = async (
     const journalIndex = journals.findIndex((j) => j.id === journalId);
     const journal = journals[journalIndex];
     const isLiked = journal.is_liked;
+    // PUT/DELETE are idempotent, so a repeated tap cannot double count
     if (isLiked) {
-      const response = await axiosInstance.get(
-        `/api/Journal/likes/?journal=${journalId}`
-      );
-      const like = response.data.find((l) => l.user.id === currentUserId);
-      if (like) {
-        await axiosInstance.delete(`/api/Journal/likes/${like.id}/`);
-        const updatedJournals = [...journals];
-        updatedJournals[journalIndex] = {
-          ...journal,
-          is_liked: false,
-          like_count: journal.like_count - 1,
-        };
-        setJournals(updatedJournals);
-      } else {
-        throw new Error("Like not found for user");
-      }
+      await axiosInstance.delete(`/api/Journal/journals/${journalId}/like/`);
     } else {
-      const response = await axiosInstance.get(
-        `/api/Journal/likes/?journal=${journalId}`
-      );
-      const existingLike = response.data.find(
-        (l) => l.user.id === currentUserId
-      );
-      if (!existingLike) {
-        await axiosInstance.post("/api/Journal/likes/", {
-          journal: journalId,
-        });
-        const updatedJournals = [...journals];
-        updatedJournals[journalIndex] = {
-          ...journal,
-          is_liked: true,
-          like_count: journal.like_count + 1,
-        };
-        setJournals(updatedJournals);
-      } else {
-        console.warn("Like already exists for journal:", journalId);
-        const updatedJournals = [...journals];
-        updatedJournals[journalIndex] = {
-          ...journal,
-          is_liked: true,
-          like_count: journal.like_count + (journal.like_count === 0 ? 1 : 0),
-        };
-        setJournals(updatedJournals);
-      }
+      await axiosInstance.put(`/api/Journal/journals/${journalId}/like/`);
     }
+    const updatedJournals = [...journals];
+    updatedJournals[journalIndex] = {
+      ...journal,
+      is_liked: !isLiked,
+      like_count: Math.max(journal.like_count + (isLiked ? -1 : 1), 0),
+    };
+    setJournals(updatedJournals);
   } catch (err) {
     setError("Failed to update like");
     console.error("Like error:", err.response?.data || err.message);
@@ -101,9 +61,7 @@ export const handleLike = async (
 
 export const handleShare = async (journalId, fetchJournals, setError) => {
   try {
-    await axiosInstance.post("/api/Journal/shared-journals/", {
-      journal: journalId,
-    });
+    await axiosInstance.put(`/api/Journal/journals/${journalId}/share/`);
     fetchJournals();
   } catch (err) {
     setError("Failed to share journal");
@@ -140,7 +98,7 @@ function JournalActions({
         onClick={() => handleShare(journal.id, fetchJournals, setError)}
         className="text-blue-600 hover:text-blue-800 transition"
       >
-        Share ({journal.shares?.length || 0})
+        Share ({journal.share_count || 0})
       </button>
       {isOwner && (
         <div>
@@ -1,21 +1,37 @@
 import { useState } from "react";
 import axiosInstance from "../../utils/axiosInstance";
 
+// Journal lists embed only the first few top-level comments, without replies.
+// The rest is fetched page by page from the thread endpoints: "Show more comments"
+// walks /journals/<id>/comments/ and "View N replies" walks /comments/<id>/replies/,
+// following the `next` cursor of each response.
+
+const withoutDuplicates = (comments) => {
+  const seen = new Set();
+  return comments.filter((comment) => {
+    if (seen.has(comment.id)) return false;
+    seen.add(comment.id);
+    return true;
+  });
+};
+
 export const handleComment = async (
   journalId,
   e,
   commentInputs,
   setCommentInputs,
   fetchJournals,
-  setError
+  setError,
+  onPosted
 ) => {
   e.preventDefault();
   try {
-    await axiosInstance.post("/api/Journal/comments/", {
+    const response = await axiosInstance.post("/api/Journal/comments/", {
       journal: journalId,
       content: commentInputs[journalId] || "",
     });
     setCommentInputs((prev) => ({ ...prev, [journalId]: "" }));
+    onPosted?.(response.data);
     fetchJournals();
   } catch (err) {
     setError("Failed to post comment");
@@ -26,10 +42,12 @@ export const handleComment = async (
 export const handleDeleteComment = async (
   commentId,
   fetchJournals,
-  setError
+  setError,
+  onDeleted
 ) => {
   try {
     await axiosInstance.delete(`/api/Journal/comments/${commentId}/`);
+    onDeleted?.(commentId);
     fetchJournals();
   } catch (err) {
     setError("Failed to delete comment");
@@ -37,6 +55,107 @@ export const handleDeleteComment = async (
   }
 };
 
+function CommentItem({
+  comment,
+  isReply,
+  fetchJournals,
+  currentUserId,
+  setError,
+  navigate,
+  onDeleted,
+}) {
+  const [replies, setReplies] = useState(comment.replies || []);
+  const [nextReplies, setNextReplies] = useState(null);
+  const [loadingReplies, setLoadingReplies] = useState(false);
+  const [deletedReplies, setDeletedReplies] = useState(0);
+  const hiddenReplies =
+    (comment.reply_count || 0) - deletedReplies - replies.length;
+
+  const loadReplies = async () => {
+    setLoadingReplies(true);
+    try {
+      const response = await axiosInstance.get(
+        nextReplies || `/api/Journal/comments/${comment.id}/replies/`
+      );
+      setReplies((prev) =>
+        withoutDuplicates([...prev, ...(response.data.results || [])])
+      );
+      setNextReplies(response.data.next);
+    } catch (err) {
+      setError("Failed to load replies");
+      console.error("Replies error:", err.response?.data || err.message);
+    } finally {
+      setLoadingReplies(false);
+    }
+  };
+
+  const removeReply = (replyId) => {
+    setReplies((prev) => prev.filter((reply) => reply.id !== replyId));
+    setDeletedReplies((prev) => prev + 1);
+  };
+
+  return (
+    <div className={isReply ? "ml-4 border-l pl-2" : "border-t pt-2"}>
+      <div className="flex justify-between items-center">
+        <div>
+          <p className="text-sm text-gray-600">
+            <span
+              className={`text-blue-600 ${
+                comment.user?.id !== currentUserId
+                  ? "hover:underline cursor-pointer"
+                  : ""
+              }`}
+              onClick={() =>
+                comment.user?.id !== currentUserId &&
+                navigate(`/profile/${comment.user.id}`)
+              }
+            >
+              {comment.user?.full_name || "Unknown"}
+            </span>{" "}
+            {isReply ? "replied:" : "commented:"}
+          </p>
+          <p>{comment.content}</p>
+        </div>
+        {comment.user?.id === currentUserId && (
+          <button
+            onClick={() =>
+              handleDeleteComment(comment.id, fetchJournals, setError, onDeleted)
+            }
+            className="text-red-600 hover:text-red-800 text-sm"
+          >
+            Delete
+          </button>
+        )}
+      </div>
+      {replies.map((reply) => (
+        <CommentItem
+          key={reply.id}
+          comment={reply}
+          isReply
+          fetchJournals={fetchJournals}
+          currentUserId={currentUserId}
+          setError={setError}
+          navigate={navigate}
+          onDeleted={removeReply}
+        />
+      ))}
+      {(hiddenReplies > 0 || nextReplies) && (
+        <button
+          onClick={loadReplies}
+          disabled={loadingReplies}
+          className="ml-4 text-blue-600 hover:text-blue-800 text-sm"
+        >
+          {loadingReplies
+            ? "Loading..."
+            : hiddenReplies > 0
+            ? `View ${hiddenReplies} ${hiddenReplies === 1 ? "reply" : "replies"}`
+            : "View more replies"}
+        </button>
+      )}
+    </div>
+  );
+}
+
 function JournalComments({
   journal,
   fetchJournals,
@@ -45,90 +164,80 @@ function JournalComments({
   navigate,
 }) {
   const [commentInputs, setCommentInputs] = useState({});
+  // null until the first page is fetched; until then the embedded preview is shown
+  const [loadedComments, setLoadedComments] = useState(null);
+  const [nextComments, setNextComments] = useState(null);
+  const [loadingComments, setLoadingComments] = useState(false);
+  // Comments posted here, shown right away even when they are past the loaded pages
+  const [postedComments, setPostedComments] = useState([]);
+  const [deletedIds, setDeletedIds] = useState([]);
+
+  const comments = withoutDuplicates([
+    ...(loadedComments ?? journal.comments ?? []),
+    ...postedComments,
+  ]).filter((comment) => !deletedIds.includes(comment.id));
+  const shownTopLevel = comments.filter((comment) => !comment.parent).length;
+  const hiddenComments = loadedComments
+    ? 0
+    : (journal.comment_count || 0) - shownTopLevel;
+
+  const loadComments = async () => {
+    setLoadingComments(true);
+    try {
+      const response = await axiosInstance.get(
+        nextComments || `/api/Journal/journals/${journal.id}/comments/`
+      );
+      setLoadedComments((prev) =>
+        withoutDuplicates([...(prev ?? []), ...(response.data.results || [])])
+      );
+      setNextComments(response.data.next);
+    } catch (err) {
+      setError("Failed to load comments");
+      console.error("Comments error:", err.response?.data || err.message);
+    } finally {
+      setLoadingComments(false);
+    }
+  };
+
+  const addPosted = (comment) =>
+    setPostedComments((prev) => [...prev, { ...comment, reply_count: 0 }]);
+  const removeComment = (commentId) =>
+    setDeletedIds((prev) => [...prev, commentId]);
 
   return (
     <div className="mt-4">
-      {journal.comments && journal.comments.length > 0 ? (
+      {comments.length > 0 ? (
         <div className="space-y-2">
-          {journal.comments.map((comment) => (
-            <div key={comment.id} className="border-t pt-2">
-              <div className="flex justify-between items-center">
-                <div>
-                  <p className="text-sm text-gray-600">
-                    <span
-                      className={`text-blue-600 ${
-                        comment.user?.id !== currentUserId
-                          ? "hover:underline cursor-pointer"
-                          : ""
-                      }`}
-                      onClick={() =>
-                        comment.user?.id !== currentUserId &&
-                        navigate(`/profile/${comment.user.id}`)
-                      }
-                    >
-                      {comment.user?.full_name || "Unknown"}
-                    </span>{" "}
-                    commented:
-                  </p>
-                  <p>{comment.content}</p>
-                </div>
-                {comment.user?.id === currentUserId && (
-                  <button
-                    onClick={() =>
-                      handleDeleteComment(comment.id, fetchJournals, setError)
-                    }
-                    className="text-red-600 hover:text-red-800 text-sm"
-                  >
-                    Delete
-                  </button>
-                )}
-              </div>
-              {comment.replies &&
-                comment.replies.map((reply) => (
-                  <div key={reply.id} className="ml-4 border-l pl-2">
-                    <div className="flex justify-between items-center">
-                      <div>
-                        <p className="text-sm text-gray-600">
-                          <span
-                            className={`text-blue-600 ${
-                              reply.user?.id !== currentUserId
-                                ? "hover:underline cursor-pointer"
-                                : ""
-                            }`}
-                            onClick={() =>
-                              reply.user?.id !== currentUserId &&
-                              navigate(`/profile/${reply.user.id}`)
-                            }
-                          >
-                            {reply.user?.full_name || "Unknown"}
-                          </span>{" "}
-                          replied:
-                        </p>
-                        <p>{reply.content}</p>
-                      </div>
-                      {reply.user?.id === currentUserId && (
-                        <button
-                          onClick={() =>
-                            handleDeleteComment(
-                              reply.id,
-                              fetchJournals,
-                              setError
-                            )
-                          }
-                          className="text-red-600 hover:text-red-800 text-sm"
-                        >
-                          Delete
-                        </button>
-                      )}
-                    </div>
-                  </div>
-                ))}
-            </div>
+          {comments.map((comment) => (
+            <CommentItem
+              key={comment.id}
+              comment={comment}
+              fetchJournals={fetchJournals}
+              currentUserId={currentUserId}
+              setError={setError}
+              navigate={navigate}
+              onDeleted={removeComment}
+            />
           ))}
         </div>
       ) : (
         <p className="text-gray-500 italic text-center">No comments yet</p>
       )}
+      {(hiddenComments > 0 || nextComments) && (
+        <button
+          onClick={loadComments}
+          disabled={loadingComments}
+          className="mt-2 text-blue-600 hover:text-blue-800 text-sm"
+        >
+          {loadingComments
+            ? "Loading..."
+            : hiddenComments > 0
+            ? `Show ${hiddenComments} more ${
+                hiddenComments === 1 ? "comment" : "comments"
+              }`
+            : "Show more comments"}
+        </button>
+      )}
       <form
         onSubmit={(e) =>
           handleComment(
@@ -137,7 +246,8 @@ function JournalComments({
             commentInputs,
             setCommentInputs,
             fetchJournals,
-            setError
+            setError,
+            addPosted
           )
         }
         className="mt-4"
@@ -2,23 +2,31 @@ import { useState, useEffect } from "react";
 import { useSelector } from "react-redux";
 import { useNavigate } from "react-router-dom";
 import axiosInstance from "../utils/axiosInstance";
+import useCursorList from "../utils/useCursorList";
 import Footer from "../components/Footer";
 import UserSuggestions from "../components/UserSuggestions";
+import LoadMoreButton from "../components/LoadMoreButton";
+import JournalComments from "../components/journal/JournalComments";
 
 const BACKEND_BASE_URL = "http://localhost:8000";
 
 function Home() {
   const { user: currentUser } = useSelector((state) => state.auth);
-  const [journals, setJournals] = useState([]);
+  const {
+    items: journals,
+    hasMore,
+    loadingMore,
+    load,
+    loadMore,
+  } = useCursorList();
   const [error, setError] = useState(null);
   const [mediaIndices, setMediaIndices] = useState({});
-  const [commentInputs, setCommentInputs] = useState({});
   const navigate = useNavigate();
 
   const fetchJournals = async () => {
     try {
-      const response = await axiosInstance.get("/api/Journal/journals/feed/");
-      setJournals(response.data);
+      // Refreshes every page already shown, see useCursorList
+      await load("/api/Journal/journals/feed/");
     } catch (err) {
       console.error("Failed to fetch journals:", err.response?.data || err);
       setError("Failed to load journals");
@@ -30,16 +38,22 @@ function Home() {
     fetchJournals();
   }, []);
 
+  const handleLoadMore = async () => {
+    try {
+      await loadMore();
+    } catch (err) {
+      console.error("Failed to fetch journals:", err.response?.data || err);
+      setError("Failed to load more journals");
+    }
+  };
+
   const handleLike = async (journalId) => {
     try {
       const liked = journals.find((j) => j.id === journalId).is_liked;
       if (liked) {
-        const like = await axiosInstance.get(
-          `/api/Journal/likes/?journal=${journalId}`
-        );
-        await axiosInstance.delete(`/api/Journal/likes/${like.data[0].id}/`);
+        await axiosInstance.delete(`/api/Journal/journals/${journalId}/like/`);
       } else {
-        await axiosInstance.post("/api/Journal/likes/", { journal: journalId });
+        await axiosInstance.put(`/api/Journal/journals/${journalId}/like/`);
       }
       fetchJournals();
     } catch (err) {
@@ -47,43 +61,13 @@ function Home() {
     }
   };
 
-  const handleComment = async (journalId) => {
-    try {
-      await axiosInstance.post("/api/Journal/comments/", {
-        journal: journalId,
-        content: commentInputs[journalId] || "",
-      });
-      setCommentInputs({ ...commentInputs, [journalId]: "" });
-      fetchJournals();
-    } catch (err) {
-      setError("Failed to post comment");
-    }
-  };
-
-  const handleDeleteComment = async (commentId) => {
-    try {
-      await axiosInstance.delete(`/api/Journal/comments/${commentId}/`);
-      fetchJournals();
-    } catch (err) {
-      setError("Failed to delete comment");
-      console.error("Delete comment error:", err.response?.data || err.message);
-    }
-  };
-
   const handleShare = async (journalId) => {
     try {
       const shared = journals.find((j) => j.id === journalId).is_shared;
       if (shared) {
-        const share = await axiosInstance.get(
-          `/api/Journal/shared-journals/?journal=${journalId}`
-        );
-        await axiosInstance.delete(
-          `/api/Journal/shared-journals/${share.data[0].id}/`
-        );
+        await axiosInstance.delete(`/api/Journal/journals/${journalId}/share/`);
       } else {
-        await axiosInstance.post("/api/Journal/shared-journals/", {
-          journal: journalId,
-        });
+        await axiosInstance.put(`/api/Journal/journals/${journalId}/share/`);
       }
       fetchJournals();
     } catch (err) {
@@ -219,83 +203,23 @@ function Home() {
                   }`}
                 >
                   {journal.is_shared ? "Unshare" : "Share"}(
-                  {journal.shares.length})
-                </button>
-              </div>
-              <div className="mt-4">
-                {journal.comments.map((comment) => {
-                  console.log(
-                    `Home.jsx: Comment ID ${comment.id}, User ID ${comment.user?.id}, Current User ID ${currentUser?.id}`
-                  ); // Debug log
-                  return (
-                    <div key={comment.id} className="border-t pt-2 mt-2">
-                      <div className="flex justify-between items-center">
-                        <div>
-                          <p className="text-sm">
-                            <strong>{comment.user.full_name}</strong>:{" "}
-                            {comment.content}
-                          </p>
-                        </div>
-                        {comment.user?.id == currentUser?.id && (
-                          <button
-                            onClick={() => handleDeleteComment(comment.id)}
-                            className="text-red-600 hover:text-red-800 text-sm"
-                          >
-                            Delete
-                          </button>
-                        )}
-                      </div>
-                      {comment.replies.map((reply) => {
-                        console.log(
-                          `Home.jsx: Reply ID ${reply.id}, User ID ${reply.user?.id}, Current User ID ${currentUser?.id}`
-                        ); // Debug log
-                        return (
-                          <div
-                            key={reply.id}
-                            className="ml-4 border-l pt-1 mt-1"
-                          >
-                            <div className="flex justify-between items-center">
-                              <div>
-                                <p className="text-sm">
-                                  <strong>{reply.user.full_name}</strong>:{" "}
-                                  {reply.content}
-                                </p>
-                              </div>
-                              {reply.user?.id == currentUser?.id && (
-                                <button
-                                  onClick={() => handleDeleteComment(reply.id)}
-                                  className="text-red-600 hover:text-red-800 text-sm"
-                                >
-                                  Delete
-                                </button>
-                              )}
-                            </div>
-                          </div>
-                        );
-                      })}
-                    </div>
-                  );
-                })}
-                <input
-                  value={commentInputs[journal.id] || ""}
-                  onChange={(e) =>
-                    setCommentInputs({
-                      ...commentInputs,
-                      [journal.id]: e.target.value,
-                    })
-                  }
-                  placeholder="Add a comment..."
-                  className="w-full border rounded p-2 mt-2"
-                />
-                <button
-                  onClick={() => handleComment(journal.id)}
-                  className="bg-blue-600 text-white px-4 py-1 rounded mt-2"
-                >
-                  Post Comment
+                  {journal.share_count})
                 </button>
               </div>
+              <JournalComments
+                journal={journal}
+                fetchJournals={fetchJournals}
+                currentUserId={currentUser?.id}
+                setError={setError}
+                navigate={navigate}
+              />
             </div>
           ))}
+          <LoadMoreButton
+            hasMore={hasMore}
+            loading={loadingMore}
+            onClick={handleLoadMore}
+          />
         </div>
         <div className="w-1/4">
           <UserSuggestions />
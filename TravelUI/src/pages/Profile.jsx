@@ -2,12 +2,14 @@ import { useState, useEffect } from "react";
 import { useSelector } from "react-redux";
 import { useParams, useNavigate } from "react-router-dom";
 import axiosInstance from "../utils/axiosInstance";
+import useCursorList from "../utils/useCursorList";
 import BackgroundImage from "../components/BackgroundImage";
 import ProfileImage from "../components/ProfileImage";
 import JournalList from "../components/JournalList";
 import Footer from "../components/Footer";
 import EditProfileCard from "../components/EditProfileCard";
 import FollowList from "../components/FollowList";
+import LoadMoreButton from "../components/LoadMoreButton";
 
 function Profile() {
   const { user: currentUser } = useSelector((state) => state.auth);
@@ -16,7 +18,14 @@ function Profile() {
   const [profile, setProfile] = useState(null);
   const [profileImage, setProfileImage] = useState(null);
   const [bannerImage, setBannerImage] = useState(null);
-  const [journals, setJournals] = useState([]);
+  const {
+    items: journals,
+    setItems: setJournals,
+    hasMore,
+    loadingMore,
+    load: loadJournals,
+    loadMore,
+  } = useCursorList();
   const [error, setError] = useState(null);
   const [showEdit, setShowEdit] = useState(false);
   const [isFollowing, setIsFollowing] = useState(false);
@@ -38,11 +47,11 @@ function Profile() {
         : `/api/Users/profile/${userId}/`;
       const res = await axiosInstance.get(endpoint);
       const userData = res.data.user || res.data;
-      const fetchedJournals = res.data.journals || [];
       setProfile(userData);
       setProfileImage(userData.profile_image || null);
       setBannerImage(userData.banner_image || null);
-      setJournals(fetchedJournals);
+      // Journals are a separate, cursor-paginated resource linked from the user
+      await loadJournals(userData.journals_url);
       setError(null);
     } catch (err) {
       setError("Failed to load profile data");
@@ -53,6 +62,15 @@ function Profile() {
     }
   };
 
+  const handleLoadMore = async () => {
+    try {
+      await loadMore();
+    } catch (err) {
+      setError("Failed to load more journals");
+      console.error("Journals fetch error:", err.response?.data || err.message);
+    }
+  };
+
   const checkFollowStatus = async () => {
     try {
       const res = await axiosInstance.get("/api/Users/follow/status", {
@@ -179,7 +197,7 @@ function Profile() {
         )}
 
         {/* Journal list */}
-        <div className="container mx-auto flex justify-center">
+        <div className="container mx-auto flex flex-col items-center">
           <JournalList
             journals={journals}
             setJournals={setJournals}
@@ -189,6 +207,13 @@ function Profile() {
             isOwner={isOwner}
             currentUserId={currentUser?.id}
           />
+          <div className="w-full max-w-3xl px-4">
+            <LoadMoreButton
+              hasMore={hasMore}
+              loading={loadingMore}
+              onClick={handleLoadMore}
+            />
+          </div>
         </div>
       </div>
       <Footer />
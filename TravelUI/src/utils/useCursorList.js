@@ -0,0 +1,50 @@
+import { useRef, useState } from "react";
+import axiosInstance from "./axiosInstance";
+
+// State of a cursor-paginated list endpoint ({ next, results }). load(url) fetches
+// the first page, or as many pages as are already on screen so that refreshing
+// after a like or share keeps the reader's place; loadMore() follows `next`.
+// Errors are thrown to the caller, which reports them like any other request.
+
+export default function useCursorList(getKey = (item) => item.id) {
+  const [items, setItems] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const pagesLoaded = useRef(0);
+
+  // Rankings can move between fetches, so an item may come back on a later page
+  const merge = (current, incoming) => {
+    const seen = new Set(current.map(getKey));
+    return [...current, ...incoming.filter((item) => !seen.has(getKey(item)))];
+  };
+
+  const load = async (url) => {
+    let link = url;
+    let collected = [];
+    let pages = 0;
+    do {
+      const response = await axiosInstance.get(link);
+      collected = merge(collected, response.data.results || []);
+      link = response.data.next;
+      pages += 1;
+    } while (link && pages < pagesLoaded.current);
+    pagesLoaded.current = pages;
+    setItems(collected);
+    setNext(link);
+  };
+
+  const loadMore = async () => {
+    if (!next || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await axiosInstance.get(next);
+      setItems((prev) => merge(prev, response.data.results || []));
+      setNext(response.data.next);
+      pagesLoaded.current += 1;
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  return { items, setItems, hasMore: Boolean(next), loadingMore, load, loadMore };
+}
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from . import versions
+
+# Columns that change whenever a journal's own representation does
+JOURNAL_STAMP_FIELDS = ('id', 'user_id', 'updated_at', 'like_count', 'comment_count', 'share_count')
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified for GET, computed from cheap version stamps before the
+    view's querysets and serializers run. A client presenting a matching
+    If-None-Match (or a recent enough If-Modified-Since) gets a 304 straight away.
+
+    Views implement get_version_stamps() returning (stamps, last_modified): any
+    JSON-serializable stamps, and a datetime/timestamp or None. Returning None
+    skips the check (e.g. so the view itself can answer 404). Views that define
+    their own get() wrap it with conditional_get().
+
+    List views pass last_modified=None and validate by ETag only: a page can
+    change without any of its stamps moving forward (an entry dropping out,
+    two changes within the same second), which If-Modified-Since cannot see.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_get(super().get, request, *args, **kwargs)
+
+    def conditional_get(self, handler, request, *args, **kwargs):
+        versioned = self.get_version_stamps(request, *args, **kwargs)
+        if versioned is None:
+            return handler(request, *args, **kwargs)
+
+        stamps, last_modified = versioned
+        etag = self.make_etag(request, stamps)
+        if last_modified is not None and hasattr(last_modified, 'timestamp'):
+            last_modified = last_modified.timestamp()
+        last_modified = int(last_modified) if last_modified is not None else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Clients may keep the response but have to revalidate it on every use
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def make_etag(self, request, stamps):
+        # The same stamps answer differently for another viewer, query or representation
+        key = [request.get_full_path(), request.user.pk, request.headers.get('Accept', ''), stamps]
+        digest = hashlib.blake2b(json.dumps(key, default=str).encode(), digest_size=16).hexdigest()
+        return quote_etag(digest)
+
+    def get_version_stamps(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+def journal_stamps(rows, *scopes):
+    """
+    Stamps for a page of journals: their JOURNAL_STAMP_FIELDS rows plus the
+    version stamps of each journal, of its author (embedded in the journal) and
+    of any extra scopes.
+    """
+    stamps = versions.get_stamps([
+        *(versions.journal_scope(row['id']) for row in rows),
+        *(versions.user_scope(row['user_id']) for row in rows),
+        *scopes,
+    ])
+    times = [row['updated_at'].timestamp() for row in rows]
+    times += [versions.stamp_time(stamp) for stamp in stamps.values()]
+    return [[list(row.values()) for row in rows], stamps], max(times, default=None)
@@ -0,0 +1,57 @@
+from django.db.models import Case, F, IntegerField, QuerySet, Value, When
+from django.db.models.functions import Greatest
+from .models import Journal
+from . import scoring, versions
+
+COUNTER_FIELDS = {'likes': 'like_count', 'comments': 'comment_count', 'shares': 'share_count'}
+
+def adjust_counts(journal_id, **deltas):
+    """
+    Atomically add deltas to a journal's cached counters, e.g.
+    adjust_counts(journal_id, likes=1) or adjust_counts(journal_id, comments=-3),
+    then re-score it. Use this from bulk paths that do not send model signals.
+    """
+    changes = {
+        COUNTER_FIELDS[name]: Greatest(F(COUNTER_FIELDS[name]) + delta, Value(0))
+        for name, delta in deltas.items() if delta
+    }
+    if not changes or not Journal.objects.filter(pk=journal_id).update(**changes):
+        return
+    versions.bump(versions.journal_scope(journal_id))
+    journal = Journal.objects.only('id', 'user_id', 'created_at', *COUNTER_FIELDS.values()).get(pk=journal_id)
+    journal.update_engagement_score()
+
+def adjust_many(name, deltas):
+    """
+    Add {journal_id: delta} to one counter ('likes', 'comments' or 'shares') of many
+    journals with a single UPDATE ... CASE, then re-score them together: a fixed
+    number of queries however many journals a batch touches.
+    """
+    by_delta = {}
+    for journal_id, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(journal_id)
+    if not by_delta:
+        return
+    field = COUNTER_FIELDS[name]
+    journal_ids = [journal_id for ids in by_delta.values() for journal_id in ids]
+    delta = Case(
+        *(When(pk__in=ids, then=Value(delta)) for delta, ids in by_delta.items()),
+        default=Value(0), output_field=IntegerField(),
+    )
+    if not Journal.objects.filter(pk__in=journal_ids).update(**{field: Greatest(F(field) + delta, Value(0))}):
+        return
+    versions.bump(*(versions.journal_scope(journal_id) for journal_id in journal_ids))
+    journals = list(
+        Journal.objects.filter(pk__in=journal_ids).only('id', 'user_id', 'created_at', *COUNTER_FIELDS.values())
+    )
+    scoring.rescore_journals(journals)
+
+def journal_deleted(origin):
+    """
+    True when a post_delete comes from deleting the journal itself (or a queryset of
+    journals); its counters are about to disappear, so there is nothing to adjust.
+    """
+    if isinstance(origin, QuerySet):
+        return origin.model is Journal
+    return isinstance(origin, Journal)
@@ -0,0 +1,122 @@
+from django.db import connection
+from django.db.models import QuerySet
+from Users.models import Follow
+from . import versions
+from .models import FeedEntry, Journal, SharedJournal
+
+# How many of a user's most recent journals/shares are copied into a new follower's feed
+FEED_BACKFILL_LIMIT = 200
+BULK_BATCH_SIZE = 1000
+
+def _deliver(entries):
+    # Entries that already exist (journal reached the user via another followee) are skipped
+    FeedEntry.objects.bulk_create(entries, ignore_conflicts=True, batch_size=BULK_BATCH_SIZE)
+    versions.bump(*(versions.feed_scope(entry.user_id) for entry in entries))
+
+def fan_out(journal_id, actor_id, created_at):
+    """
+    Push a journal written or shared by `actor_id` into every follower's feed, as
+    one INSERT ... SELECT over the Follow table (not the cached follow graph, so a
+    follow committed a moment ago is never missed).
+    """
+    qn = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {qn(FeedEntry._meta.db_table)} "
+        f"({qn('user_id')}, {qn('journal_id')}, {qn('actor_id')}, {qn('created_at')}) "
+        f"SELECT {qn('follower_id')}, %s, %s, %s FROM {qn(Follow._meta.db_table)} WHERE {qn('followed_id')} = %s "
+        f"ON CONFLICT ({qn('user_id')}, {qn('journal_id')}) DO NOTHING "
+        f"RETURNING {qn('user_id')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [journal_id, actor_id, connection.ops.adapt_datetimefield_value(created_at), actor_id])
+        user_ids = [row[0] for row in cursor.fetchall()]
+    versions.bump(*(versions.feed_scope(user_id) for user_id in user_ids))
+
+def backfill(follower_id, followed_ids):
+    """
+    Copy the FEED_BACKFILL_LIMIT most recent journals and shares of each newly
+    followed user into the follower's feed, as a single INSERT ... SELECT.
+    """
+    if not followed_ids:
+        return
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(followed_ids))
+    recent = (
+        "SELECT {journal} AS journal_ref, {user} AS actor_ref, {created} AS created_ref, "
+        "ROW_NUMBER() OVER (PARTITION BY {user} ORDER BY {created} DESC) AS position "
+        "FROM {table} WHERE {user} IN ({placeholders})"
+    )
+    journals = recent.format(
+        journal=qn('id'), user=qn('user_id'), created=qn('created_at'),
+        table=qn(Journal._meta.db_table), placeholders=placeholders,
+    )
+    shares = recent.format(
+        journal=qn('journal_id'), user=qn('user_id'), created=qn('created_at'),
+        table=qn(SharedJournal._meta.db_table), placeholders=placeholders,
+    )
+    # A journal both written and shared by followed users is delivered once (ON CONFLICT)
+    sql = (
+        f"INSERT INTO {qn(FeedEntry._meta.db_table)} "
+        f"({qn('user_id')}, {qn('journal_id')}, {qn('actor_id')}, {qn('created_at')}) "
+        f"SELECT %s, journal_ref, actor_ref, created_ref FROM ({journals} UNION ALL {shares}) recent "
+        f"WHERE position <= %s "
+        f"ON CONFLICT ({qn('user_id')}, {qn('journal_id')}) DO NOTHING"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [follower_id, *followed_ids, *followed_ids, FEED_BACKFILL_LIMIT])
+    versions.bump(versions.feed_scope(follower_id))
+
+def trim(follower_id, followed_ids):
+    """
+    Remove what unfollowed users delivered (one DELETE), keeping journals other
+    followees still reach.
+    """
+    entries = FeedEntry.objects.filter(user_id=follower_id, actor_id__in=followed_ids)
+    journal_ids = list(entries.values_list('journal_id', flat=True))
+    entries.delete()
+    versions.bump(versions.feed_scope(follower_id))
+    redeliver([follower_id], journal_ids)
+
+def retract_share(journal_id, actor_id):
+    """Undo the fan-out of a share that has been deleted."""
+    entries = FeedEntry.objects.filter(journal_id=journal_id, actor_id=actor_id)
+    user_ids = list(entries.values_list('user_id', flat=True))
+    entries.delete()
+    versions.bump(*(versions.feed_scope(user_id) for user_id in user_ids))
+    redeliver(user_ids, [journal_id])
+
+def redeliver(user_ids, journal_ids):
+    """
+    Re-create feed entries for journals that are still reachable by the given
+    users through someone else they follow (as author or sharer).
+    """
+    if not user_ids or not journal_ids:
+        return
+    # (journal, actor, created_at) for every way these journals can reach a feed
+    sources = [
+        *Journal.objects.filter(id__in=journal_ids).values_list('id', 'user_id', 'created_at'),
+        *SharedJournal.objects.filter(journal_id__in=journal_ids).values_list('journal_id', 'user_id', 'created_at'),
+    ]
+    actor_ids = {actor_id for _, actor_id, _ in sources}
+    followees = {}
+    for follower_id, followed_id in Follow.objects.filter(
+        follower_id__in=user_ids, followed_id__in=actor_ids
+    ).values_list('follower_id', 'followed_id'):
+        followees.setdefault(follower_id, set()).add(followed_id)
+
+    _deliver([
+        FeedEntry(user_id=user_id, journal_id=journal_id, actor_id=actor_id, created_at=created_at)
+        for user_id, actors in followees.items()
+        for journal_id, actor_id, created_at in sources
+        if actor_id in actors
+    ])
+
+def deleted_directly(model, origin):
+    """
+    True when a post_delete was triggered by deleting `model` itself rather than
+    by a cascade from its journal or user, which would make redelivery pointless
+    (and would insert rows pointing at objects about to disappear).
+    """
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
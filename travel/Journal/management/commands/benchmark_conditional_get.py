@@ -0,0 +1,53 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+DEFAULT_PATHS = [
+    '/api/Journal/journals/feed/',
+    '/api/Journal/journals/explore/',
+    '/api/Journal/journals/profile/',
+    '/api/Journal/journals/my/',
+    '/api/Users/profile/',
+]
+
+class Command(BaseCommand):
+    help = (
+        "Compare polling journal/profile endpoints with and without If-None-Match: "
+        "median time and queries of a full 200 versus a 304 revalidation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, required=True, help="Id of the user to poll as")
+        parser.add_argument('--rounds', type=int, default=50)
+        parser.add_argument('--path', action='append', dest='paths', help="Endpoint to poll (repeatable)")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(pk=options['user']).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} does not exist")
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user)
+
+        self.stdout.write(f"{'endpoint':<45} {'200 ms':>8} {'queries':>8} {'304 ms':>8} {'queries':>8}")
+        for path in options['paths'] or DEFAULT_PATHS:
+            response = client.get(path)
+            if response.status_code != 200 or not response.has_header('ETag'):
+                self.stdout.write(self.style.WARNING(f"{path}: {response.status_code}, no ETag, skipped"))
+                continue
+            full = self.poll(client, path, options['rounds'])
+            revalidated = self.poll(client, path, options['rounds'], HTTP_IF_NONE_MATCH=response['ETag'])
+            self.stdout.write(f"{path:<45} {full[0]:>8.2f} {full[1]:>8} {revalidated[0]:>8.2f} {revalidated[1]:>8}")
+
+    def poll(self, client, path, rounds, **headers):
+        """Median milliseconds and query count of `rounds` GETs."""
+        timings = []
+        for _ in range(rounds):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                client.get(path, **headers)
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), len(queries)
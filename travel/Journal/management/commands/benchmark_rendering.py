@@ -0,0 +1,78 @@
+import gzip
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from travel.middleware import CompressionMiddleware, brotli
+from travel.renderers import FastJSONRenderer, orjson
+
+def user_payload(user_id):
+    return {'id': user_id, 'first_name': 'Asha', 'last_name': 'Rao', 'full_name': 'Asha Rao',
+            'profile_image': f'http://localhost:8000/media/profiles/{user_id}.jpg'}
+
+def feed_payload(page_size, comments):
+    """A feed page shaped like JournalSerializer output, with `comments` comments per journal."""
+    created_at = '2026-01-01T09:30:00.123456+05:30'
+    return {
+        'next': 'http://localhost:8000/api/Journal/journals/feed/?cursor=WzAuODMzMzk5OTk5OTk5OTk5OSwyM10',
+        'results': [{
+            'id': journal_id,
+            'title': f'Three days in the Western Ghats, part {journal_id}',
+            'content': 'Monsoon mist over the tea estates, a long walk to the falls. ' * 30,
+            'created_at': created_at,
+            'updated_at': created_at,
+            'media': [{'id': journal_id, 'file': f'http://localhost:8000/media/journal/{journal_id}.jpg',
+                       'media_type': 'image'}],
+            'user': user_payload(journal_id % 50),
+            'like_count': 120, 'comment_count': comments, 'share_count': 7,
+            'is_liked': journal_id % 2 == 0,
+            'comments': [{
+                'id': journal_id * 100 + comment_id, 'user': user_payload(comment_id), 'journal': journal_id,
+                'parent': None, 'content': 'Adding this to my list for next year!', 'created_at': created_at,
+                'updated_at': created_at, 'replies': [], 'reply_count': 0,
+            } for comment_id in range(comments)],
+            'is_shared': False, 'shared_by': None,
+        } for journal_id in range(1, page_size + 1)],
+    }
+
+class Command(BaseCommand):
+    help = "Compare JSON render time and response bytes (raw, gzip, brotli) for feed-sized payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--comments', type=int, default=5, help="Comments embedded per journal")
+        parser.add_argument('--rounds', type=int, default=200)
+
+    def handle(self, *args, **options):
+        data = feed_payload(options['page_size'], options['comments'])
+        rounds = options['rounds']
+
+        baseline = self.timed(lambda: JSONRenderer().render(data), rounds)
+        self.stdout.write(f"DRF JSONRenderer   {baseline:8.3f} ms")
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed, FastJSONRenderer falls back to DRF"))
+        else:
+            fast = self.timed(lambda: FastJSONRenderer().render(data), rounds)
+            self.stdout.write(f"FastJSONRenderer   {fast:8.3f} ms  ({baseline / fast:.1f}x)")
+
+        content = FastJSONRenderer().render(data)
+        self.stdout.write(f"\nraw                {len(content):8d} bytes")
+        gzipped = gzip.compress(content, compresslevel=6)
+        gzip_ms = self.timed(lambda: gzip.compress(content, compresslevel=6), rounds)
+        self.stdout.write(f"gzip -6            {len(gzipped):8d} bytes  {gzip_ms:8.3f} ms")
+        if brotli is None:
+            self.stdout.write(self.style.WARNING("brotli is not installed, responses are only gzipped"))
+        else:
+            quality = CompressionMiddleware.brotli_quality
+            compressed = brotli.compress(content, quality=quality)
+            brotli_ms = self.timed(lambda: brotli.compress(content, quality=quality), rounds)
+            self.stdout.write(f"brotli -{quality}          {len(compressed):8d} bytes  {brotli_ms:8.3f} ms")
+
+    def timed(self, render, rounds):
+        """Median milliseconds of `rounds` calls."""
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            render()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
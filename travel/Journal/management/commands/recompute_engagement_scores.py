@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from Journal.models import Journal
+from Journal.scoring import engagement_score, get_normalizers, reconcile_stats
+
+class Command(BaseCommand):
+    help = "Re-normalize the stored engagement_score of every journal. Run periodically (e.g. from cron) so recency keeps decaying."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Correct the running stats first so the new scores use exact maxima and a fresh reference time
+        reconcile_stats()
+        normalizers = get_normalizers()
+        last_id = 0
+        updated = 0
+
+        while True:
+            batch = list(
+                Journal.objects.filter(id__gt=last_id).order_by('id').only(
+                    'id', 'like_count', 'comment_count', 'share_count', 'created_at', 'engagement_score'
+                )[:batch_size]
+            )
+            if not batch:
+                break
+            for journal in batch:
+                journal.engagement_score = engagement_score(
+                    journal.like_count, journal.comment_count, journal.share_count,
+                    journal.created_at, normalizers,
+                )
+            with transaction.atomic():
+                Journal.objects.bulk_update(batch, ['engagement_score'], batch_size=batch_size)
+            updated += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Recomputed engagement scores for {updated} journals"))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from Journal import scoring, versions
+from Journal.models import Journal, Like, Comment, SharedJournal
+
+def count_by_journal(queryset, journal_ids):
+    return dict(
+        queryset.filter(journal_id__in=journal_ids).values('journal_id')
+        .annotate(total=Count('id')).values_list('journal_id', 'total')
+    )
+
+class Command(BaseCommand):
+    help = "Detect and repair drift between Journal like/comment/share counters and the rows they count."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['like_count', 'comment_count', 'share_count']
+        last_id = 0
+        checked = repaired = 0
+
+        while True:
+            batch = list(
+                Journal.objects.filter(id__gt=last_id).order_by('id')
+                .only('id', 'user_id', 'created_at', *fields)[:batch_size]
+            )
+            if not batch:
+                break
+            journal_ids = [journal.id for journal in batch]
+            actual = {
+                'like_count': count_by_journal(Like.objects.all(), journal_ids),
+                'comment_count': count_by_journal(Comment.objects.filter(parent__isnull=True), journal_ids),
+                'share_count': count_by_journal(SharedJournal.objects.all(), journal_ids),
+            }
+
+            drifted = []
+            for journal in batch:
+                changes = []
+                for field in fields:
+                    stored, counted = getattr(journal, field), actual[field].get(journal.id, 0)
+                    if stored != counted:
+                        changes.append(f"{field} {stored} -> {counted}")
+                        setattr(journal, field, counted)
+                if changes:
+                    self.stdout.write(f"Journal {journal.id}: {', '.join(changes)}")
+                    drifted.append(journal)
+
+            if drifted and not options['dry_run']:
+                with transaction.atomic():
+                    Journal.objects.bulk_update(drifted, fields)
+                    # As counters.adjust_many does: rank on the repaired counts, invalidate cached pages
+                    versions.bump(*(versions.journal_scope(journal.id) for journal in drifted))
+                    scoring.rescore_journals(drifted)
+            checked += len(batch)
+            repaired += len(drifted)
+            last_id = batch[-1].id
+
+        verb = "Found" if options['dry_run'] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} journals. {verb} {repaired} with counter drift."))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from Journal.scoring import reconcile_stats
+
+class Command(BaseCommand):
+    help = "Recompute the global engagement normalization stats from the journals table."
+
+    def handle(self, *args, **options):
+        reconcile_stats()
+        self.stdout.write(self.style.SUCCESS("Engagement stats reconciled"))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_feeds(apps, schema_editor):
+    """Materialize the existing follow graph into feed entries, one follower at a time."""
+    Follow = apps.get_model('Users', 'Follow')
+    Journal = apps.get_model('Journal', 'Journal')
+    SharedJournal = apps.get_model('Journal', 'SharedJournal')
+    FeedEntry = apps.get_model('Journal', 'FeedEntry')
+
+    follower_ids = Follow.objects.values_list('follower_id', flat=True).distinct().order_by('follower_id')
+    for follower_id in follower_ids.iterator():
+        followed_ids = list(Follow.objects.filter(follower_id=follower_id).values_list('followed_id', flat=True))
+        sources = [
+            *Journal.objects.filter(user_id__in=followed_ids).values_list('id', 'user_id', 'created_at'),
+            *SharedJournal.objects.filter(user_id__in=followed_ids).values_list('journal_id', 'user_id', 'created_at'),
+        ]
+        FeedEntry.objects.bulk_create(
+            [
+                FeedEntry(user_id=follower_id, journal_id=journal_id, actor_id=actor_id, created_at=created_at)
+                for journal_id, actor_id, created_at in sources
+            ],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Journal', '0002_journal_comment_count_journal_like_count_and_more'),
+        ('Users', '0003_follow'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('journal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='Journal.journal')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='feedentry_user_recent_idx'), models.Index(fields=['user', 'actor'], name='feedentry_user_actor_idx')],
+                'unique_together': {('user', 'journal')},
+            },
+        ),
+        migrations.RunPython(backfill_feeds, migrations.RunPython.noop),
+    ]
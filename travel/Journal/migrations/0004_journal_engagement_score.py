@@ -0,0 +1,73 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+
+def engagement_score(like_count, comment_count, share_count, created_at, normalizers):
+    # The scoring formula as of this migration, kept here so later changes to
+    # Journal.scoring cannot change (or break) what the migration does
+    def ratio(value, maximum):
+        return min(value / max(maximum or 1, 1), 1.0)
+
+    reference_at = normalizers['reference_at']
+    oldest = normalizers['oldest'] or reference_at
+    span = max((reference_at - oldest).total_seconds(), 86400.0)
+    age = (reference_at - (created_at or reference_at)).total_seconds()
+    recency = min(max(1 - age / span, 0.0), 1.0)
+    return (
+        0.5 * recency +
+        0.1667 * ratio(like_count, normalizers['max_likes']) +
+        0.1667 * ratio(comment_count, normalizers['max_comments']) +
+        0.1667 * ratio(share_count, normalizers['max_shares'])
+    )
+
+
+def backfill_engagement_scores(apps, schema_editor):
+    Journal = apps.get_model('Journal', 'Journal')
+    normalizers = Journal.objects.aggregate(
+        max_likes=Max('like_count'),
+        max_comments=Max('comment_count'),
+        oldest=Min('created_at'),
+    )
+    normalizers['max_shares'] = Journal.objects.annotate(shares_total=Count('shares')).aggregate(
+        max_shares=Max('shares_total')
+    )['max_shares']
+    normalizers['reference_at'] = timezone.now()
+
+    last_id = 0
+    while True:
+        batch = list(
+            Journal.objects.filter(id__gt=last_id).order_by('id').annotate(shares_total=Count('shares'))[:1000]
+        )
+        if not batch:
+            break
+        for journal in batch:
+            journal.engagement_score = engagement_score(
+                journal.like_count, journal.comment_count, journal.shares_total, journal.created_at, normalizers
+            )
+        Journal.objects.bulk_update(batch, ['engagement_score'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Journal', '0003_feedentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journal',
+            name='engagement_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='journal',
+            index=models.Index(fields=['-engagement_score', '-id'], name='journal_engagement_idx'),
+        ),
+        migrations.RunPython(backfill_engagement_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:07
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def seed_engagement_stats(apps, schema_editor):
+    Journal = apps.get_model('Journal', 'Journal')
+    EngagementStats = apps.get_model('Journal', 'EngagementStats')
+    stats = EngagementStats(scope='global', reference_at=timezone.now())
+
+    journals = Journal.objects.annotate(shares_total=Count('shares')).values_list(
+        'like_count', 'comment_count', 'shares_total', 'created_at'
+    ).order_by('id')
+    for likes, comments, shares, created_at in journals.iterator(chunk_size=1000):
+        stats.max_likes = max(stats.max_likes, likes)
+        stats.max_comments = max(stats.max_comments, comments)
+        stats.max_shares = max(stats.max_shares, shares)
+        if stats.oldest_created_at is None or created_at < stats.oldest_created_at:
+            stats.oldest_created_at = created_at
+    stats.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Journal', '0004_journal_engagement_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngagementStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64, unique=True)),
+                ('max_likes', models.PositiveIntegerField(default=0)),
+                ('max_comments', models.PositiveIntegerField(default=0)),
+                ('max_shares', models.PositiveIntegerField(default=0)),
+                ('oldest_created_at', models.DateTimeField(blank=True, null=True)),
+                ('reference_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_engagement_stats, migrations.RunPython.noop),
+    ]
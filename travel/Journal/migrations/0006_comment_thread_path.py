@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_comment_paths(apps, schema_editor):
+    """Fill path/depth one tree level at a time, starting from top-level comments."""
+    Comment = apps.get_model('Journal', 'Comment')
+    width = 12
+
+    level = Comment.objects.filter(parent__isnull=True)
+    depth = 0
+    while level.exists():
+        batch = []
+        for comment in level.select_related('parent').order_by('id').iterator(chunk_size=1000):
+            segment = str(comment.pk).zfill(width)
+            comment.path = f"{comment.parent.path}/{segment}" if comment.parent_id else segment
+            comment.depth = depth
+            batch.append(comment)
+            if len(batch) >= 1000:
+                Comment.objects.bulk_update(batch, ['path', 'depth'])
+                batch = []
+        Comment.objects.bulk_update(batch, ['path', 'depth'])
+        level = Comment.objects.filter(parent__in=Comment.objects.filter(depth=depth).exclude(path=''))
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Journal', '0005_engagementstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['journal', 'path'], name='comment_thread_idx', opclasses=['int8_ops', 'text_pattern_ops']),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:12
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def backfill_excerpts(apps, schema_editor):
+    Journal = apps.get_model('Journal', 'Journal')
+    last_id = 0
+    while True:
+        batch = list(Journal.objects.filter(id__gt=last_id).order_by('id').only('id', 'content')[:1000])
+        if not batch:
+            break
+        for journal in batch:
+            journal.excerpt = Truncator(journal.content).chars(280)
+        Journal.objects.bulk_update(batch, ['excerpt'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Journal', '0006_comment_thread_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journal',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
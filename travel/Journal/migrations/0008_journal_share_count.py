@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_share_counts(apps, schema_editor):
+    Journal = apps.get_model('Journal', 'Journal')
+    SharedJournal = apps.get_model('Journal', 'SharedJournal')
+    last_id = 0
+    while True:
+        # Walk journal ids in chunks so each UPDATE only touches a bounded set of rows
+        batch = list(Journal.objects.filter(id__gt=last_id).order_by('id').only('id', 'share_count')[:1000])
+        if not batch:
+            break
+        counts = dict(
+            SharedJournal.objects.filter(journal_id__in=[journal.id for journal in batch])
+            .values('journal_id').annotate(total=Count('id')).values_list('journal_id', 'total')
+        )
+        shared = [journal for journal in batch if journal.id in counts]
+        for journal in shared:
+            journal.share_count = counts[journal.id]
+        Journal.objects.bulk_update(shared, ['share_count'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Journal', '0007_journal_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journal',
+            name='share_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_share_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Journal', '0008_journal_share_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journal',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='journal_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sharedjournal',
+            index=models.Index(fields=['user', '-created_at', '-journal'], name='share_user_recent_idx'),
+        ),
+    ]
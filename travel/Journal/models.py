@@ -1,23 +1,42 @@
 from django.db import models
+from django.utils.text import Truncator
 from Users.models import CustomUser
+from .scoring import initial_score, rescore_journal
 
 class Journal(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='journals')
     title = models.CharField(max_length=200)
     content = models.TextField()
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)  # Truncated content for card views
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     like_count = models.PositiveIntegerField(default=0)  # Cache for number of likes
     comment_count = models.PositiveIntegerField(default=0)  # Cache for number of comments
+    share_count = models.PositiveIntegerField(default=0)  # Cache for number of shares
+    engagement_score = models.FloatField(default=0)  # Cache for ranking, see Journal.scoring
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-engagement_score', '-id'], name='journal_engagement_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='journal_user_recent_idx'),
+        ]
+
+    EXCERPT_LENGTH = 280
 
     def __str__(self):
         return self.title
 
-    def update_counts(self):
-        """Update cached like and comment counts."""
-        self.like_count = self.likes.count()
-        self.comment_count = self.comments.filter(parent__isnull=True).count()  # Count top-level comments
-        self.save(update_fields=['like_count', 'comment_count'])
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.engagement_score = initial_score(self)
+        if kwargs.get('update_fields') is None:
+            self.excerpt = Truncator(self.content).chars(self.EXCERPT_LENGTH)
+        super().save(*args, **kwargs)
+
+    def update_engagement_score(self):
+        """Re-score from the cached counters after one of them changed."""
+        self.engagement_score = rescore_journal(self)
+        Journal.objects.filter(pk=self.pk).update(engagement_score=self.engagement_score)
 
 class Media(models.Model):
     journal = models.ForeignKey(Journal, on_delete=models.CASCADE, related_name='media')
@@ -45,10 +64,35 @@ class Comment(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Materialized path of zero-padded ids from the thread root down to this comment, so
+    # ordering a journal's comments by path yields the whole thread in depth-first order
+    path = models.TextField(default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    PATH_SEGMENT_WIDTH = 12
+
+    class Meta:
+        indexes = [
+            # text_pattern_ops so the path__startswith (LIKE 'prefix/%') of subtree queries can
+            # use the index under any database collation (PostgreSQL; ignored elsewhere)
+            models.Index(
+                fields=['journal', 'path'], name='comment_thread_idx', opclasses=['int8_ops', 'text_pattern_ops']
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user.email} on {self.journal.title}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and not self.path:
+            # The path needs our own id, so it can only be written after the insert
+            segment = str(self.pk).zfill(self.PATH_SEGMENT_WIDTH)
+            self.path = f"{self.parent.path}/{segment}" if self.parent_id else segment
+            self.depth = self.parent.depth + 1 if self.parent_id else 0
+            Comment.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+
 class SharedJournal(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='shared_journals')
     journal = models.ForeignKey(Journal, on_delete=models.CASCADE, related_name='shares')
@@ -56,6 +100,55 @@ class SharedJournal(models.Model):
 
     class Meta:
         unique_together = ('user', 'journal')  # Prevent multiple shares of the same journal
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-journal'], name='share_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} shared {self.journal.title}"
+
+class FeedEntry(models.Model):
+    """
+    Materialized home-feed row: `journal` was delivered to `user` because
+    `actor` (someone `user` follows) wrote or shared it.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='feed_entries')
+    journal = models.ForeignKey(Journal, on_delete=models.CASCADE, related_name='feed_entries')
+    actor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()  # When the journal was written/shared, not when delivered
+
+    class Meta:
+        unique_together = ('user', 'journal')  # One entry per journal, however many followees reach it
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='feedentry_user_recent_idx'),
+            models.Index(fields=['user', 'actor'], name='feedentry_user_actor_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.user.email} shared {self.journal.title}"
\ No newline at end of file
+        return f"{self.journal.title} in {self.user.email}'s feed"
+
+class EngagementStats(models.Model):
+    """
+    Running normalizers for engagement scoring, one row per scope ('global' is
+    the one Explore and Feed rank by). Maxima only grow on the write path;
+    reconcile_engagement_stats brings them back down.
+    """
+    scope = models.CharField(max_length=64, unique=True)
+    max_likes = models.PositiveIntegerField(default=0)
+    max_comments = models.PositiveIntegerField(default=0)
+    max_shares = models.PositiveIntegerField(default=0)
+    oldest_created_at = models.DateTimeField(null=True, blank=True)
+    reference_at = models.DateTimeField()  # "now" of the last reconciliation, used for recency
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Engagement stats for {self.scope}"
+
+    def as_normalizers(self):
+        return {
+            'max_likes': self.max_likes,
+            'max_comments': self.max_comments,
+            'max_shares': self.max_shares,
+            'oldest': self.oldest_created_at,
+            'reference_at': self.reference_at,
+        }
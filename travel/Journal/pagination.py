@@ -0,0 +1,186 @@
+import base64
+import json
+import math
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import IntegerField, Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a tuple of ordering fields (the last one must be unique).
+
+    The cursor is an opaque token holding the ordering values of the last row on the
+    page, and the next page is fetched with a `WHERE (a, b) < (x, y)` style filter
+    instead of OFFSET. Every page costs the same as the first one and rows inserted
+    between requests cannot shift items across page boundaries.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [self.get_position_value(last, field.lstrip('-')) for field in self.ordering]
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(position)
+        )
+
+    def get_position_value(self, obj, field):
+        value = obj[field] if isinstance(obj, dict) else getattr(obj, field)
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def get_keyset_filter(self, position):
+        # (a, b, c) after (x, y, z) == a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z),
+        # with > flipped to < for descending fields
+        keyset = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            keyset |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return keyset
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset):
+        """
+        The position in a cursor, each value converted by its ordering field. Anything
+        a client may have tampered with (shape, types, ranges) answers 404, never 500.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            position = json.loads(raw)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                self.to_position_value(queryset, field, value)
+                for field, value in zip(self.get_ordering_fields(queryset), position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_ordering_fields(self, queryset):
+        # Ordering fields are model fields or annotations (e.g. the UNION branches' aliases)
+        fields = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            annotation = queryset.query.annotations.get(name)
+            fields.append(annotation.output_field if annotation is not None else queryset.model._meta.get_field(name))
+        return fields
+
+    def to_position_value(self, queryset, field, value):
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError(value)
+        value = field.to_python(value)
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(value)
+        if isinstance(value, datetime) and timezone.is_naive(value):
+            raise ValueError(value)  # Cursors carry the offset they were written with
+        if isinstance(field, IntegerField):
+            low, high = connections[queryset.db].ops.integer_field_range(field.get_internal_type())
+            if (low is not None and value < low) or (high is not None and value > high):
+                raise ValueError(value)
+        return value
+
+class UnionKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination over the UNION ALL of several querysets (e.g. `.values()` of
+    different models) that expose the ordering fields under the same names.
+
+    Each branch gets the cursor filter, its own ORDER BY and a LIMIT before the
+    union, so each can be answered from its own index and the outer sort only
+    merges a few pages' worth of rows.
+    """
+
+    def paginate_queryset(self, querysets, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, querysets[0])
+
+        branches = []
+        for queryset in querysets:
+            if position is not None:
+                queryset = queryset.filter(self.get_keyset_filter(position))
+            if connections[queryset.db].features.supports_slicing_ordering_in_compound:
+                queryset = queryset.order_by(*self.ordering)[:self.page_size + 1]
+            else:  # SQLite cannot LIMIT inside a compound statement; the outer LIMIT still applies
+                queryset = queryset.order_by()
+            branches.append(queryset)
+
+        combined = branches[0].union(*branches[1:], all=True).order_by(*self.ordering)
+        results = list(combined[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+class RecentCursorPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+class EngagementCursorPagination(KeysetPagination):
+    ordering = ('-engagement_score', '-id')
+
+class ProfileTimelinePagination(UnionKeysetPagination):
+    ordering = ('-display_date', '-journal_ref', '-via_share')  # via_share tells apart sharing one's own journal
+
+class SharedTimelinePagination(KeysetPagination):
+    ordering = ('-shared_at', '-id')
+
+class ThreadCursorPagination(KeysetPagination):
+    ordering = ('created_at', 'id')  # Oldest first, like a conversation
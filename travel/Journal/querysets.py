@@ -1,46 +1,102 @@
-from django.db.models import F, FloatField, Count, Max, Min, ExpressionWrapper, DurationField
-from django.db.models.functions import Now, Greatest, Extract
-from django.utils import timezone
-
-def with_engagement_scores(queryset, max_counts=None, time_span_days=1):
-    if not max_counts:
-        # Use existing like_count and comment_count; calculate max for normalization
-        max_counts = queryset.aggregate(
-            max_likes=Max('like_count'),
-            max_comments=Max('comment_count'),
-            max_shares=Max('annotated_share_count')  # Use annotated share count
-        )
-
-    oldest_created = queryset.aggregate(oldest=Min('created_at'))['oldest']
-    time_span_days = (timezone.now() - oldest_created).days if oldest_created else 1
-
-    return queryset.annotate(
-        # Convert interval to seconds using EXTRACT(EPOCH FROM ...)
-        recency_seconds=ExpressionWrapper(
-            Extract(Now() - F('created_at'), 'epoch'),
-            output_field=FloatField()
-        ),
-        normalized_recency=ExpressionWrapper(
-            1 - (F('recency_seconds') / (time_span_days * 86400.0)),
-            output_field=FloatField()
-        ),
-        normalized_likes=ExpressionWrapper(
-            F('like_count') / Greatest(max_counts['max_likes'] or 1, 1),
-            output_field=FloatField()
-        ),
-        normalized_comments=ExpressionWrapper(
-            F('comment_count') / Greatest(max_counts['max_comments'] or 1, 1),
-            output_field=FloatField()
-        ),
-        normalized_shares=ExpressionWrapper(
-            F('annotated_share_count') / Greatest(max_counts['max_shares'] or 1, 1),
-            output_field=FloatField()
-        ),
-        engagement_score=ExpressionWrapper(
-            0.5 * F('normalized_recency') +
-            0.1667 * F('normalized_likes') +
-            0.1667 * F('normalized_comments') +
-            0.1667 * F('normalized_shares'),
-            output_field=FloatField()
-        )
-    )
\ No newline at end of file
+from django.db.models import F, Count, Q, Window, Value, IntegerField
+from django.db.models.functions import RowNumber
+from Users.utils import follow_graph
+from .models import Comment, Journal, SharedJournal
+
+def profile_timeline_branches(user):
+    """
+    The two halves of a user's profile timeline, for a UNION ALL: journals they
+    wrote (at created_at) and journals they shared (at the share's created_at),
+    as (display_date, journal_ref, via_share) rows.
+    """
+    owned = Journal.objects.filter(user=user).annotate(
+        display_date=F('created_at'), journal_ref=F('id'), via_share=Value(0, output_field=IntegerField())
+    )
+    shared = SharedJournal.objects.filter(user=user).annotate(
+        display_date=F('created_at'), journal_ref=F('journal_id'), via_share=Value(1, output_field=IntegerField())
+    )
+    fields = ('display_date', 'journal_ref', 'via_share')
+    return [owned.values(*fields), shared.values(*fields)]
+
+def comment_thread(roots, max_depth):
+    """
+    The replies under each of `roots`, down to `max_depth` levels below it, in
+    depth-first order with authors joined and reply counts annotated, as a single
+    query over the (journal, path) index.
+    """
+    subtrees = Q()
+    for root in roots:
+        subtrees |= Q(path__startswith=f"{root.path}/", depth__lte=root.depth + max_depth)
+    return with_reply_counts(
+        Comment.objects.filter(journal_id__in={root.journal_id for root in roots}).filter(subtrees)
+    ).select_related('user').order_by('path')
+
+def build_comment_tree(comments):
+    """
+    Group already-fetched comments by parent in one pass. Returns the top-level
+    comments and a {parent_id: [replies]} map that CommentSerializer reads from.
+    """
+    roots, children = [], {}
+    ids = {comment.id for comment in comments}
+    for comment in comments:
+        if comment.parent_id in ids:
+            children.setdefault(comment.parent_id, []).append(comment)
+        else:
+            roots.append(comment)
+    return roots, children
+
+def with_reply_counts(queryset):
+    return queryset.annotate(reply_count=Count('replies'))
+
+def expand_replies(roots, depth):
+    """
+    Fetch up to `depth` levels of replies under each of `roots` in one query and
+    return the {parent_id: [replies]} map CommentSerializer reads from.
+    """
+    if depth <= 0 or not roots:
+        return {}
+    _, children = build_comment_tree([*roots, *comment_thread(roots, depth)])
+    return children
+
+def comment_previews(journal_ids, size):
+    """
+    The first `size` top-level comments of each journal (with reply counts, without
+    replies) for list payloads, in two queries whatever the number of journals.
+    """
+    ranked = Comment.objects.filter(journal_id__in=journal_ids, parent__isnull=True).annotate(
+        position=Window(RowNumber(), partition_by=F('journal_id'), order_by=F('path').asc())
+    ).filter(position__lte=size).select_related('user').order_by('journal_id', 'path')
+    comments = list(ranked)
+    reply_counts = dict(
+        Comment.objects.filter(parent_id__in=[comment.id for comment in comments])
+        .values('parent_id').annotate(total=Count('id')).values_list('parent_id', 'total')
+    )
+    previews = {}
+    for comment in comments:
+        comment.reply_count = reply_counts.get(comment.id, 0)
+        previews.setdefault(comment.journal_id, []).append(comment)
+    return previews
+
+def shape_journal_queryset(queryset, field_names):
+    """Join, prefetch or defer only what the requested journal fields will read."""
+    if 'user' in field_names:
+        queryset = queryset.select_related('user')
+    if 'media' in field_names:
+        queryset = queryset.prefetch_related('media')
+    if 'content' not in field_names:
+        queryset = queryset.defer('content')
+    return queryset
+
+def followee_shares(journal_ids, user_id):
+    """
+    {journal_id: newest share by someone `user_id` follows} for the given journals.
+    Fetches the shares of these journals only and tests the sharers against the
+    cached follow graph, so the query does not grow with the user's followees.
+    """
+    following = follow_graph.following(user_id)
+    latest = {}
+    shares = SharedJournal.objects.filter(journal_id__in=journal_ids).select_related('user').order_by('-created_at', '-id')
+    for share in shares:
+        if share.journal_id not in latest and follow_graph.contains(following, share.user_id):
+            latest[share.journal_id] = share
+    return latest
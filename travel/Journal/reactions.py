@@ -0,0 +1,94 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from . import counters, feed, versions
+from .models import Journal, Like, SharedJournal
+
+# Likes and shares written here skip the ORM (and so the model signals): each one is a
+# single INSERT ... ON CONFLICT DO NOTHING / DELETE ... RETURNING, and the counter and
+# feed side effects are applied explicitly for the rows that actually changed.
+
+def _insert_missing(model, user_id, journal_ids, created_at):
+    """Insert (user, journal) rows that do not exist yet; return the journal ids inserted."""
+    if not journal_ids:
+        return []
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(journal_ids))
+    # Selecting from the journal table skips ids of journals that do not exist
+    sql = (
+        f"INSERT INTO {qn(model._meta.db_table)} ({qn('user_id')}, {qn('journal_id')}, {qn('created_at')}) "
+        f"SELECT %s, {qn('id')}, %s FROM {qn(Journal._meta.db_table)} WHERE {qn('id')} IN ({placeholders}) "
+        f"ON CONFLICT ({qn('user_id')}, {qn('journal_id')}) DO NOTHING "
+        f"RETURNING {qn('journal_id')}"
+    )
+    params = [user_id, connection.ops.adapt_datetimefield_value(created_at), *journal_ids]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+def _delete_existing(model, user_id, journal_ids):
+    """Delete the user's rows for these journals; return the journal ids deleted."""
+    if not journal_ids:
+        return []
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(journal_ids))
+    sql = (
+        f"DELETE FROM {qn(model._meta.db_table)} "
+        f"WHERE {qn('user_id')} = %s AND {qn('journal_id')} IN ({placeholders}) "
+        f"RETURNING {qn('journal_id')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, *journal_ids])
+        return [row[0] for row in cursor.fetchall()]
+
+@transaction.atomic
+def like(user_id, journal_id):
+    """Like a journal; True if a like was added, False if it was already liked."""
+    added = _insert_missing(Like, user_id, [journal_id], timezone.now())
+    if added:
+        counters.adjust_counts(journal_id, likes=1)
+        versions.bump(versions.viewer_scope(user_id))
+    return bool(added)
+
+@transaction.atomic
+def unlike(user_id, journal_id):
+    """Remove a like; True if one was removed."""
+    removed = _delete_existing(Like, user_id, [journal_id])
+    if removed:
+        counters.adjust_counts(journal_id, likes=-1)
+        versions.bump(versions.viewer_scope(user_id))
+    return bool(removed)
+
+@transaction.atomic
+def share(user_id, journal_id):
+    """Share a journal to the user's followers; True if a share was added."""
+    created_at = timezone.now()
+    added = _insert_missing(SharedJournal, user_id, [journal_id], created_at)
+    if added:
+        counters.adjust_counts(journal_id, shares=1)
+        feed.fan_out(journal_id, user_id, created_at)
+        versions.bump(versions.viewer_scope(user_id))
+    return bool(added)
+
+@transaction.atomic
+def unshare(user_id, journal_id):
+    """Remove a share and what it delivered to followers' feeds; True if one was removed."""
+    removed = _delete_existing(SharedJournal, user_id, [journal_id])
+    if removed:
+        counters.adjust_counts(journal_id, shares=-1)
+        feed.retract_share(journal_id, user_id)
+        versions.bump(versions.viewer_scope(user_id))
+    return bool(removed)
+
+@transaction.atomic
+def toggle_likes(user_id, toggles):
+    """
+    Apply {journal_id: liked} for one user with one INSERT and one DELETE, then one
+    counter update for all journals whose like actually changed. Returns the journal
+    ids that were liked and unliked. Unknown journal ids are ignored.
+    """
+    liked = _insert_missing(Like, user_id, [pk for pk, value in toggles.items() if value], timezone.now())
+    unliked = _delete_existing(Like, user_id, [pk for pk, value in toggles.items() if not value])
+    counters.adjust_many('likes', {**dict.fromkeys(liked, 1), **dict.fromkeys(unliked, -1)})
+    if liked or unliked:
+        versions.bump(versions.viewer_scope(user_id))
+    return liked, unliked
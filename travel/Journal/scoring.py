@@ -0,0 +1,123 @@
+from django.db.models import F, Max, Min, PositiveIntegerField, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+RECENCY_WEIGHT = 0.5
+LIKES_WEIGHT = 0.1667
+COMMENTS_WEIGHT = 0.1667
+SHARES_WEIGHT = 0.1667
+
+GLOBAL_SCOPE = 'global'
+
+def get_normalizers(scope=GLOBAL_SCOPE):
+    """Read the stored normalizers for a scope (one indexed lookup, no aggregates)."""
+    from .models import EngagementStats  # Local import, models import this module
+
+    stats = EngagementStats.objects.filter(scope=scope).first()
+    if stats is None:
+        return {'max_likes': 0, 'max_comments': 0, 'max_shares': 0, 'oldest': None, 'reference_at': timezone.now()}
+    return stats.as_normalizers()
+
+def _raise_to(field, value):
+    return Greatest(F(field), Value(value), output_field=PositiveIntegerField())
+
+def observe_new_journal(journal):
+    """Make sure the global stats row exists and knows about the oldest journal."""
+    from .models import EngagementStats
+
+    EngagementStats.objects.bulk_create(
+        [EngagementStats(scope=GLOBAL_SCOPE, reference_at=journal.created_at)], ignore_conflicts=True,
+    )
+    EngagementStats.objects.filter(scope=GLOBAL_SCOPE).update(
+        oldest_created_at=Coalesce('oldest_created_at', Value(journal.created_at))
+    )
+
+def observe_counts(*journals):
+    """O(1) write-path update: raise the global maxima to the journals' counters."""
+    from .models import EngagementStats
+
+    EngagementStats.objects.filter(scope=GLOBAL_SCOPE).update(
+        max_likes=_raise_to('max_likes', max(journal.like_count for journal in journals)),
+        max_comments=_raise_to('max_comments', max(journal.comment_count for journal in journals)),
+        max_shares=_raise_to('max_shares', max(journal.share_count for journal in journals)),
+    )
+
+def reconcile_stats():
+    """
+    Recompute the global stats row from the journals table in one aggregate. This
+    is the only place maxima go down (after unlikes/deletes) and where the recency
+    reference time moves forward.
+    """
+    from .models import EngagementStats, Journal
+
+    totals = Journal.objects.aggregate(
+        max_likes=Max('like_count'),
+        max_comments=Max('comment_count'),
+        max_shares=Max('share_count'),
+        oldest_created_at=Min('created_at'),
+    )
+    EngagementStats.objects.update_or_create(
+        scope=GLOBAL_SCOPE,
+        defaults={
+            'max_likes': totals['max_likes'] or 0,
+            'max_comments': totals['max_comments'] or 0,
+            'max_shares': totals['max_shares'] or 0,
+            'oldest_created_at': totals['oldest_created_at'],
+            'reference_at': timezone.now(),
+        },
+    )
+
+def _ratio(value, maximum):
+    # Counters can outgrow a cached maximum between recomputes; cap the term at 1
+    return min(value / max(maximum or 1, 1), 1.0)
+
+def engagement_score(like_count, comment_count, share_count, created_at, normalizers):
+    """
+    Score a journal from its counters. Recency is measured against the
+    normalizers' reference time rather than now(), so scores written
+    incrementally stay comparable with the last bulk recompute.
+    """
+    reference_at = normalizers['reference_at']
+    oldest = normalizers['oldest'] or reference_at
+    span = max((reference_at - oldest).total_seconds(), 86400.0)
+    age = (reference_at - (created_at or reference_at)).total_seconds()
+    recency = min(max(1 - age / span, 0.0), 1.0)
+
+    return (
+        RECENCY_WEIGHT * recency +
+        LIKES_WEIGHT * _ratio(like_count, normalizers['max_likes']) +
+        COMMENTS_WEIGHT * _ratio(comment_count, normalizers['max_comments']) +
+        SHARES_WEIGHT * _ratio(share_count, normalizers['max_shares'])
+    )
+
+def score_journal(journal, normalizers=None):
+    return engagement_score(
+        journal.like_count, journal.comment_count, journal.share_count, journal.created_at,
+        normalizers or get_normalizers(),
+    )
+
+def initial_score(journal):
+    """
+    Score of a journal being created, without reading the stored normalizers: it is
+    as recent as it gets, and its counters (normally all zero) count in full.
+    """
+    now = timezone.now()
+    normalizers = {'max_likes': 0, 'max_comments': 0, 'max_shares': 0, 'oldest': None, 'reference_at': now}
+    return engagement_score(journal.like_count, journal.comment_count, journal.share_count, None, normalizers)
+
+def rescore_journal(journal):
+    """Write-path scoring: fold the journal's counters into the running stats, then score it."""
+    observe_counts(journal)
+    return score_journal(journal)
+
+def rescore_journals(journals):
+    """rescore_journal() for many journals: one stats update, one read and one bulk UPDATE of the scores."""
+    from .models import Journal
+
+    if not journals:
+        return
+    observe_counts(*journals)
+    normalizers = get_normalizers()
+    for journal in journals:
+        journal.engagement_score = score_journal(journal, normalizers)
+    Journal.objects.bulk_update(journals, ['engagement_score'])
@@ -1,11 +1,50 @@
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 from django.contrib.auth import get_user_model
+from django.db import models
 from .models import Journal, Media, Like, Comment, SharedJournal
-from Users.models import Follow
+from .querysets import comment_previews, followee_shares
 
 User = get_user_model()
 
+COMMENT_PREVIEW_SIZE = 3  # Top-level comments embedded in each journal of a list
+
+def split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+class SparseFieldsetMixin:
+    """
+    `?fields=a,b` trims the representation to the listed fields; `?expand=x,y`
+    adds fields from Meta.expandable_fields, which are left out by default.
+    Names the representation does not have answer 400. Write-only fields are
+    always kept so input handling is unaffected.
+    """
+
+    @classmethod
+    def resolve_field_names(cls, query_params):
+        declared = list(cls.Meta.fields)
+        expandable = set(getattr(cls.Meta, 'expandable_fields', ()))
+        requested = split_param(query_params.get('fields'))
+        expand = split_param(query_params.get('expand'))
+        errors = {}
+        if requested - set(declared):
+            errors['fields'] = f"Unknown fields: {', '.join(sorted(requested - set(declared)))}"
+        if expand - expandable:
+            errors['expand'] = f"Not expandable: {', '.join(sorted(expand - expandable))}"
+        if errors:
+            raise serializers.ValidationError(errors)
+        if requested:
+            return [name for name in declared if name in requested or name == 'id']
+        return [name for name in declared if name not in expandable or name in expand]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return fields
+        keep = set(self.resolve_field_names(request.query_params))
+        return {name: field for name, field in fields.items() if name in keep or field.write_only}
+
 class PublicUserSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
 
@@ -35,6 +74,17 @@ class LikeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("User has already liked this journal")
         return data
 
+class LikeToggleSerializer(serializers.Serializer):
+    journal = serializers.IntegerField()
+    liked = serializers.BooleanField()
+
+class LikeBatchSerializer(serializers.Serializer):
+    toggles = LikeToggleSerializer(many=True, allow_empty=False, max_length=100)
+
+    def validate_toggles(self, toggles):
+        # The last toggle of a journal wins, like applying them one by one would
+        return {toggle['journal']: toggle['liked'] for toggle in toggles}
+
 class CommentSerializer(serializers.ModelSerializer):
     user = PublicUserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
@@ -45,8 +95,20 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at', 'updated_at']
 
     def get_replies(self, obj):
-        replies = obj.replies.all()
-        return CommentSerializer(replies, many=True, context=self.context).data
+        # A thread assembled by build_comment_tree passes its {parent_id: replies} map in the context
+        children = self.context.get('comment_children')
+        if children is not None:
+            replies = children.get(obj.id, [])
+        else:
+            replies = obj.replies.select_related('user')
+        return self.__class__(replies, many=True, context=self.context).data
+
+class ThreadCommentSerializer(CommentSerializer):
+    """Comment with its number of direct replies, so clients know what can be expanded."""
+    reply_count = serializers.IntegerField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['reply_count']
 
 class SharedJournalSerializer(serializers.ModelSerializer):
     user = PublicUserSerializer(read_only=True)
@@ -63,7 +125,41 @@ class SharedJournalSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("User has already shared this journal")
         return data
 
-class JournalSerializer(serializers.ModelSerializer):
+class JournalListSerializer(serializers.ListSerializer):
+    """
+    Loads everything the rows need from other tables (viewer likes, followee
+    shares, comment previews) for the whole list in a constant
+    number of queries, instead of each row querying for them.
+    """
+
+    def to_representation(self, data):
+        journals = list(data.all() if isinstance(data, models.Manager) else data)
+        self.page_state = self.load_page_state(journals)
+        return super().to_representation(journals)
+
+    def load_page_state(self, journals):
+        # Only load what the (possibly sparse) child representation will read
+        fields = self.child.fields
+        state = {'liked_ids': set(), 'latest_shares': {}, 'comment_previews': {}}
+        if not journals:
+            return state
+
+        journal_ids = [journal.id for journal in journals]
+        if 'comments' in fields:
+            state['comment_previews'] = comment_previews(journal_ids, COMMENT_PREVIEW_SIZE)
+
+        request = self.context.get('request')
+        if not (request and request.user.is_authenticated):
+            return state
+        if 'is_liked' in fields:
+            state['liked_ids'] = set(
+                Like.objects.filter(user=request.user, journal_id__in=journal_ids).values_list('journal_id', flat=True)
+            )
+        if 'is_shared' in fields or 'shared_by' in fields:
+            state['latest_shares'] = followee_shares(journal_ids, request.user.id)
+        return state
+
+class JournalSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     media = MediaSerializer(many=True, read_only=True)
     media_files = serializers.ListField(
         child=serializers.FileField(),
@@ -80,8 +176,8 @@ class JournalSerializer(serializers.ModelSerializer):
     like_count = serializers.IntegerField(read_only=True)
     comment_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
-    comments = CommentSerializer(many=True, read_only=True)
-    shares = SharedJournalSerializer(many=True, read_only=True)
+    share_count = serializers.IntegerField(read_only=True)
+    comments = serializers.SerializerMethodField()  # First few top-level comments, see journal-comments
     is_shared = serializers.SerializerMethodField()
     shared_by = serializers.SerializerMethodField()
 
@@ -90,37 +186,60 @@ class JournalSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'content', 'created_at', 'updated_at',
             'media', 'media_files', 'delete_media_ids', 'user',
-            'like_count', 'comment_count', 'is_liked', 'comments', 'shares',
+            'like_count', 'comment_count', 'share_count', 'is_liked', 'comments',
             'is_shared', 'shared_by'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'like_count', 'comment_count']
+        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'like_count', 'comment_count', 'share_count']
+        list_serializer_class = JournalListSerializer
+
+    def get_page_state(self):
+        # Preloaded by JournalListSerializer when serializing many journals
+        return getattr(self.parent, 'page_state', None)
 
     def get_is_liked(self, obj):
+        page_state = self.get_page_state()
+        if page_state is not None:
+            return obj.id in page_state['liked_ids']
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Like.objects.filter(user=request.user, journal=obj).exists()
         return False
 
+    def get_comments(self, obj):
+        page_state = self.get_page_state()
+        if page_state is not None:
+            preview = page_state['comment_previews'].get(obj.id, [])
+        else:
+            preview = comment_previews([obj.id], COMMENT_PREVIEW_SIZE).get(obj.id, [])
+        # Replies are not embedded; clients expand them through the comment endpoints
+        context = {**self.context, 'comment_children': {}}
+        return ThreadCommentSerializer(preview, many=True, context=context).data
+
     def get_is_shared(self, obj):
+        page_state = self.get_page_state()
+        if page_state is not None:
+            return obj.id in page_state['latest_shares']
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return SharedJournal.objects.filter(
-                journal=obj,
-                user__in=Follow.objects.filter(follower=request.user).values_list('followed', flat=True)
-            ).exists()
+            return self.get_followee_share(obj, request.user) is not None
         return False
 
     def get_shared_by(self, obj):
+        page_state = self.get_page_state()
+        if page_state is not None:
+            share = page_state['latest_shares'].get(obj.id)
+            return PublicUserSerializer(share.user, context=self.context).data if share else None
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            shared_by = SharedJournal.objects.filter(
-                journal=obj,
-                user__in=Follow.objects.filter(follower=request.user).values_list('followed', flat=True)
-            ).order_by('-created_at').first()
+            shared_by = self.get_followee_share(obj, request.user)
             if shared_by:
                 return PublicUserSerializer(shared_by.user, context=self.context).data
         return None
 
+    def get_followee_share(self, obj, user):
+        # Newest share of the journal by someone the user follows
+        return followee_shares([obj.id], user.id).get(obj.id)
+
     def validate_media_files(self, value):
         if len(value) > 20:
             raise serializers.ValidationError("Cannot upload more than 20 media files")
@@ -150,4 +269,25 @@ class JournalSerializer(serializers.ModelSerializer):
         for file in media_files:
             Media.objects.create(journal=instance, file=file)
 
-        return instance
\ No newline at end of file
+        return instance
+
+class JournalCardSerializer(JournalSerializer):
+    """
+    Compact, read-only journal for grid/card lists: a stored excerpt instead of
+    the content and no nested media or comments unless asked for with `?expand=`.
+    """
+
+    class Meta(JournalSerializer.Meta):
+        fields = [
+            'id', 'title', 'excerpt', 'created_at', 'user',
+            'like_count', 'comment_count', 'share_count', 'is_liked',
+            'content', 'media', 'comments', 'is_shared', 'shared_by',
+        ]
+        expandable_fields = ['content', 'media', 'comments', 'is_shared', 'shared_by']
+        read_only_fields = fields
+
+def journal_serializer_class(request):
+    """`?view=card` selects the compact representation for GET requests."""
+    if request.method == 'GET' and request.query_params.get('view') == 'card':
+        return JournalCardSerializer
+    return JournalSerializer
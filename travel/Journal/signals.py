@@ -1,11 +1,93 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Like, Comment
+from Users.models import Follow
+from travel.metrics import timed_signal_handler
+from .models import Journal, Like, Comment, SharedJournal
+from . import counters, feed, scoring, versions
 
-@receiver([post_save, post_delete], sender=Like)
-def update_like_count(sender, instance, **kwargs):
-    instance.journal.update_counts()
+# Every handler is timed into signal_handler_duration_seconds (see travel.metrics).
+# Counters only move on create/delete; edits to a comment leave them alone.
+@receiver(post_save, sender=Like)
+@timed_signal_handler
+def count_new_like(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust_counts(instance.journal_id, likes=1)
+
+@receiver(post_delete, sender=Like)
+@timed_signal_handler
+def count_deleted_like(sender, instance, origin=None, **kwargs):
+    if not counters.journal_deleted(origin):
+        counters.adjust_counts(instance.journal_id, likes=-1)
+
+@receiver(post_save, sender=Comment)
+@timed_signal_handler
+def count_new_comment(sender, instance, created, **kwargs):
+    if created and instance.parent_id is None:  # comment_count only covers top-level comments
+        counters.adjust_counts(instance.journal_id, comments=1)
+
+@receiver(post_delete, sender=Comment)
+@timed_signal_handler
+def count_deleted_comment(sender, instance, origin=None, **kwargs):
+    if instance.parent_id is None and not counters.journal_deleted(origin):
+        counters.adjust_counts(instance.journal_id, comments=-1)
+
+@receiver(post_save, sender=SharedJournal)
+@timed_signal_handler
+def count_new_share(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust_counts(instance.journal_id, shares=1)
+
+@receiver(post_delete, sender=SharedJournal)
+@timed_signal_handler
+def count_deleted_share(sender, instance, origin=None, **kwargs):
+    # Also runs for shares cascading from a deleted user
+    if not counters.journal_deleted(origin):
+        counters.adjust_counts(instance.journal_id, shares=-1)
+
+@receiver(post_save, sender=Journal)
+@timed_signal_handler
+def observe_new_journal(sender, instance, created, **kwargs):
+    if created:
+        scoring.observe_new_journal(instance)
 
+@receiver(post_save, sender=Journal)
+@timed_signal_handler
+def fan_out_journal(sender, instance, created, **kwargs):
+    if created:
+        feed.fan_out(instance.id, instance.user_id, instance.created_at)
+
+@receiver(post_save, sender=SharedJournal)
+@timed_signal_handler
+def fan_out_share(sender, instance, created, **kwargs):
+    if created:
+        feed.fan_out(instance.journal_id, instance.user_id, instance.created_at)
+
+@receiver(post_delete, sender=SharedJournal)
+@timed_signal_handler
+def retract_share(sender, instance, origin=None, **kwargs):
+    if feed.deleted_directly(SharedJournal, origin):
+        feed.retract_share(instance.journal_id, instance.user_id)
+
+@receiver(post_save, sender=Follow)
+@timed_signal_handler
+def backfill_feed(sender, instance, created, **kwargs):
+    if created:
+        feed.backfill(instance.follower_id, [instance.followed_id])
+
+@receiver(post_delete, sender=Follow)
+@timed_signal_handler
+def trim_feed(sender, instance, origin=None, **kwargs):
+    if feed.deleted_directly(Follow, origin):
+        feed.trim(instance.follower_id, [instance.followed_id])
+
+# Version stamps for conditional GETs (see Journal.conditional)
 @receiver([post_save, post_delete], sender=Comment)
-def update_comment_count(sender, instance, **kwargs):
-    instance.journal.update_counts()
\ No newline at end of file
+@timed_signal_handler
+def bump_thread_version(sender, instance, **kwargs):
+    versions.bump(versions.journal_scope(instance.journal_id))  # Edits and replies too, not just counted comments
+
+@receiver([post_save, post_delete], sender=Like)
+@receiver([post_save, post_delete], sender=SharedJournal)
+@timed_signal_handler
+def bump_viewer_version(sender, instance, **kwargs):
+    versions.bump(versions.viewer_scope(instance.user_id))
@@ -1,3 +1,552 @@
+from io import StringIO
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+from Journal import counters, reactions, scoring, versions
+from Journal.models import Comment, FeedEntry, Journal, Like, SharedJournal
+from Journal.pagination import KeysetPagination
+from Users.models import CustomUser, Follow
+from travel.testing import EndpointBenchmarkMixin, make_user, seed_dataset
 
-# Create your tests here.
+class FeedTests(TestCase):
+    """Fan-out on write of the home feed (Journal.feed) through the model signals and reactions."""
+
+    def setUp(self):
+        cache.clear()
+        self.reader, self.author, self.sharer = make_user('reader'), make_user('author'), make_user('sharer')
+
+    def follow(self, follower, followed):
+        with self.captureOnCommitCallbacks(execute=True):  # Follow-graph invalidation runs on commit
+            return Follow.objects.create(follower=follower, followed=followed)
+
+    def unfollow(self, follow):
+        with self.captureOnCommitCallbacks(execute=True):
+            follow.delete()
+
+    def feed(self, user):
+        return dict(FeedEntry.objects.filter(user=user).values_list('journal_id', 'actor_id'))
+
+    def test_new_journal_reaches_followers_only(self):
+        self.follow(self.reader, self.author)
+        journal = Journal.objects.create(user=self.author, title='Lisbon', content='Trams')
+        self.assertEqual(self.feed(self.reader), {journal.id: self.author.id})
+        self.assertEqual(self.feed(self.sharer), {})
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        journal = Journal.objects.create(user=self.author, title='Lisbon', content='Trams')
+        follow = self.follow(self.reader, self.author)
+        self.assertEqual(self.feed(self.reader), {journal.id: self.author.id})
+        self.unfollow(follow)
+        self.assertEqual(self.feed(self.reader), {})
+
+    def test_unfollow_redelivers_through_another_followee(self):
+        journal = Journal.objects.create(user=self.author, title='Lisbon', content='Trams')
+        follow = self.follow(self.reader, self.author)
+        self.follow(self.reader, self.sharer)
+        SharedJournal.objects.create(user=self.sharer, journal=journal)
+        self.assertEqual(self.feed(self.reader), {journal.id: self.author.id})  # One entry however it arrives
+
+        self.unfollow(follow)
+        self.assertEqual(self.feed(self.reader), {journal.id: self.sharer.id})
+
+    def test_unshare_retracts_and_redelivers(self):
+        journal = Journal.objects.create(user=self.author, title='Lisbon', content='Trams')
+        self.follow(self.reader, self.sharer)
+        reactions.share(self.sharer.id, journal.id)
+        self.assertEqual(self.feed(self.reader), {journal.id: self.sharer.id})
+        reactions.unshare(self.sharer.id, journal.id)
+        self.assertEqual(self.feed(self.reader), {})
+
+        # Shared again, then the reader follows the author too: the entry stays the sharer's
+        # until the share goes, and is then delivered again as the author's
+        reactions.share(self.sharer.id, journal.id)
+        self.follow(self.reader, self.author)
+        self.assertEqual(self.feed(self.reader), {journal.id: self.sharer.id})
+        reactions.unshare(self.sharer.id, journal.id)
+        self.assertEqual(self.feed(self.reader), {journal.id: self.author.id})
+
+    def test_deleted_share_and_journal_leave_no_entries(self):
+        journal = Journal.objects.create(user=self.author, title='Lisbon', content='Trams')
+        self.follow(self.reader, self.sharer)
+        SharedJournal.objects.create(user=self.sharer, journal=journal)
+        journal.delete()  # Cascades to the share without redelivering
+        self.assertEqual(self.feed(self.reader), {})
+
+    def test_endpoint_lists_the_feed_newest_first(self):
+        self.follow(self.reader, self.author)
+        self.follow(self.reader, self.sharer)
+        older, newer = (Journal.objects.create(user=self.author, title=title, content='Road') for title in ('Porto', 'Faro'))
+        own = Journal.objects.create(user=self.sharer, title='Own', content='Road')
+        shared = Journal.objects.create(user=make_user('stranger'), title='Braga', content='Road')
+        SharedJournal.objects.create(user=self.sharer, journal=shared)
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        response = client.get('/api/Journal/journals/feed/?fields=id,shared_by')
+        self.assertEqual(
+            [journal['id'] for journal in response.data['results']],
+            [shared.id, own.id, newer.id, older.id],
+        )
+        self.assertEqual(response.data['results'][0]['shared_by']['id'], self.sharer.id)
+
+    @skipUnless(connection.vendor == 'sqlite', "Plan text is SQLite's")
+    def test_page_is_a_range_scan_of_the_feed_index(self):
+        plan = (
+            FeedEntry.objects.filter(user=self.reader).order_by('-created_at', '-id')
+            .values('id', 'created_at', 'journal_id')[:21].explain()
+        )
+        self.assertIn('USING INDEX feedentry_user_recent_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)  # No sort step
+
+class CounterTests(TestCase):
+    """like_count, comment_count and share_count kept by F() updates (Journal.counters)."""
+
+    def setUp(self):
+        cache.clear()
+        self.author, self.reader = make_user('author'), make_user('reader')
+        self.journal = Journal.objects.create(user=self.author, title='Lisbon', content='Trams')
+
+    def counts(self):
+        self.journal.refresh_from_db()
+        return self.journal.like_count, self.journal.comment_count, self.journal.share_count
+
+    def test_signals_count_top_level_comments_likes_and_shares(self):
+        Like.objects.create(user=self.reader, journal=self.journal)
+        comment = Comment.objects.create(user=self.reader, journal=self.journal, content='Nice')
+        Comment.objects.create(user=self.author, journal=self.journal, parent=comment, content='Thanks')
+        SharedJournal.objects.create(user=self.reader, journal=self.journal)
+        self.assertEqual(self.counts(), (1, 1, 1))
+
+        comment.delete()  # Takes its reply along, which was never counted
+        self.assertEqual(self.counts(), (1, 0, 1))
+
+    def test_counters_never_go_below_zero(self):
+        counters.adjust_counts(self.journal.id, likes=1, comments=2)
+        counters.adjust_counts(self.journal.id, likes=-3, comments=-1, shares=-1)
+        self.assertEqual(self.counts(), (0, 1, 0))
+
+    def test_deleting_a_journal_skips_the_counter_updates(self):
+        Like.objects.create(user=self.reader, journal=self.journal)
+        Comment.objects.create(user=self.reader, journal=self.journal, content='Nice')
+        SharedJournal.objects.create(user=self.reader, journal=self.journal)
+        with mock.patch.object(counters, 'adjust_counts') as adjust_counts:
+            self.journal.delete()
+        adjust_counts.assert_not_called()
+
+    def test_deleting_a_user_updates_the_journals_they_reacted_to(self):
+        Like.objects.create(user=self.reader, journal=self.journal)
+        Comment.objects.create(user=self.reader, journal=self.journal, content='Nice')
+        SharedJournal.objects.create(user=self.reader, journal=self.journal)
+        self.reader.delete()
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+    def test_share_count_follows_creates_deletes_and_cascades(self):
+        sharers = [make_user(f'sharer{index}') for index in range(3)]
+        for sharer in sharers:
+            SharedJournal.objects.create(user=sharer, journal=self.journal)
+        SharedJournal.objects.create(user=self.author, journal=self.journal)  # Authors may share their own
+        self.assertEqual(self.counts()[2], 4)
+
+        SharedJournal.objects.get(user=sharers[0], journal=self.journal).delete()
+        self.assertEqual(self.counts()[2], 3)
+        SharedJournal.objects.filter(user=sharers[1]).delete()  # Queryset deletes signal per row
+        self.assertEqual(self.counts()[2], 2)
+        sharers[2].delete()  # Cascades to the user's shares
+        self.assertEqual(self.counts()[2], 1)
+
+    def test_reconcile_repairs_rescores_and_invalidates_drifted_journals(self):
+        Like.objects.create(user=self.reader, journal=self.journal)
+        Journal.objects.filter(pk=self.journal.pk).update(like_count=0, engagement_score=0)
+        scope = versions.journal_scope(self.journal.id)
+        stamp = versions.get_stamps([scope])[scope]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_counters', stdout=StringIO())
+
+        self.assertEqual(self.counts(), (1, 0, 0))
+        self.assertGreater(self.journal.engagement_score, 0)
+        self.assertEqual(self.journal.engagement_score, scoring.rescore_journal(self.journal))
+        self.assertNotEqual(versions.get_stamps([scope])[scope], stamp)
+
+class ReactionTests(TestCase):
+    """Idempotent like/share endpoints and the batch like API (Journal.reactions)."""
+
+    def setUp(self):
+        cache.clear()
+        self.author, self.reader = make_user('author'), make_user('reader')
+        self.journals = [
+            Journal.objects.create(user=self.author, title=f'Trip {index}', content='Trams') for index in range(6)
+        ]
+        self.journal = self.journals[0]
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def count(self, field):
+        return Journal.objects.values_list(field, flat=True).get(pk=self.journal.pk)
+
+    def test_put_and_delete_like_are_idempotent(self):
+        url = f'/api/Journal/journals/{self.journal.id}/like/'
+        for _ in range(2):
+            self.assertEqual(self.client.put(url).status_code, 204)
+        self.assertEqual(self.count('like_count'), 1)
+        self.assertEqual(Like.objects.filter(user=self.reader, journal=self.journal).count(), 1)
+        for _ in range(2):
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.count('like_count'), 0)
+        self.assertFalse(Like.objects.filter(user=self.reader).exists())
+
+    def test_put_and_delete_share_are_idempotent(self):
+        url = f'/api/Journal/journals/{self.journal.id}/share/'
+        for _ in range(2):
+            self.assertEqual(self.client.put(url).status_code, 204)
+        self.assertEqual(self.count('share_count'), 1)
+        for _ in range(2):
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.count('share_count'), 0)
+
+    def test_shared_by_is_the_newest_share_by_a_followee(self):
+        older_friend, newer_friend, stranger = make_user('friend1'), make_user('friend2'), make_user('stranger')
+        for sharer in (older_friend, newer_friend, stranger):
+            SharedJournal.objects.create(user=sharer, journal=self.journal)
+        Follow.objects.create(follower=self.reader, followed=older_friend)
+        Follow.objects.create(follower=self.reader, followed=newer_friend)
+        Follow.objects.create(follower=self.author, followed=older_friend)
+
+        response = self.client.get('/api/Journal/journals/explore/?fields=id,is_shared,shared_by')
+        listed = {journal['id']: journal for journal in response.data['results']}
+        self.assertEqual(listed[self.journal.id]['shared_by']['id'], newer_friend.id)
+        self.assertFalse(listed[self.journals[1].id]['is_shared'])
+
+        author = APIClient()
+        author.force_authenticate(self.author)
+        response = author.get(f'/api/Journal/journals/my/{self.journal.id}/')
+        self.assertTrue(response.data['is_shared'])
+        self.assertEqual(response.data['shared_by']['id'], older_friend.id)
+
+    def test_unknown_journal_is_404(self):
+        self.assertEqual(self.client.put('/api/Journal/journals/999999/like/').status_code, 404)
+        self.assertEqual(self.client.delete('/api/Journal/journals/999999/share/').status_code, 404)
+
+    def test_batch_toggles_apply_in_a_fixed_number_of_queries(self):
+        Like.objects.create(user=self.reader, journal=self.journals[5])
+        toggles = [{'journal': journal.id, 'liked': True} for journal in self.journals[:5]]
+        toggles.append({'journal': self.journals[5].id, 'liked': False})
+        # INSERT, DELETE, counters UPDATE, SELECT, stats UPDATE, stats SELECT, scores UPDATE,
+        # inside the savepoint of transaction.atomic
+        with self.assertNumQueries(9):
+            response = self.client.post('/api/Journal/likes/batch/', {'toggles': toggles}, format='json')
+        self.assertEqual(sorted(response.data['liked']), [journal.id for journal in self.journals[:5]])
+        self.assertEqual(response.data['unliked'], [self.journals[5].id])
+        self.assertEqual(
+            list(Journal.objects.order_by('id').values_list('like_count', flat=True)), [1, 1, 1, 1, 1, 0]
+        )
+
+        # Repeating the batch changes nothing
+        response = self.client.post('/api/Journal/likes/batch/', {'toggles': toggles}, format='json')
+        self.assertEqual((response.data['liked'], response.data['unliked']), ([], []))
+
+class CommentThreadTests(TestCase):
+    """Reply expansion of the comment thread endpoints (Journal.querysets.comment_thread)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.journal = Journal.objects.create(user=self.user, title='Lisbon', content='Trams')
+        self.root = Comment.objects.create(user=self.user, journal=self.journal, content='Root')
+        self.reply = Comment.objects.create(user=self.user, journal=self.journal, parent=self.root, content='Reply')
+        self.nested = Comment.objects.create(user=self.user, journal=self.journal, parent=self.reply, content='Nested')
+
+    def test_depth_expands_that_many_levels(self):
+        response = self.client.get(f'/api/Journal/journals/{self.journal.id}/comments/?depth=2')
+        [root] = response.data['results']
+        self.assertEqual(root['reply_count'], 1)
+        [reply] = root['replies']
+        self.assertEqual((reply['id'], reply['reply_count']), (self.reply.id, 1))
+        self.assertEqual([comment['id'] for comment in reply['replies']], [self.nested.id])
+
+        response = self.client.get(f'/api/Journal/journals/{self.journal.id}/comments/?depth=1')
+        self.assertEqual(response.data['results'][0]['replies'][0]['replies'], [])
+
+    def test_replies_endpoint_expands_below_the_page(self):
+        response = self.client.get(f'/api/Journal/comments/{self.root.id}/replies/?depth=1')
+        [reply] = response.data['results']
+        self.assertEqual([comment['id'] for comment in reply['replies']], [self.nested.id])
+
+class PaginationTests(TestCase):
+    """Keyset pagination of the journal lists (Journal.pagination)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.journals = [Journal.objects.create(user=self.user, title=f'Trip {index}', content='Road') for index in range(5)]
+        SharedJournal.objects.create(user=self.user, journal=self.journals[0])
+
+    def walk(self, url):
+        """Ids of every page, following `next` until it runs out."""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            ids += [journal['id'] for journal in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def cursor(self, position):
+        return KeysetPagination().encode_cursor(position)
+
+    def test_pages_break_score_ties_by_id(self):
+        Journal.objects.update(engagement_score=1.5)
+        ids = self.walk('/api/Journal/journals/explore/?page_size=2&fields=id')
+        self.assertEqual(ids, sorted((journal.id for journal in self.journals), reverse=True))
+
+    def test_journals_written_between_pages_do_not_shift_them(self):
+        url = f'/api/Journal/users/{self.user.id}/journals/?page_size=2&fields=id'
+        first = self.client.get(url).data
+        Journal.objects.create(user=self.user, title='Newer', content='Road')
+        rest = self.walk(first['next'])
+        self.assertEqual(
+            [journal['id'] for journal in first['results']] + rest,
+            [journal.id for journal in reversed(self.journals)],
+        )
+
+    def test_profile_timeline_pages_through_both_branches(self):
+        ids = self.walk('/api/Journal/journals/profile/?page_size=2&fields=id')
+        # Five written, the first of them also shared (newest entry, as the share is newer)
+        self.assertEqual(ids, [self.journals[0].id, *(journal.id for journal in reversed(self.journals))])
+
+    def test_profile_timeline_marks_shared_entries(self):
+        share = SharedJournal.objects.get(user=self.user, journal=self.journals[0])
+        results = self.client.get('/api/Journal/journals/profile/?fields=id,created_at').data['results']
+        own_journal = [
+            (entry['via_share'], entry['shared_at'] and parse_datetime(entry['shared_at']))
+            for entry in results if entry['id'] == self.journals[0].id
+        ]
+        # Sharing one's own journal lists it twice: the share (newest) and the original post
+        self.assertEqual(own_journal, [(True, share.created_at), (False, None)])
+        self.assertEqual(sum(entry['via_share'] for entry in results), 1)
+
+    def test_invalid_cursors_are_404(self):
+        user_journals = f'/api/Journal/users/{self.user.id}/journals/'
+        for url, cursor in [
+            ('/api/Journal/journals/explore/', 'not base64!'),
+            ('/api/Journal/journals/explore/', self.cursor([1.0])),
+            ('/api/Journal/journals/explore/', self.cursor(['abc', 1])),
+            ('/api/Journal/journals/explore/', self.cursor([1.0, 10 ** 30])),
+            ('/api/Journal/journals/explore/', self.cursor([None, 1])),
+            ('/api/Journal/journals/profile/', self.cursor(['a', 'b', 'c'])),
+            (user_journals, self.cursor(['yesterday', 1])),
+            (user_journals, self.cursor(['2026-01-01T10:00:00', 1])),  # No offset
+            (user_journals, self.cursor([{'a': 1}, 1])),
+        ]:
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, (url, cursor))
+            self.assertEqual(str(response.data['detail']), 'Invalid cursor')
+
+class SparseFieldsetTests(TestCase):
+    """?view=card, ?fields= and ?expand= on the journal lists (Journal.serializers.SparseFieldsetMixin)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for index in range(3):
+            journal = Journal.objects.create(user=self.user, title=f'Trip {index}', content='Long road ' * 50)
+            Comment.objects.create(user=self.user, journal=journal, content='Nice')
+
+    def keys(self, query):
+        response = self.client.get(f'/api/Journal/journals/explore/?{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return set(response.data['results'][0])
+
+    def test_keys_per_view(self):
+        self.assertEqual(self.keys(''), {
+            'id', 'title', 'content', 'created_at', 'updated_at', 'media', 'user', 'like_count',
+            'comment_count', 'share_count', 'is_liked', 'comments', 'is_shared', 'shared_by',
+        })
+        card = {'id', 'title', 'excerpt', 'created_at', 'user', 'like_count', 'comment_count', 'share_count', 'is_liked'}
+        self.assertEqual(self.keys('view=card'), card)
+        self.assertEqual(self.keys('view=card&expand=media,shared_by'), card | {'media', 'shared_by'})
+        self.assertEqual(self.keys('fields=title,like_count'), {'id', 'title', 'like_count'})
+        self.assertEqual(self.keys('view=card&fields=excerpt'), {'id', 'excerpt'})
+
+    def test_unknown_fields_are_rejected(self):
+        for query, param in [
+            ('fields=title,password', 'fields'),
+            ('view=card&fields=updated_at', 'fields'),
+            ('view=card&expand=title', 'expand'),  # Always there, not expandable
+            ('expand=comments', 'expand'),  # The full view has nothing to expand
+        ]:
+            response = self.client.get(f'/api/Journal/journals/explore/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn(param, response.data)
+
+    def test_card_view_runs_fewer_queries(self):
+        counts = {}
+        for query in ('', 'view=card'):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(f'/api/Journal/journals/explore/?{query}')
+            counts[query] = queries
+        self.assertLess(len(counts['view=card']), len(counts['']))
+        journal_select = next(query['sql'] for query in counts['view=card'] if '"Journal_journal"."excerpt"' in query['sql'])
+        self.assertNotIn('"Journal_journal"."content"', journal_select)  # Deferred, the excerpt is stored
+
+class ConditionalGetTests(TestCase):
+    """ETag revalidation (Journal.conditional) and the version bumps that invalidate it."""
+
+    def setUp(self):
+        cache.clear()
+        self.reader, self.author = make_user('reader'), make_user('author')
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(follower=self.reader, followed=self.author)
+            self.journal = Journal.objects.create(user=self.author, title='Lisbon', content='Trams')
+
+    def revalidate(self, url):
+        """ETag of a fresh 200, and the status of a GET presenting it."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        return etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_lists_send_an_etag_only(self):
+        for url in ['/api/Journal/journals/feed/', f'/api/Journal/journals/{self.journal.id}/comments/']:
+            response = self.client.get(url)
+            self.assertTrue(response.has_header('ETag'), url)
+            self.assertFalse(response.has_header('Last-Modified'), url)
+
+    def test_like_invalidates_the_feed(self):
+        etag, status = self.revalidate('/api/Journal/journals/feed/')
+        self.assertEqual(status, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/Journal/journals/{self.journal.id}/like/')
+        response = self.client.get('/api/Journal/journals/feed/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['like_count'], 1)
+
+    def test_comment_invalidates_the_thread(self):
+        url = f'/api/Journal/journals/{self.journal.id}/comments/'
+        etag, status = self.revalidate(url)
+        self.assertEqual(status, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(user=self.author, journal=self.journal, content='Thanks')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['Thanks'])
+
+    def test_reconciled_counters_invalidate_the_profile(self):
+        url = f'/api/Users/profile/{self.author.id}/'
+        etag, status = self.revalidate(url)
+        self.assertEqual(status, 304)
+        CustomUser.objects.filter(pk=self.author.pk).update(followers_count=7)  # Drift behind the signals' back
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_follow_counts', stdout=StringIO())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['followers_count'], 1)
+
+class JournalEndpointBenchmarkTests(EndpointBenchmarkMixin, TestCase):
+    """
+    Latency and query budgets of the journal endpoints. A budget is the query count
+    of a warm request and must not depend on the page or dataset size: going over it
+    usually means a serializer field started loading a relation per row.
+    """
+    query_budgets = {
+        'feed': 8,  # Page of feed entries, then the journals on it
+        'explore': 7,
+        'profile-timeline': 9,
+        'user-journals': 9,
+        'user-shared-journals': 9,
+        'comments': 3,
+        'comment-replies': 3,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_dataset()
+        cls.viewer = cls.users[1]
+        cls.thread = Comment.objects.filter(parent__isnull=True, replies__isnull=False).first()
+
+    def assert_journals_match_database(self, results):
+        """Counters, is_liked and is_shared (by a followee) of serialized journals agree with the tables."""
+        ids = [journal['id'] for journal in results]
+        self.assertTrue(ids)
+        stored = Journal.objects.in_bulk(ids)
+        liked = set(Like.objects.filter(user=self.viewer, journal_id__in=ids).values_list('journal_id', flat=True))
+        shared = set(
+            SharedJournal.objects.filter(
+                user__in=Follow.objects.filter(follower=self.viewer).values('followed'), journal_id__in=ids
+            ).values_list('journal_id', flat=True)
+        )
+        for journal in results:
+            row = stored[journal['id']]
+            self.assertEqual(journal['user']['id'], row.user_id)
+            self.assertEqual(
+                (journal['like_count'], journal['comment_count'], journal['share_count']),
+                (row.like_count, row.comment_count, row.share_count),
+            )
+            self.assertEqual(journal['is_liked'], row.id in liked)
+            self.assertEqual(journal['is_shared'], row.id in shared)
+
+    def test_feed(self):
+        response = self.benchmark('feed', '/api/Journal/journals/feed/', self.viewer)
+        self.assert_journals_match_database(response.data['results'])
+        delivered = set(FeedEntry.objects.filter(user=self.viewer).values_list('journal_id', flat=True))
+        self.assertLessEqual({journal['id'] for journal in response.data['results']}, delivered)
+
+    def test_explore(self):
+        response = self.benchmark('explore', '/api/Journal/journals/explore/', self.viewer)
+        self.assert_journals_match_database(response.data['results'])
+
+    def test_profile_timeline(self):
+        response = self.benchmark('profile-timeline', '/api/Journal/journals/profile/', self.viewer)
+        self.assert_journals_match_database(response.data['results'])
+        own = set(Journal.objects.filter(user=self.viewer).values_list('id', flat=True))
+        own |= set(SharedJournal.objects.filter(user=self.viewer).values_list('journal_id', flat=True))
+        self.assertLessEqual({journal['id'] for journal in response.data['results']}, own)
+
+    def test_user_journals(self):
+        author = self.users[2]
+        response = self.benchmark('user-journals', f'/api/Journal/users/{author.id}/journals/', self.viewer)
+        self.assert_journals_match_database(response.data['results'])
+        self.assertEqual(
+            [journal['id'] for journal in response.data['results']],
+            list(Journal.objects.filter(user=author).order_by('-created_at', '-id').values_list('id', flat=True)),
+        )
+
+    def test_user_shared_journals(self):
+        sharer = self.users[2]
+        response = self.benchmark('user-shared-journals', f'/api/Journal/users/{sharer.id}/shared-journals/', self.viewer)
+        self.assert_journals_match_database(response.data['results'])
+        self.assertEqual(
+            {journal['id'] for journal in response.data['results']},
+            set(SharedJournal.objects.filter(user=sharer).values_list('journal_id', flat=True)),
+        )
+
+    def test_comments(self):
+        response = self.benchmark(
+            'comments', f'/api/Journal/journals/{self.thread.journal_id}/comments/?depth=2', self.viewer
+        )
+        self.assertTrue(response.data['results'])
+        for comment in response.data['results']:
+            self.assertEqual((comment['journal'], comment['parent']), (self.thread.journal_id, None))
+            replies = Comment.objects.filter(parent_id=comment['id'])
+            self.assertEqual(comment['reply_count'], replies.count())
+            self.assertEqual({reply['id'] for reply in comment['replies']}, set(replies.values_list('id', flat=True)))
+
+    def test_comment_replies(self):
+        response = self.benchmark('comment-replies', f'/api/Journal/comments/{self.thread.id}/replies/', self.viewer)
+        self.assertEqual(
+            {reply['id'] for reply in response.data['results']},
+            set(Comment.objects.filter(parent=self.thread).values_list('id', flat=True)),
+        )
@@ -9,6 +9,12 @@ from .views import (
     CommentJournalViewSet,
     ShareJournalViewSet,
     ProfileJournalListView,  # New view
+    JournalCommentListView,
+    CommentReplyListView,
+    JournalLikeView,
+    JournalShareView,
+    UserJournalListView,
+    UserSharedJournalListView,
 )
 
 router = DefaultRouter()
@@ -23,4 +29,10 @@ urlpatterns = [
     path('journals/feed/', FeedJournalListView.as_view(), name='feed-journal-list'),
     path('journals/explore/', ExploreJournalListView.as_view(), name='explore-journal-list'),
     path('journals/profile/', ProfileJournalListView.as_view(), name='profile-journal-list'),  # New endpoint
+    path('journals/<int:journal_id>/comments/', JournalCommentListView.as_view(), name='journal-comments'),
+    path('comments/<int:comment_id>/replies/', CommentReplyListView.as_view(), name='comment-replies'),
+    path('users/<int:user_id>/journals/', UserJournalListView.as_view(), name='user-journals'),
+    path('users/<int:user_id>/shared-journals/', UserSharedJournalListView.as_view(), name='user-shared-journals'),
+    path('journals/<int:journal_id>/like/', JournalLikeView.as_view(), name='journal-like'),
+    path('journals/<int:journal_id>/share/', JournalShareView.as_view(), name='journal-share'),
 ]
\ No newline at end of file
@@ -0,0 +1,62 @@
+import time
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+from travel.metrics import count_cache_lookup
+
+# Version stamps for HTTP conditional GETs (see Journal.conditional). A stamp is
+# "<unix time>:<random>" and is replaced whenever something in its scope changes:
+#   journal:<id>  counters, comments or replies of a journal
+#   viewer:<id>   what a user has liked, shared or follows (is_liked, is_shared, ...)
+#   feed:<id>     entries delivered to or removed from a user's home feed
+#   user:<id>     a user's profile fields and follower/following counters
+# A missing stamp (first read, eviction) is created as "changed now", so losing
+# one can only cost a full response, never a wrong 304.
+KEY_PREFIX = 'version'
+TIMEOUT = 60 * 60 * 24
+
+def journal_scope(journal_id):
+    return f'journal:{journal_id}'
+
+def viewer_scope(user_id):
+    return f'viewer:{user_id}'
+
+def feed_scope(user_id):
+    return f'feed:{user_id}'
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+def _key(scope):
+    return f'{KEY_PREFIX}:{scope}'
+
+def _new_stamp():
+    return f'{time.time():.6f}:{uuid.uuid4().hex[:8]}'
+
+def stamp_time(stamp):
+    return float(stamp.split(':', 1)[0])
+
+def get_stamps(scopes):
+    """{scope: stamp} for many scopes in one cache round trip."""
+    scopes = list(dict.fromkeys(scopes))
+    found = cache.get_many([_key(scope) for scope in scopes])
+    stamps = {}
+    missing = {}
+    for scope in scopes:
+        stamp = found.get(_key(scope))
+        count_cache_lookup('version_stamps', hit=stamp is not None)
+        if stamp is None:
+            stamp = missing[_key(scope)] = _new_stamp()
+        stamps[scope] = stamp
+    if missing:
+        cache.set_many(missing, TIMEOUT)
+    return stamps
+
+def bump(*scopes):
+    """Replace the stamps of changed scopes once the current transaction commits."""
+    if not scopes:
+        return
+    def replace():
+        stamp = _new_stamp()
+        cache.set_many({_key(scope): stamp for scope in set(scopes)}, TIMEOUT)
+    transaction.on_commit(replace)
@@ -1,33 +1,67 @@
 from rest_framework import generics, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.fields import DateTimeField
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Q, Count, F, Value, CharField
-from django.db.models.functions import Coalesce
-from .models import Journal, Like, Comment, SharedJournal
-from .serializers import JournalSerializer, LikeSerializer, CommentSerializer, SharedJournalSerializer
+from rest_framework.views import APIView
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from django.db.models import F
+from .models import Journal, Like, Comment, SharedJournal, FeedEntry
+from .serializers import JournalSerializer, journal_serializer_class, LikeSerializer, LikeBatchSerializer, CommentSerializer, ThreadCommentSerializer, SharedJournalSerializer
+from . import reactions, versions
+from .conditional import ConditionalGetMixin, JOURNAL_STAMP_FIELDS, journal_stamps
+
+User = get_user_model()
+from .querysets import expand_replies, with_reply_counts, shape_journal_queryset, profile_timeline_branches
 from .permissions import IsOwnerOrAdminDeleteOnly
-from Users.models import Follow
-from .querysets import with_engagement_scores
+from .pagination import RecentCursorPagination, EngagementCursorPagination, ProfileTimelinePagination, SharedTimelinePagination, ThreadCursorPagination
 
-class MyJournalListCreateView(generics.ListCreateAPIView):
+class JournalFieldsetMixin:
+    """
+    `?view=card` switches GETs to the compact JournalCardSerializer, `?fields=` and
+    `?expand=` pick fields on either representation, and the queryset only joins,
+    prefetches or loads what the picked fields read.
+    """
+
+    def get_serializer_class(self):
+        return journal_serializer_class(self.request)
+
+    def shape_queryset(self, queryset):
+        field_names = self.get_serializer_class().resolve_field_names(self.request.query_params)
+        return shape_journal_queryset(queryset, field_names)
+
+class JournalPageVersionMixin(ConditionalGetMixin):
+    """
+    Conditional GET for journal lists: the stamps are the page the view would
+    return, read as JOURNAL_STAMP_FIELDS rows through the same pagination (one
+    light query, no joins or prefetches), plus the viewer's version stamp.
+    """
+
+    def get_version_scopes(self):
+        return [versions.viewer_scope(self.request.user.id)]
+
+    def get_version_stamps(self, request, *args, **kwargs):
+        queryset = self.get_queryset().prefetch_related(None).values(*JOURNAL_STAMP_FIELDS)
+        stamps, _ = journal_stamps(self.paginate_queryset(queryset), *self.get_version_scopes())
+        return stamps, None  # ETag only, see ConditionalGetMixin
+
+class MyJournalListCreateView(JournalPageVersionMixin, JournalFieldsetMixin, generics.ListCreateAPIView):
     """
     GET: List user's own journals.
     POST: Create a new journal.
     """
     serializer_class = JournalSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdminDeleteOnly]
+    pagination_class = RecentCursorPagination
 
     def get_queryset(self):
-        # Use existing like_count and comment_count fields; only annotate share_count
-        qs = Journal.objects.filter(user=self.request.user).annotate(
-            annotated_share_count=Count('shares', distinct=True)
-        )
-        return with_engagement_scores(qs).order_by('-created_at')
+        return self.shape_queryset(Journal.objects.filter(user=self.request.user)).order_by('-created_at')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class MyJournalDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MyJournalDetailView(ConditionalGetMixin, JournalFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET, PUT, DELETE for a single user's journal.
     """
@@ -35,69 +69,125 @@ class MyJournalDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrAdminDeleteOnly]
 
     def get_queryset(self):
-        return Journal.objects.filter(user=self.request.user)
+        return self.shape_queryset(Journal.objects.filter(user=self.request.user))
+
+    def get_version_stamps(self, request, *args, **kwargs):
+        rows = list(Journal.objects.filter(user=request.user, pk=kwargs['pk']).values(*JOURNAL_STAMP_FIELDS))
+        if not rows:
+            return None  # Let retrieve() answer 404
+        return journal_stamps(rows, versions.viewer_scope(request.user.id))
 
-class FeedJournalListView(generics.ListAPIView):
+class FeedJournalListView(ConditionalGetMixin, JournalFieldsetMixin, generics.ListAPIView):
     """
-    Journals from followed users and shared journals (user's feed).
+    Journals from followed users and shared journals (user's feed), newest first.
     """
     serializer_class = JournalSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = RecentCursorPagination
 
-    def get_queryset(self):
-        user = self.request.user
-        followed_users = Follow.objects.filter(follower=user).values_list('followed', flat=True)
-        shared_journal_ids = SharedJournal.objects.filter(user__in=followed_users).values_list('journal', flat=True)
-
-        # Use existing like_count and comment_count; annotate share_count
-        qs = Journal.objects.filter(
-            Q(user__in=followed_users) | Q(id__in=shared_journal_ids)
-        ).distinct().annotate(
-            annotated_share_count=Count('shares', distinct=True)
+    def get_page_entries(self):
+        # Feed entries are written when followed users post or share (see Journal.feed), so
+        # a page is one range scan of the user's (user, -created_at, -id) index. Read once
+        # per request: the conditional GET check and list() share it.
+        if not hasattr(self, '_page_entries'):
+            self._page_entries = self.paginate_queryset(
+                FeedEntry.objects.filter(user=self.request.user).values('id', 'created_at', 'journal_id')
+            )
+        return self._page_entries
+
+    def list(self, request, *args, **kwargs):
+        # The page of entries first, then one query for just those journals
+        entries = self.get_page_entries()
+        journals = self.shape_queryset(
+            Journal.objects.filter(id__in={entry['journal_id'] for entry in entries})
+        ).in_bulk()
+        page = [journals[entry['journal_id']] for entry in entries if entry['journal_id'] in journals]
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_version_stamps(self, request, *args, **kwargs):
+        entries = self.get_page_entries()
+        rows = list(
+            Journal.objects.filter(id__in={entry['journal_id'] for entry in entries})
+            .order_by('id').values(*JOURNAL_STAMP_FIELDS)
+        )
+        stamps, _ = journal_stamps(
+            rows, versions.viewer_scope(request.user.id), versions.feed_scope(request.user.id)
         )
-        return with_engagement_scores(qs).order_by('-engagement_score')
+        return [stamps, [entry['id'] for entry in entries]], None  # ETag only, see ConditionalGetMixin
 
-class ExploreJournalListView(generics.ListAPIView):
+class ExploreJournalListView(JournalPageVersionMixin, JournalFieldsetMixin, generics.ListAPIView):
     """
     Discover popular journals globally (not just followed users).
     """
     serializer_class = JournalSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = EngagementCursorPagination
 
     def get_queryset(self):
-        # Use existing like_count and comment_count; annotate share_count
-        qs = Journal.objects.annotate(
-            annotated_share_count=Count('shares', distinct=True)
-        )
-        return with_engagement_scores(qs).order_by('-engagement_score')
+        # engagement_score is stored and indexed, so this is an index scan with a LIMIT
+        return self.shape_queryset(Journal.objects.all()).order_by('-engagement_score', '-id')
+
+class UserJournalListView(JournalPageVersionMixin, JournalFieldsetMixin, generics.ListAPIView):
+    """
+    A user's own journals, newest first (linked from the user's journals_url).
+    """
+    serializer_class = JournalSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = RecentCursorPagination
+
+    def get_queryset(self):
+        user = get_object_or_404(User, pk=self.kwargs['user_id'])
+        return self.shape_queryset(Journal.objects.filter(user=user)).order_by('-created_at', '-id')
 
-class ProfileJournalListView(generics.ListAPIView):
+class UserSharedJournalListView(JournalPageVersionMixin, JournalFieldsetMixin, generics.ListAPIView):
     """
-    List user's own journals and shared journals, sorted by recency.
+    Journals a user shared, most recently shared first (linked from shared_journals_url).
     """
     serializer_class = JournalSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SharedTimelinePagination
 
     def get_queryset(self):
-        user = self.request.user
-        # Fetch owned journals
-        owned_journals = Journal.objects.filter(user=user).annotate(
-            annotated_share_count=Count('shares', distinct=True),
-            display_date=F('created_at'),  # Use journal's created_at
-            is_shared=Value(False, output_field=CharField())
+        user = get_object_or_404(User, pk=self.kwargs['user_id'])
+        # One share per (user, journal), so the journal id breaks ties in the share time
+        return self.shape_queryset(
+            Journal.objects.filter(shares__user=user).annotate(shared_at=F('shares__created_at'))
+        ).order_by('-shared_at', '-id')
+
+class ProfileJournalListView(ConditionalGetMixin, JournalFieldsetMixin, generics.ListAPIView):
+    """
+    List user's own journals and shared journals, sorted by recency. Each entry
+    also carries `via_share` and, for shares, `shared_at`, as a journal the user
+    wrote and shared appears twice.
+    """
+    serializer_class = JournalSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ProfileTimelinePagination
+
+    def list(self, request, *args, **kwargs):
+        # A page of (display_date, journal_ref, via_share) timeline entries from a
+        # UNION ALL of the user's journals and shares, then one query for the journals
+        entries = self.paginate_queryset(profile_timeline_branches(request.user))
+        journals = self.shape_queryset(
+            Journal.objects.filter(id__in={entry['journal_ref'] for entry in entries})
+        ).in_bulk()
+        entries = [entry for entry in entries if entry['journal_ref'] in journals]
+        serializer = self.get_serializer([journals[entry['journal_ref']] for entry in entries], many=True)
+        results = []
+        for entry, journal in zip(entries, serializer.data):
+            shared_at = DateTimeField().to_representation(entry['display_date']) if entry['via_share'] else None
+            results.append({**journal, 'via_share': bool(entry['via_share']), 'shared_at': shared_at})
+        return self.get_paginated_response(results)
+
+    def get_version_stamps(self, request, *args, **kwargs):
+        entries = self.paginate_queryset(profile_timeline_branches(request.user))
+        rows = list(
+            Journal.objects.filter(id__in={entry['journal_ref'] for entry in entries})
+            .order_by('id').values(*JOURNAL_STAMP_FIELDS)
         )
-        # Fetch shared journals
-        shared_journals = Journal.objects.filter(
-            shares__user=user
-        ).annotate(
-            annotated_share_count=Count('shares', distinct=True),
-            display_date=F('shares__created_at'),  # Use share's created_at
-            is_shared=Value(True, output_field=CharField()),
-            shared_by_user_id=F('shares__user__id')
-        ).select_related('user', 'shares__user')
-
-        # Combine and sort by display_date
-        return (owned_journals | shared_journals).order_by('-display_date')
+        stamps, _ = journal_stamps(rows, versions.viewer_scope(request.user.id))
+        return [stamps, [list(entry.values()) for entry in entries]], None
 
 class LikeJournalViewSet(viewsets.ModelViewSet):
     """
@@ -120,6 +210,16 @@ class LikeJournalViewSet(viewsets.ModelViewSet):
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Apply many like toggles at once: {"toggles": [{"journal": 1, "liked": true}, ...]}.
+        """
+        serializer = LikeBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        liked, unliked = reactions.toggle_likes(request.user.id, serializer.validated_data['toggles'])
+        return Response({'liked': liked, 'unliked': unliked})
+
 class CommentJournalViewSet(viewsets.ModelViewSet):
     """
     Create, update, delete comments on journals.
@@ -133,6 +233,63 @@ class CommentJournalViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Comment.objects.filter(user=self.request.user)
 
+class CommentThreadListView(ConditionalGetMixin, generics.ListAPIView):
+    """
+    Cursor-paginated page of comments, each with its reply_count.
+    `?depth=N` expands up to N levels of replies under the comments on the page
+    (one extra query), otherwise replies come back empty and are fetched on demand.
+    """
+    serializer_class = ThreadCommentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ThreadCursorPagination
+    max_depth = 5
+
+    def get_depth(self):
+        try:
+            depth = int(self.request.query_params.get('depth', 0))
+        except ValueError:
+            return 0
+        return max(0, min(depth, self.max_depth))
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        children = expand_replies(page, self.get_depth())
+        context = {**self.get_serializer_context(), 'comment_children': children}
+        serializer = self.get_serializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
+    def get_version_stamps(self, request, *args, **kwargs):
+        # Every comment change on a journal replaces its stamp (see Journal.signals)
+        journal_id = self.get_journal_id()
+        if journal_id is None:
+            return None
+        scope = versions.journal_scope(journal_id)
+        return versions.get_stamps([scope])[scope], None
+
+class JournalCommentListView(CommentThreadListView):
+    """
+    Top-level comments of a journal.
+    """
+    def get_journal_id(self):
+        return self.kwargs['journal_id']
+
+    def get_queryset(self):
+        journal = get_object_or_404(Journal, pk=self.kwargs['journal_id'])
+        return with_reply_counts(
+            Comment.objects.filter(journal=journal, parent__isnull=True)
+        ).select_related('user')
+
+class CommentReplyListView(CommentThreadListView):
+    """
+    Direct replies to a comment.
+    """
+    def get_journal_id(self):
+        return Comment.objects.filter(pk=self.kwargs['comment_id']).values_list('journal_id', flat=True).first()
+
+    def get_queryset(self):
+        parent = get_object_or_404(Comment, pk=self.kwargs['comment_id'])
+        return with_reply_counts(parent.replies.all()).select_related('user')
+
 class ShareJournalViewSet(viewsets.ModelViewSet):
     """
     Share or unshare a journal.
@@ -152,4 +309,38 @@ class ShareJournalViewSet(viewsets.ModelViewSet):
         if instance.user != request.user:
             return Response({"detail": "You can only delete your own shares."}, status=status.HTTP_403_FORBIDDEN)
         self.perform_destroy(instance)
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class JournalReactionView(APIView):
+    """
+    Idempotent PUT (add) / DELETE (remove) of the current user's reaction to a journal.
+    Repeating either request is a no-op that still answers 204.
+    """
+    permission_classes = [IsAuthenticated]
+    add = remove = None
+
+    def put(self, request, journal_id):
+        return self.respond(self.add(request.user.id, journal_id), journal_id)
+
+    def delete(self, request, journal_id):
+        return self.respond(self.remove(request.user.id, journal_id), journal_id)
+
+    def respond(self, changed, journal_id):
+        # Nothing changed is the common retry case; only then pay for telling it apart from a bad id
+        if not changed and not Journal.objects.filter(pk=journal_id).exists():
+            return Response({"detail": "Journal not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class JournalLikeView(JournalReactionView):
+    """
+    Like (PUT) or unlike (DELETE) a journal.
+    """
+    add = staticmethod(reactions.like)
+    remove = staticmethod(reactions.unlike)
+
+class JournalShareView(JournalReactionView):
+    """
+    Share (PUT) or unshare (DELETE) a journal.
+    """
+    add = staticmethod(reactions.share)
+    remove = staticmethod(reactions.unshare)
@@ -1,6 +1,6 @@
 # admin.py
 from django.contrib import admin
-from .models import CustomUser
+from .models import CustomUser, OutboundEmail
 
 @admin.register(CustomUser)
 class CustomUserAdmin(admin.ModelAdmin):
@@ -17,3 +17,9 @@ class CustomUserAdmin(admin.ModelAdmin):
         'is_verified', 'email_verification_token',
         'is_blocked', 'is_staff', 'is_active'
     ]
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    search_fields = ['to_email', 'subject']
+    list_filter = ['status']
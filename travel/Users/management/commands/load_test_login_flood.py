@@ -0,0 +1,96 @@
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class Command(BaseCommand):
+    help = (
+        "Measure an API endpoint's latency alone and during a flood of failing logins "
+        "from many addresses, in this process (so through the same throttles and hashing slots)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, required=True, help="Id of the user reading the API")
+        parser.add_argument('--path', default='/api/Journal/journals/feed/')
+        parser.add_argument('--flood-threads', type=int, default=8)
+        parser.add_argument(
+            '--flood-rate', type=float, default=200.0,
+            help="Login attempts per second across all flood threads (paced, so the client side of "
+                 "this process does not take the CPU a real attacker's machines would spend)",
+        )
+        parser.add_argument('--seconds', type=float, default=5.0, help="Length of each phase")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(pk=options['user']).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        quiet = self.measure(user, options['path'], options['seconds'])
+        stop = threading.Event()
+        statuses = [Counter() for _ in range(options['flood_threads'])]  # One per thread, summed at the end
+        flooders = [
+            threading.Thread(
+                target=self.flood,
+                args=(stop, statuses[worker], worker, options['flood_threads'] / options['flood_rate']),
+            )
+            for worker in range(options['flood_threads'])
+        ]
+        for thread in flooders:
+            thread.start()
+        try:
+            flooded = self.measure(user, options['path'], options['seconds'])
+        finally:
+            stop.set()
+            for thread in flooders:
+                thread.join()
+
+        self.stdout.write(f"{'phase':<14} {'requests':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, timings in (('quiet', quiet), ('login flood', flooded)):
+            self.stdout.write(
+                f"{name:<14} {len(timings):>9} {percentile(timings, 0.5):>8.2f} "
+                f"{percentile(timings, 0.95):>8.2f} {percentile(timings, 0.99):>8.2f}"
+            )
+        self.stdout.write(f"Login responses during the flood: {dict(sum(statuses, Counter()))}")
+        ratio = statistics.median(flooded) / statistics.median(quiet)
+        self.stdout.write(f"Median latency under flood: {ratio:.2f}x the quiet median")
+
+    def measure(self, user, path, seconds):
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user)
+        timings = []
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"GET {path} answered {response.status_code}")
+        return timings
+
+    def flood(self, stop, statuses, worker, interval):
+        client = APIClient(SERVER_NAME='localhost')
+        sent = 0
+        next_at = time.monotonic()
+        try:
+            while not stop.wait(max(0, next_at - time.monotonic())):
+                next_at += interval
+                sent += 1
+                # A new address and account each time, so only the concurrency limit can push back
+                response = client.post(
+                    '/api/Users/login/',
+                    {'email': f'flood-{uuid.uuid4().hex}@example.com', 'password': 'wrong-password'},
+                    format='json',
+                    REMOTE_ADDR=f'10.{worker}.{sent // 256 % 256}.{sent % 256}',
+                )
+                statuses[response.status_code] += 1
+        finally:
+            connection.close()
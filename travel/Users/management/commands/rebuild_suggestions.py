@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from Users.utils.suggestions import rebuild_suggestions
+
+class Command(BaseCommand):
+    help = "Recompute the stored follow suggestions of every active user. Run nightly (e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        refreshed = rebuild_suggestions(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt suggestions for {refreshed} users"))
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from Journal import versions
+from Users.models import CustomUser, Follow
+from Users.utils import user_cache
+
+def count_by(field, user_ids):
+    return dict(
+        Follow.objects.filter(**{f'{field}__in': user_ids}).values(field)
+        .annotate(total=Count('id')).values_list(field, 'total')
+    )
+
+class Command(BaseCommand):
+    help = "Detect and repair drift between CustomUser followers/following counters and the Follow table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['followers_count', 'following_count']
+        last_id = 0
+        checked = repaired = 0
+
+        while True:
+            batch = list(
+                CustomUser.objects.filter(id__gt=last_id).order_by('id').only('id', *fields)[:batch_size]
+            )
+            if not batch:
+                break
+            user_ids = [user.id for user in batch]
+            actual = {
+                'followers_count': count_by('followed_id', user_ids),
+                'following_count': count_by('follower_id', user_ids),
+            }
+
+            drifted = []
+            for user in batch:
+                changes = []
+                for field in fields:
+                    stored, counted = getattr(user, field), actual[field].get(user.id, 0)
+                    if stored != counted:
+                        changes.append(f"{field} {stored} -> {counted}")
+                        setattr(user, field, counted)
+                if changes:
+                    self.stdout.write(f"User {user.id}: {', '.join(changes)}")
+                    drifted.append(user)
+
+            if drifted and not options['dry_run']:
+                with transaction.atomic():
+                    CustomUser.objects.bulk_update(drifted, fields)
+                    user_cache.invalidate(*(user.id for user in drifted))
+                    # Profiles embed the counters; cached 304s must not outlive the repair
+                    versions.bump(*(versions.user_scope(user.id) for user in drifted))
+            checked += len(batch)
+            repaired += len(drifted)
+            last_id = batch[-1].id
+
+        verb = "Found" if options['dry_run'] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} users. {verb} {repaired} with counter drift."))
@@ -0,0 +1,40 @@
+import logging
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from Users.utils.suggestions import refresh_queued
+from travel.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = (
+        "Re-rank the suggestions of users queued after a follow or unfollow. Runs as a "
+        "long-lived worker by default; use --once to drain the queue and exit (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            close_old_connections()  # Long-running process: drop connections past CONN_MAX_AGE or broken
+            try:
+                refreshed = refresh_queued(options['batch_size'])
+            except Exception:
+                # The users not refreshed yet were queued again
+                logger.exception("Suggestion refresh batch failed")
+                refreshed = 0
+                if options['once']:
+                    raise
+            registry.maybe_flush()  # No requests here to trigger the periodic flush
+            total += refreshed
+            if refreshed:
+                continue  # More may be waiting
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed suggestions for {total} users"))
@@ -0,0 +1,59 @@
+import logging
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from Users.utils.outbox import purge_finished, send_batch
+from travel.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = (
+        "Send emails queued in the outbox. Runs as a long-lived worker by default; "
+        "use --once to drain what is due and exit (e.g. from cron). Sent and failed "
+        "emails older than --keep-days are purged at start and then hourly."
+    )
+    purge_interval = 60 * 60
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when nothing is due")
+        parser.add_argument('--once', action='store_true')
+        parser.add_argument('--keep-days', type=int, default=30, help="Days to keep sent and failed emails")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        purged_at = None
+        while True:
+            close_old_connections()  # Long-running process: drop connections past CONN_MAX_AGE or broken
+            if purged_at is None or time.monotonic() - purged_at >= self.purge_interval:
+                self.purge(timedelta(days=options['keep_days']))
+                purged_at = time.monotonic()
+            try:
+                sent, failed = send_batch(options['batch_size'])
+            except Exception:
+                # e.g. the database went away; claimed rows are retried once their lease expires
+                logger.exception("Email batch failed")
+                sent = failed = 0
+                if options['once']:
+                    raise
+            registry.maybe_flush()  # No requests here to trigger the periodic flush
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+                continue  # More may be due right away
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed attempts"))
+
+    def purge(self, older_than):
+        try:
+            purged = purge_finished(older_than)
+        except Exception:
+            logger.exception("Purging finished emails failed")  # Sending goes on; retried next interval
+            return
+        if purged:
+            self.stdout.write(f"Purged {purged} finished emails")
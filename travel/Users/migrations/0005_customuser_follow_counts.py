@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_follow_counts(apps, schema_editor):
+    CustomUser = apps.get_model('Users', 'CustomUser')
+    Follow = apps.get_model('Users', 'Follow')
+    last_id = 0
+    while True:
+        batch = list(
+            CustomUser.objects.filter(id__gt=last_id).order_by('id').only('id', 'followers_count', 'following_count')[:1000]
+        )
+        if not batch:
+            break
+        user_ids = [user.id for user in batch]
+        followers = dict(
+            Follow.objects.filter(followed_id__in=user_ids).values('followed_id')
+            .annotate(total=Count('id')).values_list('followed_id', 'total')
+        )
+        following = dict(
+            Follow.objects.filter(follower_id__in=user_ids).values('follower_id')
+            .annotate(total=Count('id')).values_list('follower_id', 'total')
+        )
+        for user in batch:
+            user.followers_count = followers.get(user.id, 0)
+            user.following_count = following.get(user.id, 0)
+        CustomUser.objects.bulk_update(batch, ['followers_count', 'following_count'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Users', '0004_usersuggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -41,6 +41,8 @@ class CustomUser(AbstractUser):
     banner_image = models.ImageField(upload_to='banners/', null=True, blank=True)
     is_blocked = models.BooleanField(default=False)
     is_verified = models.BooleanField(default=False)
+    followers_count = models.PositiveIntegerField(default=0)  # Cache for number of followers
+    following_count = models.PositiveIntegerField(default=0)  # Cache for number of followed users
     email_verification_token = models.UUIDField(default=uuid.uuid4, null=True, blank=True)
 
     username = None
@@ -68,6 +70,72 @@ class Follow(models.Model):
 
     def __str__(self):
         return f"{self.follower.email} follows {self.followed.email}"
+
+class UserSuggestion(models.Model):
+    """
+    Precomputed "who to follow" entry, see Users.utils.suggestions. Rebuilt
+    nightly by rebuild_suggestions and per user shortly after they follow or
+    unfollow (see SuggestionRefresh).
+    """
+    user = models.ForeignKey(CustomUser, related_name='suggestions', on_delete=models.CASCADE)
+    suggested = models.ForeignKey(CustomUser, related_name='+', on_delete=models.CASCADE)
+    score = models.FloatField()
+    mutual_count = models.PositiveIntegerField(default=0)  # Followees of `user` who follow `suggested`
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'suggested')
+        indexes = [
+            models.Index(fields=['user', '-score'], name='suggestion_user_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.suggested.email} suggested to {self.user.email}"
+
+class SuggestionRefresh(models.Model):
+    """
+    A user whose stored suggestions are out of date after a follow or unfollow, queued
+    for the refresh_queued_suggestions worker so the request does not pay for ranking.
+    """
+    user = models.OneToOneField(CustomUser, primary_key=True, related_name='+', on_delete=models.CASCADE)
+    requested_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Suggestions of user {self.user_id} queued at {self.requested_at}"
+
+class OutboundEmail(models.Model):
+    """
+    Email waiting to be sent (or already sent) by the send_queued_emails worker, see
+    Users.utils.outbox. Views only insert a row, so no request waits on the provider.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()  # Also pushed forward while a worker holds the row
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} ({self.status})"
     
    # is_active = False → disables login and authentication completely.
    #is_blocked = True → user can technically still log in, but you can 
@@ -1,17 +1,36 @@
 from rest_framework import serializers
+from django.urls import reverse
 from .models import CustomUser, Follow
+from .utils import follow_graph
 import re
 
-class UserSerializer(serializers.ModelSerializer):
+class UserLinksMixin:
+    """
+    A user's journals and shared journals are not embedded; these link to their
+    cursor-paginated lists instead.
+    """
+
+    def build_link(self, name, obj):
+        path = reverse(name, kwargs={'user_id': obj.id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+
+    def get_journals_url(self, obj):
+        return self.build_link('user-journals', obj)
+
+    def get_shared_journals_url(self, obj):
+        return self.build_link('user-shared-journals', obj)
+
+class UserSerializer(UserLinksMixin, serializers.ModelSerializer):
     profile_image = serializers.ImageField(required=False, allow_null=True, use_url=True)
     banner_image = serializers.ImageField(required=False, allow_null=True, use_url=True)
     password = serializers.CharField(write_only=True, required=False)
     full_name = serializers.SerializerMethodField()
-    followers_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
+    followers_count = serializers.IntegerField(read_only=True)
+    following_count = serializers.IntegerField(read_only=True)
     is_following = serializers.SerializerMethodField()
-    journals = serializers.SerializerMethodField()
-    shared_journals = serializers.SerializerMethodField()
+    journals_url = serializers.SerializerMethodField()
+    shared_journals_url = serializers.SerializerMethodField()
 
     class Meta:
         model = CustomUser
@@ -20,36 +39,19 @@ class UserSerializer(serializers.ModelSerializer):
             'date_of_birth', 'country_of_birth', 'gender',
             'profile_image', 'banner_image',
             'is_verified', 'is_blocked', 'is_staff', 'is_superuser', 'password',
-            'followers_count', 'following_count', 'is_following', 'journals', 'shared_journals'
+            'followers_count', 'following_count', 'is_following', 'journals_url', 'shared_journals_url'
         ]
-        read_only_fields = ['id', 'is_verified', 'is_blocked', 'is_superuser', 'is_staff']
+        read_only_fields = ['id', 'is_verified', 'is_blocked', 'is_superuser', 'is_staff', 'followers_count', 'following_count']
 
     def get_full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip()
 
-    def get_followers_count(self, obj):
-        return obj.followers.count()
-
-    def get_following_count(self, obj):
-        return obj.following.count()
-
     def get_is_following(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return Follow.objects.filter(follower=request.user, followed=obj).exists()
+            return follow_graph.is_following(request.user.id, obj.id)
         return False
 
-    def get_journals(self, obj):
-        from Journal.serializers import JournalSerializer  # Local import
-        journals = obj.journals.all()
-        return JournalSerializer(journals, many=True, context=self.context).data
-
-    def get_shared_journals(self, obj):
-        from Journal.serializers import JournalSerializer  # Local import
-        shared_journals = obj.shared_journals.values_list('journal', flat=True)
-        journals = obj.journals.model.objects.filter(id__in=shared_journals)
-        return JournalSerializer(journals, many=True, context=self.context).data
-
     def create(self, validated_data):
         password = validated_data.pop('password', None)
         user = CustomUser(**validated_data)
@@ -64,9 +66,34 @@ class UserSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         if password:
             instance.set_password(password)
-        instance.save()
+        # Only the edited columns: the instance may be request.user from the user cache,
+        # whose counters and flags can be stale and must not be written back
+        instance.save(update_fields=[*validated_data, *(['password'] if password else [])])
         return instance
 
+class UserSummarySerializer(UserLinksMixin, serializers.ModelSerializer):
+    """Read-only profile summary for lists: identity, counters and links, nothing per-viewer."""
+    full_name = serializers.SerializerMethodField()
+    journals_url = serializers.SerializerMethodField()
+    shared_journals_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CustomUser
+        fields = [
+            'id', 'first_name', 'last_name', 'full_name', 'profile_image',
+            'followers_count', 'following_count', 'journals_url', 'shared_journals_url'
+        ]
+        read_only_fields = fields
+
+    def get_full_name(self, obj):
+        return f"{obj.first_name} {obj.last_name}".strip()
+
+def user_serializer_class(request):
+    """`?view=summary` selects the summary representation for GET requests."""
+    if request.method == 'GET' and request.query_params.get('view') == 'summary':
+        return UserSummarySerializer
+    return UserSerializer
+
 class FollowSerializer(serializers.ModelSerializer):
     follower = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all())
     followed = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all())
@@ -83,6 +110,24 @@ class FollowSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You are already following this user")
         return data
 
+MAX_USER_ID = 2**63 - 1  # BigAutoField; larger ids can neither exist nor be sent to the database
+
+class BulkFollowSerializer(serializers.Serializer):
+    follow = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_USER_ID), required=False, max_length=500
+    )
+    unfollow = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_USER_ID), required=False, max_length=500
+    )
+
+    def validate(self, data):
+        follow, unfollow = set(data.get('follow', [])), set(data.get('unfollow', []))
+        if not follow and not unfollow:
+            raise serializers.ValidationError("Provide user IDs to follow or unfollow")
+        if follow & unfollow:
+            raise serializers.ValidationError("A user cannot be both followed and unfollowed")
+        return {'follow': sorted(follow), 'unfollow': sorted(unfollow)}
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     password2 = serializers.CharField(write_only=True)
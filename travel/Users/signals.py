@@ -0,0 +1,65 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from Journal import versions
+from Users.models import CustomUser, Follow
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from Users.utils import follow_graph, token_blacklist, user_cache
+from Users.utils.follows import adjust_follow_counts
+from Users.utils.suggestions import queue_refresh
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        adjust_follow_counts(instance.follower_id, [instance.followed_id], 1)
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    # Also runs for follows cascading from a deleted account, so the other side is decremented
+    adjust_follow_counts(instance.follower_id, [instance.followed_id], -1)
+
+@receiver(post_save, sender=Follow)
+def invalidate_graph_on_follow(sender, instance, created, **kwargs):
+    if created:
+        follow_graph.invalidate(instance.follower_id, instance.followed_id)
+
+@receiver(post_delete, sender=Follow)
+def invalidate_graph_on_unfollow(sender, instance, **kwargs):
+    follow_graph.invalidate(instance.follower_id, instance.followed_id)
+
+# Queue the follower's suggestions for re-ranking by the refresh_queued_suggestions
+# worker when their follow graph changes; the nightly rebuild_suggestions catches up
+# everyone else the change affects.
+@receiver(post_save, sender=Follow)
+def queue_suggestions_on_follow(sender, instance, created, **kwargs):
+    if created:
+        queue_refresh(instance.follower_id)
+
+@receiver(post_delete, sender=Follow)
+def queue_suggestions_on_unfollow(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Follow):  # Not when the follower's account is being deleted
+        queue_refresh(instance.follower_id)
+
+# Version stamps for conditional GETs of profiles and follow state (see Journal.conditional)
+@receiver(post_save, sender=CustomUser)
+def bump_profile_version(sender, instance, **kwargs):
+    versions.bump(versions.user_scope(instance.pk))
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_versions(sender, instance, **kwargs):
+    versions.bump(
+        versions.viewer_scope(instance.follower_id),
+        versions.user_scope(instance.follower_id),
+        versions.user_scope(instance.followed_id),
+    )
+
+# Cached users for authentication (see Users.authentication)
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+@receiver(post_save, sender=BlacklistedToken)
+@receiver(post_delete, sender=BlacklistedToken)
+def reload_token_blacklist(sender, **kwargs):
+    token_blacklist.changed()
@@ -1,3 +1,389 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from Journal.models import FeedEntry, Journal, SharedJournal
+from Users.models import CustomUser, Follow, OutboundEmail, SuggestionRefresh, UserSuggestion
+from Users.throttling import HashingIPThrottle
+from Users.utils import outbox, suggestions, token_blacklist, user_cache
+from Users.utils.jwt_utils import PasswordResetToken
+from Users.views.register_login_views import LoginView
+from travel.testing import EndpointBenchmarkMixin, make_user, seed_dataset
 
-# Create your tests here.
+class BulkFollowTests(TestCase):
+    """Batch follow/unfollow (Users.utils.follows.bulk_follow) and its side effects."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('user')
+        self.others = [make_user(f'other{index}') for index in range(6)]
+        self.journals = {other.id: Journal.objects.create(user=other, title='Trip', content='Road') for other in self.others}
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk(self, follow=(), unfollow=()):
+        response = self.client.post(
+            '/api/Users/follow/bulk/', {'follow': list(follow), 'unfollow': list(unfollow)}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def feed(self):
+        return set(FeedEntry.objects.filter(user=self.user).values_list('journal_id', flat=True))
+
+    def test_bulk_follow_and_unfollow(self):
+        ids = [other.id for other in self.others]
+        data = self.bulk(follow=[*ids, self.user.id, 999999])  # Self and unknown ids are skipped
+        self.assertEqual(sorted(data['followed']), ids)
+        self.assertEqual(self.bulk(follow=ids)['followed'], [])  # Already followed
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.following_count, 6)
+        self.assertEqual(CustomUser.objects.get(pk=ids[0]).followers_count, 1)
+        self.assertEqual(self.feed(), {journal.id for journal in self.journals.values()})
+        self.assertTrue(SuggestionRefresh.objects.filter(user=self.user).exists())
+
+        data = self.bulk(unfollow=ids[:3])
+        self.assertEqual(sorted(data['unfollowed']), ids[:3])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.following_count, 3)
+        self.assertEqual(self.feed(), {self.journals[user_id].id for user_id in ids[3:]})
+
+    def test_unfollow_keeps_journals_shared_by_remaining_followees(self):
+        author, sharer = self.others[0], self.others[1]
+        SharedJournal.objects.create(user=sharer, journal=self.journals[author.id])
+        self.bulk(follow=[author.id, sharer.id])
+        self.bulk(unfollow=[author.id])
+        self.assertEqual(
+            dict(FeedEntry.objects.filter(user=self.user).values_list('journal_id', 'actor_id')),
+            {self.journals[author.id].id: sharer.id, self.journals[sharer.id].id: sharer.id},
+        )
+
+    def test_out_of_range_ids_are_rejected(self):
+        for user_id in (0, -1, 99999999999999999999999):
+            response = self.client.post('/api/Users/follow/bulk/', {'follow': [user_id]}, format='json')
+            self.assertEqual(response.status_code, 400, user_id)
+            response = self.client.get('/api/Users/follow/statuses/', {'ids': f'{self.others[0].id},{user_id}'})
+            self.assertEqual(response.status_code, 400, user_id)
+        response = self.client.get('/api/Users/follow/statuses/', {'ids': str(self.others[0].id)})
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        counts = []
+        for others in (self.others[:2], self.others[2:]):
+            with CaptureQueriesContext(connection) as follow_queries:
+                self.bulk(follow=[other.id for other in others])
+            with CaptureQueriesContext(connection) as unfollow_queries:
+                self.bulk(unfollow=[other.id for other in others])
+            counts.append((len(follow_queries), len(unfollow_queries)))
+        self.assertEqual(counts[0], counts[1])
+
+class FollowCounterTests(TestCase):
+    """followers_count and following_count kept by the Follow signals, and their drift repair."""
+
+    def setUp(self):
+        cache.clear()
+        self.alice, self.bob, self.carol = make_user('alice'), make_user('bob'), make_user('carol')
+
+    def counts(self, *users):
+        return [
+            tuple(CustomUser.objects.values_list('followers_count', 'following_count').get(pk=user.pk))
+            for user in users
+        ]
+
+    def test_follow_and_unfollow_adjust_both_sides(self):
+        Follow.objects.create(follower=self.alice, followed=self.bob)
+        Follow.objects.create(follower=self.alice, followed=self.carol)
+        Follow.objects.create(follower=self.bob, followed=self.carol)
+        self.assertEqual(self.counts(self.alice, self.bob, self.carol), [(0, 2), (1, 1), (2, 0)])
+
+        Follow.objects.get(follower=self.alice, followed=self.carol).delete()
+        self.assertEqual(self.counts(self.alice, self.bob, self.carol), [(0, 1), (1, 1), (1, 0)])
+
+    def test_deleting_a_user_updates_the_other_side_of_their_follows(self):
+        Follow.objects.create(follower=self.alice, followed=self.bob)
+        Follow.objects.create(follower=self.bob, followed=self.carol)
+        Follow.objects.create(follower=self.carol, followed=self.alice)
+        self.bob.delete()
+        self.assertEqual(self.counts(self.alice, self.carol), [(1, 0), (0, 1)])
+
+    def test_reconcile_repairs_drift(self):
+        Follow.objects.create(follower=self.alice, followed=self.bob)
+        CustomUser.objects.filter(pk=self.alice.pk).update(following_count=5)  # Drift behind the signals' back
+        CustomUser.objects.filter(pk=self.carol.pk).update(followers_count=3)
+
+        out = StringIO()
+        call_command('reconcile_follow_counts', '--dry-run', stdout=out)
+        self.assertIn('Found 2 with counter drift', out.getvalue())
+        self.assertEqual(self.counts(self.alice, self.carol), [(0, 5), (3, 0)])
+
+        call_command('reconcile_follow_counts', stdout=StringIO())
+        self.assertEqual(self.counts(self.alice, self.bob, self.carol), [(0, 1), (1, 0), (0, 0)])
+
+class SuggestionTests(TestCase):
+    """Queued refresh of the suggestion store and the cold-start fallback (Users.utils.suggestions)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user, self.friend, self.friend_of_friend = make_user('user'), make_user('friend'), make_user('fof')
+        Follow.objects.create(follower=self.friend, followed=self.friend_of_friend)
+        SuggestionRefresh.objects.all().delete()
+
+    def test_follow_queues_the_refresh_instead_of_ranking_in_the_request(self):
+        Follow.objects.create(follower=self.user, followed=self.friend)
+        self.assertFalse(UserSuggestion.objects.filter(user=self.user).exists())
+        self.assertEqual(list(SuggestionRefresh.objects.values_list('user_id', flat=True)), [self.user.id])
+
+        self.assertEqual(suggestions.refresh_queued(), 1)
+        self.assertFalse(SuggestionRefresh.objects.exists())
+        self.assertEqual(
+            list(UserSuggestion.objects.filter(user=self.user).values_list('suggested_id', 'mutual_count')),
+            [(self.friend_of_friend.id, 1)],
+        )
+
+    def test_queue_holds_one_row_per_user(self):
+        suggestions.queue_refresh(self.user.id, self.user.id)
+        suggestions.queue_refresh(self.user.id)
+        self.assertEqual(SuggestionRefresh.objects.count(), 1)
+
+    def test_random_suggestions_leave_out_followed_users_and_self(self):
+        Follow.objects.create(follower=self.user, followed=self.friend)
+        for _ in range(5):
+            self.assertEqual(
+                [user.id for user in suggestions.random_suggestions(self.user.id)], [self.friend_of_friend.id]
+            )
+
+class OutboxTests(TestCase):
+    """Leasing, retries and backoff of the email outbox (Users.utils.outbox)."""
+
+    def setUp(self):
+        self.email = outbox.enqueue('reader@example.com', 'Welcome', text_body='Hello')
+
+    def failing_backend(self):
+        return mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('provider down')
+        )
+
+    def test_send_batch_sends_due_emails_only(self):
+        later = outbox.enqueue('other@example.com', 'Digest')
+        OutboundEmail.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(outbox.send_batch(), (1, 0))
+        self.assertEqual([message.to for message in mail.outbox], [['reader@example.com']])
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts), (OutboundEmail.SENT, 1))
+        self.assertEqual(OutboundEmail.objects.get(pk=later.pk).status, OutboundEmail.PENDING)
+
+    def test_claimed_emails_are_leased(self):
+        started = timezone.now()
+        self.assertEqual([email.pk for email in outbox.claim_batch(10)], [self.email.pk])
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.attempts, 1)
+        self.assertGreaterEqual(self.email.next_attempt_at, started + outbox.LEASE)
+        self.assertEqual(outbox.claim_batch(10), [])  # Held by the first claim until the lease runs out
+
+    def test_failure_backs_off_exponentially(self):
+        OutboundEmail.objects.filter(pk=self.email.pk).update(attempts=2)
+        started = timezone.now()
+        with self.failing_backend(), self.assertLogs('Users.utils.outbox', 'WARNING'):
+            self.assertEqual(outbox.send_batch(), (0, 1))
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts), (OutboundEmail.PENDING, 3))
+        self.assertEqual(self.email.last_error, 'provider down')
+        delay = self.email.next_attempt_at - started
+        self.assertGreaterEqual(delay, outbox.BACKOFF_BASE * 4)  # 30s * 2 ** (3 - 1), plus up to 20% jitter
+        self.assertLess(delay, outbox.BACKOFF_BASE * 4 * 1.2 + timedelta(seconds=5))
+
+    def test_gives_up_after_max_attempts(self):
+        OutboundEmail.objects.filter(pk=self.email.pk).update(attempts=outbox.MAX_ATTEMPTS - 1)
+        with self.failing_backend(), self.assertLogs('Users.utils.outbox', 'ERROR'):
+            outbox.send_batch()
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts), (OutboundEmail.FAILED, outbox.MAX_ATTEMPTS))
+        self.assertEqual(outbox.claim_batch(10), [])
+
+    def test_purge_drops_old_sent_and_failed_emails_only(self):
+        old = timezone.now() - timedelta(days=31)
+        sent, failed, pending = (outbox.enqueue(f'{name}@example.com', 'Old') for name in ('sent', 'failed', 'pending'))
+        OutboundEmail.objects.filter(pk=sent.pk).update(status=OutboundEmail.SENT, next_attempt_at=old)
+        OutboundEmail.objects.filter(pk=failed.pk).update(status=OutboundEmail.FAILED, next_attempt_at=old)
+        OutboundEmail.objects.filter(pk=pending.pk).update(next_attempt_at=old)
+        OutboundEmail.objects.filter(pk=self.email.pk).update(status=OutboundEmail.SENT)  # Sent just now
+
+        out = StringIO()
+        call_command('send_queued_emails', '--once', stdout=out)
+        self.assertIn('Purged 2 finished emails', out.getvalue())
+        self.assertEqual(set(OutboundEmail.objects.values_list('pk', flat=True)), {self.email.pk, pending.pk})
+
+    def test_password_reset_link_outlives_the_retries(self):
+        user = make_user('forgetful')
+        started = timezone.now()
+        response = APIClient().post('/api/Users/password-reset/', {'email': user.email}, format='json')
+        self.assertEqual(response.status_code, 200)
+        token = OutboundEmail.objects.get(to_email=user.email).text_body.rstrip('/').rsplit('/', 1)[1]
+
+        expires = datetime.fromtimestamp(PasswordResetToken(token)['exp'], tz=dt_timezone.utc)
+        self.assertGreater(expires - started, outbox.max_delivery_delay())
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(client.get('/api/Users/profile/').status_code, 401)  # Not an access token
+
+class UserCacheTests(TestCase):
+    """Users cached for authentication (Users.utils.user_cache) and writes through them."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('reader')
+        self.user.set_password('old-secret-1')
+        self.user.save()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_cached_user_holds_no_secrets(self):
+        user_cache.get_user(self.user.id)
+        cached = user_cache.get_user(self.user.id)  # Unpickled from the cache
+        for field in user_cache.SECRET_FIELDS:
+            self.assertNotIn(field, cached.__dict__)
+        self.assertTrue(cached.check_password('old-secret-1'))  # Loaded on access
+
+    def test_profile_edits_do_not_write_back_stale_counters(self):
+        self.assertEqual(self.client.get('/api/Users/profile/').status_code, 200)  # Caches request.user
+        CustomUser.objects.filter(pk=self.user.pk).update(followers_count=5, following_count=3)
+
+        response = self.client.put('/api/Users/profile/', {'first_name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        response = self.client.put(
+            '/api/Users/edit-profile/', {'current_password': 'old-secret-1', 'last_name': 'Moved'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+        self.assertEqual(
+            CustomUser.objects.values_list('first_name', 'last_name', 'followers_count', 'following_count')
+            .get(pk=self.user.pk),
+            ('Renamed', 'Moved', 5, 3),
+        )
+
+class TokenBlacklistTests(TestCase):
+    """Refresh tokens revoked on logout (Users.utils.token_blacklist)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('reader')
+        self.refresh = str(RefreshToken.for_user(self.user))
+        self.client = APIClient()
+
+    def refresh_status(self):
+        return self.client.post('/api/Users/refresh/', {'refresh': self.refresh}, format='json').status_code
+
+    def test_logged_out_refresh_token_is_rejected(self):
+        self.assertEqual(self.refresh_status(), 200)
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/Users/logout/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 205)
+        self.assertEqual(self.refresh_status(), 401)
+
+    def test_set_is_reloaded_even_if_the_version_swap_is_lost(self):
+        self.assertEqual(self.refresh_status(), 200)
+        RefreshToken(self.refresh).blacklist()  # On-commit version swap never runs here
+        self.assertEqual(self.refresh_status(), 200)  # Within RELOAD_INTERVAL of the last load
+        with mock.patch.object(token_blacklist, 'RELOAD_INTERVAL', 0):
+            self.assertEqual(self.refresh_status(), 401)
+
+class HashingThrottleTests(TestCase):
+    """Token buckets and the in-flight limit of the password-hashing views (Users.throttling)."""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+
+    def login(self, email='nobody@example.com', **headers):
+        return self.client.post('/api/Users/login/', {'email': email, 'password': 'wrong'}, format='json', **headers)
+
+    def test_ip_bucket_answers_429_with_retry_after(self):
+        with mock.patch.dict(HashingIPThrottle.THROTTLE_RATES, {'hashing_ip': '2/min'}):
+            self.assertEqual(self.login('a@example.com').status_code, 401)
+            self.assertEqual(self.login('b@example.com').status_code, 401)
+            response = self.login('c@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_forwarded_for_header_does_not_pick_the_bucket(self):
+        with mock.patch.dict(HashingIPThrottle.THROTTLE_RATES, {'hashing_ip': '2/min'}):
+            statuses = [
+                self.login(f'user{index}@example.com', HTTP_X_FORWARDED_FOR=f'203.0.113.{index}').status_code
+                for index in range(3)
+            ]
+        self.assertEqual(statuses, [401, 401, 429])
+
+    def test_slot_is_released_when_the_view_raises(self):
+        with mock.patch.object(LoginView, 'post', side_effect=RuntimeError('boom')):
+            for _ in range(settings.HASHING_CONCURRENCY + 1):
+                with self.assertRaises(RuntimeError):
+                    self.login()
+        self.assertEqual(self.login().status_code, 401)  # Not "Server is busy"
+
+class UserEndpointBenchmarkTests(EndpointBenchmarkMixin, TestCase):
+    """Latency and query budgets of the user endpoints (see Journal.tests)."""
+    query_budgets = {
+        'profile': 0,  # User from the auth cache, stamps from the cache
+        'public-profile': 1,
+        'followers': 3,
+        'following': 3,
+        'suggestions': 2,  # Stored suggestions; the cold-start random fallback takes 4
+        'admin-users': 1,
+        'admin-users-summary': 1,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = seed_dataset()
+        cls.admin, cls.viewer, cls.other = cls.users[0], cls.users[1], cls.users[2]
+
+    def test_profile(self):
+        response = self.benchmark('profile', '/api/Users/profile/', self.viewer)
+        self.assertEqual(response.data['id'], self.viewer.id)
+        self.assertEqual(response.data['following_count'], Follow.objects.filter(follower=self.viewer).count())
+
+    def test_public_profile(self):
+        response = self.benchmark('public-profile', f'/api/Users/profile/{self.other.id}/', self.viewer)
+        self.assertEqual(response.data['user']['id'], self.other.id)
+        self.assertEqual(response.data['user']['followers_count'], Follow.objects.filter(followed=self.other).count())
+
+    def test_followers(self):
+        response = self.benchmark('followers', f'/api/Users/followers/{self.other.id}/', self.viewer)
+        followers = Follow.objects.filter(followed=self.other).order_by('follower_id')
+        self.assertEqual(response.data['count'], followers.count())
+        self.assertEqual(
+            [user['id'] for user in response.data['results']], list(followers.values_list('follower_id', flat=True)[:10])
+        )
+
+    def test_following(self):
+        response = self.benchmark('following', f'/api/Users/following/{self.other.id}/', self.viewer)
+        following = Follow.objects.filter(follower=self.other).order_by('followed_id')
+        self.assertEqual(response.data['count'], following.count())
+        self.assertEqual(
+            [user['id'] for user in response.data['results']], list(following.values_list('followed_id', flat=True)[:10])
+        )
+
+    def test_suggestions(self):
+        response = self.benchmark('suggestions', '/api/Users/suggestions/', self.viewer)
+        suggested = {user['id'] for user in response.data['results']}
+        self.assertTrue(suggested)
+        self.assertNotIn(self.viewer.id, suggested)
+        self.assertFalse(Follow.objects.filter(follower=self.viewer, followed_id__in=suggested).exists())
+
+    def test_admin_user_list(self):
+        response = self.benchmark('admin-users', '/api/Users/admin/users/', self.admin)
+        self.assertEqual({user['id'] for user in response.data}, {user.id for user in self.users})
+
+    def test_admin_user_list_summary(self):
+        response = self.benchmark('admin-users-summary', '/api/Users/admin/users/?view=summary', self.admin)
+        self.assertEqual({user['id'] for user in response.data}, {user.id for user in self.users})
@@ -0,0 +1,90 @@
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import SimpleRateThrottle
+
+# Protection for the views that run the password hasher (PBKDF2, tens of ms of CPU
+# each): token-bucket throttles per client IP and per account, and a bounded number
+# of hashing requests in flight per process. Both answer 429 with Retry-After, so a
+# login flood is turned away before it can take CPU from the rest of the API.
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket on top of SimpleRateThrottle's rates: a rate of "10/min" allows a
+    burst of 10 and refills one token every 6 seconds. State is a (tokens, timestamp)
+    pair in the process-local 'throttle' cache.
+    """
+    cache = caches['throttle']
+    cache_format = 'bucket_%(scope)s_%(ident)s'
+    _lock = threading.Lock()  # LocMemCache has no atomic read-modify-write
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        refill_per_second = self.num_requests / self.duration
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self.cache.get(self.key, (self.num_requests, now))
+            tokens = min(self.num_requests, tokens + (now - updated_at) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.cache.set(self.key, (tokens, now), self.duration)
+        self.retry_after = 0 if allowed else (1 - tokens) / refill_per_second
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+class HashingIPThrottle(TokenBucketThrottle):
+    scope = 'hashing_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+class HashingAccountThrottle(TokenBucketThrottle):
+    """Keyed on the account being hashed for: the signed-in user, else the posted email."""
+    scope = 'hashing_account'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            email = request.data.get('email')
+            if not isinstance(email, str) or not email:
+                return None  # Nothing to hash for; the IP bucket still applies
+            ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+_hashing_slots = threading.BoundedSemaphore(settings.HASHING_CONCURRENCY)
+
+class HashingConcurrencyLimitMixin:
+    """
+    Lets at most HASHING_CONCURRENCY requests of the hashing views run at once in
+    this process; the next one gets 429 straight away instead of queueing for CPU.
+    """
+    throttle_classes = [HashingIPThrottle, HashingAccountThrottle]
+    saturated_retry_after = 1
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)  # Throttled requests never take a slot
+        if not _hashing_slots.acquire(blocking=False):
+            raise Throttled(wait=self.saturated_retry_after, detail="Server is busy, try again shortly.")
+        self._holds_hashing_slot = True
+
+    def dispatch(self, request, *args, **kwargs):
+        # Released here rather than in finalize_response, which an exception that
+        # handle_exception re-raises (anything but an APIException) never reaches
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if getattr(self, '_holds_hashing_slot', False):
+                self._holds_hashing_slot = False
+                _hashing_slots.release()
@@ -0,0 +1,39 @@
+# Users/utils/email_backends.py
+import resend
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+
+class ResendEmailBackend(BaseEmailBackend):
+    """
+    Django email backend that sends through the Resend API. Selected with
+    EMAIL_BACKEND; the console and file backends Django ships with can be used
+    instead for local development and tests.
+    """
+
+    def open(self):
+        resend.api_key = settings.RESEND_API_KEY
+
+    def send_messages(self, email_messages):
+        self.open()
+        sent = 0
+        for message in email_messages:
+            try:
+                resend.Emails.send(self._payload(message))
+                sent += 1
+            except Exception:
+                if not self.fail_silently:
+                    raise
+        return sent
+
+    def _payload(self, message):
+        payload = {
+            "from": message.from_email,
+            "to": message.to,
+            "subject": message.subject,
+        }
+        if message.body:
+            payload["text"] = message.body
+        for content, mimetype in getattr(message, 'alternatives', []):
+            if mimetype == 'text/html':
+                payload["html"] = content
+        return payload
@@ -0,0 +1,73 @@
+# Users/utils/follow_graph.py
+import uuid
+from array import array
+from bisect import bisect_left
+from django.core.cache import cache
+from django.db import transaction
+from Users.models import Follow
+from travel.metrics import count_cache_lookup
+
+# Adjacency lists of the follow graph, cached as sorted arrays of 64-bit ids.
+# Each user has a version token; lists are stored under keys that include it, so
+# a follow/unfollow invalidates both endpoints by swapping their tokens, and
+# readers can never combine a new version with a list built before the change.
+KEY_PREFIX = 'follow-graph'
+LIST_TIMEOUT = 60 * 60  # Orphaned lists of old versions simply expire
+FOLLOWING = 'following'
+FOLLOWERS = 'followers'
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:version:{user_id}'
+
+def _list_key(user_id, direction, version):
+    return f'{KEY_PREFIX}:{direction}:{user_id}:{version}'
+
+def _load(user_id, direction):
+    if direction == FOLLOWING:
+        ids = Follow.objects.filter(follower_id=user_id).values_list('followed_id', flat=True)
+    else:
+        ids = Follow.objects.filter(followed_id=user_id).values_list('follower_id', flat=True)
+    return array('q', sorted(ids))
+
+def _adjacency(user_id, direction):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # First read since the token expired or was evicted: start a new version
+        cache.add(_version_key(user_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(user_id))
+    else:
+        packed = cache.get(_list_key(user_id, direction, version))
+        if packed is not None:
+            count_cache_lookup('follow_graph', hit=True)
+            return array('q', packed)
+    count_cache_lookup('follow_graph', hit=False)
+    ids = _load(user_id, direction)
+    if version is not None:
+        cache.set(_list_key(user_id, direction, version), ids.tobytes(), LIST_TIMEOUT)
+    return ids
+
+def following(user_id):
+    """Sorted array of the ids `user_id` follows."""
+    return _adjacency(user_id, FOLLOWING)
+
+def followers(user_id):
+    """Sorted array of the ids following `user_id`."""
+    return _adjacency(user_id, FOLLOWERS)
+
+def contains(ids, user_id):
+    """Membership test on a sorted id array, O(log n)."""
+    index = bisect_left(ids, user_id)
+    return index < len(ids) and ids[index] == user_id
+
+def is_following(follower_id, followed_id):
+    return contains(following(follower_id), followed_id)
+
+def invalidate(*user_ids):
+    """
+    Drop the cached lists of users whose follows changed. Deferred until the
+    transaction commits, so a concurrent reader cannot re-cache the old rows
+    under the new version.
+    """
+    def swap_versions():
+        cache.set_many({_version_key(user_id): uuid.uuid4().hex for user_id in set(user_ids)}, None)
+    transaction.on_commit(swap_versions)
@@ -0,0 +1,85 @@
+# Users/utils/follows.py
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from Journal import versions
+from Users.models import CustomUser, Follow
+from Users.utils import follow_graph, user_cache
+from Users.utils.suggestions import queue_refresh
+
+def following_status(follower_id, user_ids):
+    """{user_id: is_following} for many users, resolved against the cached follow graph."""
+    followed = follow_graph.following(follower_id)
+    return {user_id: follow_graph.contains(followed, user_id) for user_id in user_ids}
+
+def adjust_follow_counts(follower_id, followed_ids, delta):
+    """
+    Atomically move the cached counters for `follower_id` (un)following `followed_ids`
+    by `delta` each: two UPDATEs however many users are involved.
+    """
+    if not followed_ids:
+        return
+    CustomUser.objects.filter(pk=follower_id).update(
+        following_count=Greatest(F('following_count') + delta * len(followed_ids), Value(0))
+    )
+    CustomUser.objects.filter(pk__in=followed_ids).update(
+        followers_count=Greatest(F('followers_count') + delta, Value(0))
+    )
+    user_cache.invalidate(follower_id, *followed_ids)  # UPDATE skips the post_save that does it
+
+def _insert_follows(follower_id, user_ids):
+    # One INSERT ... SELECT for the whole set: unknown ids and the follower themselves are
+    # filtered by the SELECT, existing follows by ON CONFLICT, and RETURNING says what was new
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    sql = (
+        f"INSERT INTO {qn(Follow._meta.db_table)} ({qn('follower_id')}, {qn('followed_id')}, {qn('created_at')}) "
+        f"SELECT %s, {qn('id')}, %s FROM {qn(CustomUser._meta.db_table)} "
+        f"WHERE {qn('id')} IN ({placeholders}) AND {qn('id')} <> %s "
+        f"ON CONFLICT ({qn('follower_id')}, {qn('followed_id')}) DO NOTHING "
+        f"RETURNING {qn('followed_id')}"
+    )
+    params = [follower_id, connection.ops.adapt_datetimefield_value(timezone.now()), *user_ids, follower_id]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+def _delete_follows(follower_id, user_ids):
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    sql = (
+        f"DELETE FROM {qn(Follow._meta.db_table)} "
+        f"WHERE {qn('follower_id')} = %s AND {qn('followed_id')} IN ({placeholders}) "
+        f"RETURNING {qn('followed_id')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [follower_id, *user_ids])
+        return [row[0] for row in cursor.fetchall()]
+
+@transaction.atomic
+def bulk_follow(follower_id, follow_ids=(), unfollow_ids=()):
+    """
+    Follow and unfollow many users with one INSERT and one DELETE. Returns the ids
+    that were actually followed and unfollowed; ids that were already in the wanted
+    state, unknown ids and the follower's own id are skipped.
+    """
+    from Journal import feed  # The feed models depend on this app
+
+    followed = _insert_follows(follower_id, list(follow_ids)) if follow_ids else []
+    unfollowed = _delete_follows(follower_id, list(unfollow_ids)) if unfollow_ids else []
+    # The raw statements bypass the Follow signals that keep counters, the home feed and suggestions in sync
+    adjust_follow_counts(follower_id, followed, 1)
+    adjust_follow_counts(follower_id, unfollowed, -1)
+    if followed:
+        feed.backfill(follower_id, followed)
+    if unfollowed:
+        feed.trim(follower_id, unfollowed)
+    if followed or unfollowed:
+        follow_graph.invalidate(follower_id, *followed, *unfollowed)
+        versions.bump(
+            versions.viewer_scope(follower_id),
+            *(versions.user_scope(user_id) for user_id in (follower_id, *followed, *unfollowed)),
+        )
+        queue_refresh(follower_id)
+    return followed, unfollowed
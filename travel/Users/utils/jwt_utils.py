@@ -1,10 +1,23 @@
 # Users/utils/jwt_utils.py
 from datetime import timedelta
 from django.conf import settings
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.tokens import AccessToken, Token
+from Users.utils import outbox
 
 def generate_email_verification_token(user):
     token = AccessToken.for_user(user)
     token.set_exp(lifetime=timedelta(hours=24))  # expires in 24h
     token["email_verification"] = True
     return str(token)
+
+class PasswordResetToken(Token):
+    """
+    Token for the password reset link. Its own token_type, so it is never accepted
+    as an access token. Valid while the outbox may still be retrying the email,
+    plus an hour for the user to follow the link.
+    """
+    token_type = 'password_reset'
+    lifetime = outbox.max_delivery_delay() + timedelta(hours=1)
+
+def generate_password_reset_token(user):
+    return str(PasswordResetToken.for_user(user))
@@ -0,0 +1,141 @@
+# Users/utils/outbox.py
+import logging
+import random
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from Users.models import OutboundEmail
+from travel.metrics import email_send_duration
+
+logger = logging.getLogger(__name__)
+
+# Outbox of transactional email. Views call enqueue(), which is one INSERT in the
+# request's transaction; the send_queued_emails worker claims due rows in batches,
+# sends them through EMAIL_BACKEND and reschedules failures with exponential backoff.
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = timedelta(seconds=30)  # 30s, 1m, 2m, 4m, ... capped at BACKOFF_MAX
+BACKOFF_MAX = timedelta(hours=1)
+LEASE = timedelta(minutes=5)  # A worker that dies mid-send releases its rows after this
+
+def enqueue(to_email, subject, text_body='', html_body='', from_email=None):
+    return OutboundEmail.objects.create(
+        to_email=to_email,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        next_attempt_at=timezone.now(),
+    )
+
+BACKOFF_JITTER = 1.2
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(1, BACKOFF_JITTER)  # Jitter, so a provider outage does not end in a thundering herd
+
+def max_delivery_delay():
+    """
+    Longest an email can sit in the outbox before its last attempt: every backoff
+    at full jitter plus a lease per attempt. Links in queued emails must stay valid
+    at least this long.
+    """
+    backoffs = sum(
+        (min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX) for attempts in range(1, MAX_ATTEMPTS)), timedelta()
+    )
+    return backoffs * BACKOFF_JITTER + LEASE * MAX_ATTEMPTS
+
+def claim_batch(size):
+    """
+    Lease up to `size` due emails to this worker by pushing their next_attempt_at
+    past LEASE. Concurrent workers skip each other's locked rows where the database
+    supports it, and never see leased rows afterwards.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboundEmail.objects.filter(
+            status=OutboundEmail.PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:size])
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            next_attempt_at=now + LEASE, attempts=F('attempts') + 1
+        )
+    for email in batch:
+        email.attempts += 1
+    return batch
+
+def to_message(email, email_connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.text_body, email.from_email, [email.to_email], connection=email_connection
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+def send_batch(size=50):
+    """Send one batch of due emails over a single backend connection; return (sent, failed)."""
+    batch = claim_batch(size)
+    if not batch:
+        return 0, 0
+
+    email_connection = get_connection(fail_silently=False)
+    try:
+        email_connection.open()
+    except Exception as e:  # Provider unreachable: the whole batch backs off
+        for email in batch:
+            reschedule(email, e)
+        return 0, len(batch)
+
+    sent_ids = []
+    failed = 0
+    try:
+        for email in batch:
+            started = time.perf_counter()
+            try:
+                email_connection.send_messages([to_message(email, email_connection)])
+            except Exception as e:
+                email_send_duration.observe(time.perf_counter() - started, outcome='failed')
+                failed += 1
+                reschedule(email, e)
+            else:
+                email_send_duration.observe(time.perf_counter() - started, outcome='sent')
+                sent_ids.append(email.pk)
+    finally:
+        email_connection.close()
+    OutboundEmail.objects.filter(pk__in=sent_ids).update(
+        status=OutboundEmail.SENT, sent_at=timezone.now(), last_error=''
+    )
+    return len(sent_ids), failed
+
+def reschedule(email, error):
+    if email.attempts >= MAX_ATTEMPTS:
+        logger.error(f"Giving up on email {email.pk} to {email.to_email} after {email.attempts} attempts: {error}")
+        OutboundEmail.objects.filter(pk=email.pk).update(status=OutboundEmail.FAILED, last_error=str(error))
+    else:
+        logger.warning(f"Email {email.pk} to {email.to_email} failed (attempt {email.attempts}): {error}")
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now() + backoff(email.attempts), last_error=str(error)
+        )
+
+def purge_finished(older_than, batch_size=1000):
+    """
+    Delete sent and failed emails whose last attempt is older than `older_than`, in
+    batches so a large backlog does not hold one long transaction. The last claim
+    left next_attempt_at at about the time of that attempt, so this is a range scan
+    of outbox_due_idx. Returns the number of rows deleted.
+    """
+    cutoff = timezone.now() - older_than
+    finished = OutboundEmail.objects.filter(
+        status__in=[OutboundEmail.SENT, OutboundEmail.FAILED], next_attempt_at__lt=cutoff
+    )
+    deleted = 0
+    while True:
+        ids = list(finished.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OutboundEmail.objects.filter(pk__in=ids).delete()[0]
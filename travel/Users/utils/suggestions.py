@@ -0,0 +1,158 @@
+# Users/utils/suggestions.py
+import math
+import random
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from Users.models import CustomUser, Follow, SuggestionRefresh, UserSuggestion
+
+SUGGESTION_LIMIT = 50  # Stored suggestions per user
+MUTUAL_WEIGHT = 1.0
+ENGAGEMENT_WEIGHT = 0.5
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_DAYS = 30
+
+def _add(totals, rows):
+    for user_id, total in rows:
+        totals[user_id] = totals.get(user_id, 0) + total
+
+def score_candidate(mutual_count, engagement_count, latest_connection, now):
+    """
+    Mutual follows dominate; liking/sharing each other's journals and how recently
+    the user's followees connected to the candidate break ties. Counts are log-damped
+    so one very connected candidate does not crowd out the rest.
+    """
+    recency = 0.0
+    if latest_connection is not None:
+        age_days = max((now - latest_connection).total_seconds(), 0) / 86400
+        recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    return (
+        MUTUAL_WEIGHT * math.log1p(mutual_count) +
+        ENGAGEMENT_WEIGHT * math.log1p(engagement_count) +
+        RECENCY_WEIGHT * recency
+    )
+
+def compute_suggestions(user_id, limit=SUGGESTION_LIMIT):
+    """Rank friends-of-friends and users the user engages with, as unsaved UserSuggestion rows."""
+    from Journal.models import Like, SharedJournal  # Journal depends on this app
+
+    followed_ids = Follow.objects.filter(follower_id=user_id).values('followed_id')
+    excluded = set(followed_ids.values_list('followed_id', flat=True)) | {user_id}
+
+    # Friends of friends: who the user's followees follow, with how many of them and how recently
+    mutuals = {}
+    latest = {}
+    for candidate_id, mutual_count, latest_connection in (
+        Follow.objects.filter(follower_id__in=followed_ids).values('followed_id')
+        .annotate(mutual_count=Count('id'), latest_connection=Max('created_at'))
+        .values_list('followed_id', 'mutual_count', 'latest_connection')
+    ):
+        mutuals[candidate_id] = mutual_count
+        latest[candidate_id] = latest_connection
+
+    # Shared engagement: authors whose journals the user liked or shared, and users who liked the user's journals
+    engagement = {}
+    _add(engagement, Like.objects.filter(user_id=user_id).values('journal__user_id')
+         .annotate(total=Count('id')).values_list('journal__user_id', 'total'))
+    _add(engagement, SharedJournal.objects.filter(user_id=user_id).values('journal__user_id')
+         .annotate(total=Count('id')).values_list('journal__user_id', 'total'))
+    _add(engagement, Like.objects.filter(journal__user_id=user_id).values('user_id')
+         .annotate(total=Count('id')).values_list('user_id', 'total'))
+
+    candidate_ids = (mutuals.keys() | engagement.keys()) - excluded
+    if not candidate_ids:
+        return []
+    eligible = set(
+        CustomUser.objects.filter(id__in=candidate_ids, is_active=True, is_blocked=False).values_list('id', flat=True)
+    )
+
+    now = timezone.now()
+    suggestions = [
+        UserSuggestion(
+            user_id=user_id,
+            suggested_id=candidate_id,
+            mutual_count=mutuals.get(candidate_id, 0),
+            score=score_candidate(mutuals.get(candidate_id, 0), engagement.get(candidate_id, 0), latest.get(candidate_id), now),
+        )
+        for candidate_id in eligible
+    ]
+    suggestions.sort(key=lambda suggestion: (-suggestion.score, suggestion.suggested_id))
+    return suggestions[:limit]
+
+@transaction.atomic
+def refresh_suggestions(user_id):
+    """Replace a user's stored suggestions with a fresh ranking."""
+    suggestions = compute_suggestions(user_id)
+    UserSuggestion.objects.filter(user_id=user_id).delete()
+    UserSuggestion.objects.bulk_create(suggestions)
+    return len(suggestions)
+
+def queue_refresh(*user_ids):
+    """
+    Ask the refresh_queued_suggestions worker to re-rank these users (one INSERT, in
+    the caller's transaction). A user already waiting in the queue is not added twice.
+    """
+    now = timezone.now()
+    SuggestionRefresh.objects.bulk_create(
+        [SuggestionRefresh(user_id=user_id, requested_at=now) for user_id in set(user_ids)],
+        ignore_conflicts=True,
+    )
+
+def refresh_queued(batch_size=100):
+    """
+    Refresh the suggestions of up to `batch_size` queued users, oldest request first;
+    returns how many. Rows are removed before ranking, so a follow made meanwhile
+    queues the user again instead of being lost.
+    """
+    with transaction.atomic():
+        pending = SuggestionRefresh.objects.order_by('requested_at')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        user_ids = list(pending.values_list('user_id', flat=True)[:batch_size])
+        SuggestionRefresh.objects.filter(user_id__in=user_ids).delete()
+    for position, user_id in enumerate(user_ids):
+        try:
+            refresh_suggestions(user_id)
+        except Exception:
+            queue_refresh(*user_ids[position:])  # Picked up again on the next pass
+            raise
+    return len(user_ids)
+
+def rebuild_suggestions(batch_size=500):
+    """Batch job: recompute the stored suggestions of every active user, in id batches."""
+    last_id = 0
+    refreshed = 0
+    while True:
+        user_ids = list(
+            CustomUser.objects.filter(id__gt=last_id, is_active=True).order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            break
+        for user_id in user_ids:
+            refresh_suggestions(user_id)
+        refreshed += len(user_ids)
+        last_id = user_ids[-1]
+    return refreshed
+
+def stored_suggestions(user_id):
+    """The user's ranked suggestions, read from the store through the (user, -score) index."""
+    return UserSuggestion.objects.filter(user_id=user_id).select_related('suggested').order_by('-score', 'suggested_id')
+
+def random_suggestions(user_id, size=10):
+    """
+    Cold-start fallback: a random window of users by primary key, which costs two
+    index lookups instead of ORDER BY RANDOM() over the whole table. Followed users
+    are excluded by the query itself.
+    """
+    highest_id = CustomUser.objects.aggregate(highest=Max('id'))['highest']
+    if not highest_id:
+        return []
+    candidates = CustomUser.objects.filter(is_active=True, is_blocked=False).exclude(id=user_id).exclude(
+        id__in=Follow.objects.filter(follower_id=user_id).values('followed_id')
+    )
+    start = random.randint(1, highest_id)
+    users = list(candidates.filter(id__gte=start).order_by('id')[:size])
+    if len(users) < size:  # Wrap around to the lowest ids
+        users += list(candidates.filter(id__lt=start).order_by('id')[:size - len(users)])
+    return users
@@ -0,0 +1,61 @@
+# Users/utils/token_blacklist.py
+import threading
+import time
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+# In-process copy of the blacklisted refresh token JTIs, so the usual "not
+# blacklisted" answer on /refresh/ needs no query. Every process keeps a set of
+# the JTIs of unexpired blacklisted tokens plus the shared version token it was
+# loaded at; blacklisting a token anywhere swaps the version (on commit), and the
+# next check in each process reloads the set. A check costs one cache read.
+# The set is also reloaded every RELOAD_INTERVAL whatever the version says, so a
+# lost version swap (cache flush, a process-local cache) delays a revocation by
+# seconds at most.
+VERSION_KEY = 'jwt-blacklist:version'
+RELOAD_INTERVAL = 5  # Seconds
+
+_lock = threading.Lock()
+_jtis = frozenset()
+_loaded_version = None
+_loaded_at = float('-inf')
+
+def _is_current(version):
+    return (
+        version is not None and version == _loaded_version
+        and time.monotonic() - _loaded_at < RELOAD_INTERVAL
+    )
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+def _reload(version):
+    global _jtis, _loaded_version, _loaded_at
+    with _lock:
+        if _is_current(version):
+            return  # Another thread got here first
+        # Expired tokens fail validation before the blacklist is consulted, so skip them
+        _jtis = frozenset(
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            .values_list('token__jti', flat=True)
+        )
+        _loaded_version = version
+        _loaded_at = time.monotonic()
+
+def is_blacklisted(jti):
+    version = _current_version()
+    if not _is_current(version):
+        # version is None only if the cache is unavailable: then read the rows every time
+        _reload(version)
+    return jti in _jtis
+
+def changed():
+    """Tell every process to reload its set once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None))
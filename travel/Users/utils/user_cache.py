@@ -0,0 +1,45 @@
+# Users/utils/user_cache.py
+import uuid
+from django.core.cache import cache
+from django.db import transaction
+from Users.models import CustomUser
+from travel.metrics import count_cache_lookup
+
+# Users resolved by Users.authentication, cached for a short time so authenticated
+# requests do not load the CustomUser row every time. Versioned like the follow
+# graph (see Users.utils.follow_graph): invalidating swaps the user's version token,
+# so a row read before a change can never be cached under the new version.
+# Secrets are deferred, so they never reach the cache; code that reads them (e.g. a
+# password check) loads them from the database on access.
+KEY_PREFIX = 'auth-user'
+USER_TIMEOUT = 60  # Upper bound on staleness for writes that skip invalidate()
+SECRET_FIELDS = ('password', 'email_verification_token')
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:version:{user_id}'
+
+def _user_key(user_id, version):
+    return f'{KEY_PREFIX}:{user_id}:{version}'
+
+def get_user(user_id):
+    """The CustomUser with this id, from the cache when possible. Raises CustomUser.DoesNotExist."""
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(user_id))
+    else:
+        user = cache.get(_user_key(user_id, version))
+        if user is not None:
+            count_cache_lookup('auth_user', hit=True)
+            return user
+    count_cache_lookup('auth_user', hit=False)
+    user = CustomUser.objects.defer(*SECRET_FIELDS).get(pk=user_id)
+    if version is not None:
+        cache.set(_user_key(user_id, version), user, USER_TIMEOUT)
+    return user
+
+def invalidate(*user_ids):
+    """Drop cached users once the current transaction commits (block, password change, edits...)."""
+    def swap_versions():
+        cache.set_many({_version_key(user_id): uuid.uuid4().hex for user_id in set(user_ids)}, None)
+    transaction.on_commit(swap_versions)
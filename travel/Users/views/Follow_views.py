@@ -5,16 +5,20 @@ from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 
 from Users.models import Follow
-from Journal.serializers import PublicUserSerializer
+from Users.serializers import BulkFollowSerializer, MAX_USER_ID
+from Users.utils.follows import following_status, bulk_follow
+from Users.utils.suggestions import stored_suggestions, random_suggestions
+from Users.utils import follow_graph
+from Journal.serializers import PublicUserSerializer, split_param
 
 User = get_user_model()
 
 class FollowViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = PublicUserSerializer
+    max_status_ids = 100
 
     def get_queryset(self):
         followed_id = self.request.query_params.get('followed')
@@ -42,9 +46,7 @@ class FollowViewSet(viewsets.ModelViewSet):
             )
         try:
             followed = User.objects.get(id=followed_id)
-            is_following = Follow.objects.filter(
-                follower=request.user, followed=followed
-            ).exists()
+            is_following = follow_graph.is_following(request.user.id, followed.id)
             return Response({"is_following": is_following}, status=status.HTTP_200_OK)
         except User.DoesNotExist:
             return Response(
@@ -52,6 +54,47 @@ class FollowViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @action(detail=False, methods=['get'], url_path='statuses')
+    def check_follow_statuses(self, request):
+        """
+        Follow status of many users at once: ?ids=1,2,3 -> {"1": true, "2": false, ...}
+        """
+        try:
+            user_ids = sorted({int(user_id) for user_id in split_param(request.query_params.get('ids'))})
+        except ValueError:
+            return Response(
+                {"detail": "User IDs must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if user_ids and not 1 <= user_ids[0] <= user_ids[-1] <= MAX_USER_ID:
+            return Response(
+                {"detail": f"User IDs must be between 1 and {MAX_USER_ID}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not user_ids:
+            return Response(
+                {"detail": "User IDs are required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(user_ids) > self.max_status_ids:
+            return Response(
+                {"detail": f"At most {self.max_status_ids} user IDs per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(following_status(request.user.id, user_ids), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Follow and unfollow many users at once: {"follow": [1, 2], "unfollow": [3]}.
+        """
+        serializer = BulkFollowSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        followed, unfollowed = bulk_follow(
+            request.user.id, serializer.validated_data['follow'], serializer.validated_data['unfollow']
+        )
+        return Response({"followed": followed, "unfollowed": unfollowed}, status=status.HTTP_200_OK)
+
     def create(self, request, *args, **kwargs):
         followed_id = request.data.get('followed')
         if not followed_id:
@@ -93,23 +136,31 @@ class FollowViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class UserSuggestionsView(APIView):
+    """
+    People the user may want to follow, best first.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        followed_ids = Follow.objects.filter(
-            follower=request.user
-        ).values_list('followed__id', flat=True)
-
-        suggestions = User.objects.filter(
-            ~Q(id__in=followed_ids),
-            ~Q(id=request.user.id)
-        ).order_by('?')
-
         paginator = PageNumberPagination()
         paginator.page_size = 10
+
+        # Ranked list precomputed by Users.utils.suggestions, random users until there is one
+        suggestions = stored_suggestions(request.user.id)
         page = paginator.paginate_queryset(suggestions, request)
+        if page:
+            # Rows are replaced on every follow, this only guards against a concurrent one
+            followed = follow_graph.following(request.user.id)
+            users = [
+                suggestion.suggested for suggestion in page
+                if not follow_graph.contains(followed, suggestion.suggested_id)
+            ]
+        elif paginator.page.paginator.count == 0:
+            users = paginator.paginate_queryset(random_suggestions(request.user.id, paginator.page_size), request)
+        else:
+            users = []
 
-        serializer = PublicUserSerializer(page, many=True, context={'request': request})
+        serializer = PublicUserSerializer(users, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
 
 class ProfileView(generics.RetrieveAPIView):
@@ -135,7 +186,7 @@ class FollowersView(APIView):
 
         followers = User.objects.filter(
             id__in=Follow.objects.filter(followed=user).values_list('follower_id', flat=True)
-        )
+        ).order_by('id')  # Stable pages
 
         paginator = PageNumberPagination()
         paginator.page_size = 10
@@ -161,7 +212,7 @@ class FollowingView(APIView):
 
         following = User.objects.filter(
             id__in=Follow.objects.filter(follower=user).values_list('followed_id', flat=True)
-        )
+        ).order_by('id')  # Stable pages
 
         paginator = PageNumberPagination()
         paginator.page_size = 10
@@ -4,7 +4,7 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from django.core.mail import send_mail
 from django.conf import settings
-from Users.serializers import UserSerializer
+from Users.serializers import UserSerializer, user_serializer_class
 from Users.models import CustomUser
 import logging
 
@@ -15,6 +15,9 @@ class AdminUserListView(generics.ListCreateAPIView):
     serializer_class = UserSerializer  #tells the view which serializer to use for validating input and formatting output data.
     permission_classes = [IsAdminUser]
 
+    def get_serializer_class(self):
+        return user_serializer_class(self.request)  # ?view=summary for a lighter list
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True) #checks if the input data is valid according to the serializer rules.If validation fails, it raises a ValidationError immediately, returning a 400 Bad Request with error details.
@@ -6,9 +6,10 @@ from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 from Users.serializers import RegisterSerializer
 from Users.models import CustomUser
 from Users.utils.email_utils import send_verification_email
+from Users.throttling import HashingConcurrencyLimitMixin
 import uuid
 from django.contrib.auth import authenticate  # Add this import
-class RegisterView(APIView):
+class RegisterView(HashingConcurrencyLimitMixin, APIView):
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
@@ -22,7 +23,7 @@ class RegisterView(APIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class LoginView(APIView):
+class LoginView(HashingConcurrencyLimitMixin, APIView):
     def post(self, request):
         email = request.data.get('email')
         password = request.data.get('password')
@@ -24,10 +24,10 @@ class ResendVerificationEmailView(APIView):
                     {'error': 'Email is already verified', 'code': 'already_verified'},
                     status=status.HTTP_200_OK
                 )
-            logger.info(f"Sending verification email to {email}")
+            logger.info(f"Queueing verification email to {email}")
             send_verification_email(user)
             return Response(
-                {'message': 'Verification email sent'},
+                {'message': 'Verification email sent'},  # Queued, the worker sends it shortly
                 status=status.HTTP_200_OK
             )
         except CustomUser.DoesNotExist:
@@ -2,22 +2,32 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from Users.serializers import UserSerializer, PasswordResetSerializer
+from Users.serializers import UserSerializer, PasswordResetSerializer, user_serializer_class
 from Users.models import CustomUser
-from Journal.models import Journal
-from Journal.serializers import JournalSerializer
-from django.core.mail import send_mail
-from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
+from Journal import versions
+from Journal.conditional import ConditionalGetMixin
+from Users.utils import outbox
+from Users.throttling import HashingConcurrencyLimitMixin
+from Users.utils.jwt_utils import generate_password_reset_token
 from django.contrib.auth.hashers import check_password
 import logging
 logger = logging.getLogger(__name__)
 
-class ProfileView(APIView):
+def profile_stamps(user_id, viewer_id):
+    stamps = versions.get_stamps([versions.user_scope(user_id), versions.viewer_scope(viewer_id)])
+    return stamps, max(versions.stamp_time(stamp) for stamp in stamps.values())
+
+class ProfileView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_version_stamps(self, request):
+        return profile_stamps(request.user.pk, request.user.pk)
+
     def get(self, request):
-        serializer = UserSerializer(request.user)
+        return self.conditional_get(self.get_profile, request)
+
+    def get_profile(self, request):
+        serializer = user_serializer_class(request)(request.user, context={'request': request})
         return Response(serializer.data)
 
     def put(self, request):
@@ -25,35 +35,40 @@ class ProfileView(APIView):
         profile_image = request.FILES.get('profile_image')
         banner_image = request.FILES.get('banner_image')
         if profile_image or banner_image:
+            update_fields = []
             if profile_image:
                 user.profile_image = profile_image
+                update_fields.append('profile_image')
             if banner_image:
                 user.banner_image = banner_image
-            user.save()
+                update_fields.append('banner_image')
+            user.save(update_fields=update_fields)  # request.user may be a stale cached copy, see UserSerializer.update
         else:
-            serializer = UserSerializer(user, data=request.data, partial=True)
+            serializer = UserSerializer(user, data=request.data, partial=True, context={'request': request})
             if serializer.is_valid():
                 serializer.save()
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = UserSerializer(user)
+        serializer = UserSerializer(user, context={'request': request})
         return Response(serializer.data)
 
-class PublicProfileView(APIView):
+class PublicProfileView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_version_stamps(self, request, userId):
+        # An id that never existed still gets a stamp; the 404 it answers is not cached by clients
+        return profile_stamps(userId, request.user.pk)
+
     def get(self, request, userId):
+        return self.conditional_get(self.get_profile, request, userId)
+
+    def get_profile(self, request, userId):
         try:
             user = CustomUser.objects.get(id=userId)
-            user_serializer = UserSerializer(user)
-            journals = Journal.objects.filter(user=user).order_by('-created_at')
-            journal_serializer = JournalSerializer(journals, many=True, context={'request': request})
-            data = {
-                'user': user_serializer.data,
-                'journals': journal_serializer.data
-            }
-            return Response(data)
+            # Journals are paged from user['journals_url'] rather than embedded here
+            user_serializer = user_serializer_class(request)(user, context={'request': request})
+            return Response({'user': user_serializer.data})
         except CustomUser.DoesNotExist:
             return Response({"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -63,14 +78,14 @@ class PasswordResetRequestView(APIView):
         if serializer.is_valid():
             email = serializer.validated_data['email']
             user = CustomUser.objects.get(email=email)
-            token = RefreshToken.for_user(user).access_token
+            token = generate_password_reset_token(user)  # Outlives the outbox's retries
             subject = 'Password Reset'
             message = f'Click to reset your password: http://localhost:5173/reset-password/{user.id}/{token}/'
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+            outbox.enqueue(email, subject, text_body=message)
             return Response({"message": "Password reset email sent"}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-class EditUserDetailView(APIView):
+class EditUserDetailView(HashingConcurrencyLimitMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def put(self, request):
@@ -88,7 +103,7 @@ class EditUserDetailView(APIView):
         data = request.data.copy()
         data.pop('current_password', None)
 
-        serializer = UserSerializer(user, data=data, partial=True)
+        serializer = UserSerializer(user, data=data, partial=True, context={'request': request})
 
         if serializer.is_valid():
             serializer.save()
@@ -0,0 +1,62 @@
+import contextvars
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from django.db import connections
+
+# Per-request performance accounting used by travel.middleware.PerformanceMiddleware:
+# wall time per phase, every SQL statement (time and a count per distinct statement,
+# which is how N+1 patterns show up) and the view's own time, which is where DRF
+# views serialize.
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = Counter()  # name -> seconds
+        self.queries = 0
+        self.statements = Counter()  # SQL with placeholders -> executions
+        self._view_mark = None  # (started, db seconds so far) while the view runs
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def duplicate_statements(self, threshold):
+        """[(sql, count)] of statements run at least `threshold` times, most repeated first."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def view_started(self):
+        self._view_mark = (time.perf_counter(), self.phases['db'])
+
+    def view_finished(self):
+        """Add the time since view_started(), less the queries run meanwhile, to the 'view' phase."""
+        if self._view_mark is None:
+            return
+        started, db = self._view_mark
+        self._view_mark = None
+        self.phases['view'] += (time.perf_counter() - started) - (self.phases['db'] - db)
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.phases['db'] += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+    @contextmanager
+    def capture(self):
+        """Record the SQL of every database connection while active."""
+        token = _current.set(self)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self.record_query))
+                yield self
+        finally:
+            _current.reset(token)
+
+def current_metrics():
+    return _current.get()
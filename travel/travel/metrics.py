@@ -0,0 +1,328 @@
+import atexit
+import functools
+import glob
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: scrapes lock with msvcrt and check liveness through kernel32
+    fcntl = None
+    import ctypes
+    import msvcrt
+
+# Minimal Prometheus-style metrics registry. Updates are in-memory (a dict update
+# under a lock). With settings.METRICS_DIR set, each worker process also writes its
+# values to its own file there, at most every FLUSH_INTERVAL seconds and at exit,
+# and /metrics sums the files of all processes, so any worker can answer a scrape.
+# A scrape folds the files of processes that have exited into ARCHIVE_FILE and
+# deletes them: their counts stay in the totals (counters remain monotonic across
+# worker restarts) without one file per dead process piling up. Liveness is
+# checked by pid, so METRICS_DIR must not be shared between hosts.
+
+FLUSH_INTERVAL = 5
+ARCHIVE_FILE = 'metrics-archive.json'
+LOCK_FILE = 'metrics.lock'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PROCESS_FILE = re.compile(r'metrics-(\d+)-[0-9a-f]+\.json$')
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            values = self.registry.values_for(self)
+            values[key] = values.get(key, 0) + amount
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            values = self.registry.values_for(self)
+            state = values.get(key)
+            if state is None:
+                state = values[key] = [[0] * len(self.buckets), 0.0, 0]  # Per-bucket counts, sum, count
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self._values = {}
+        self._pid = os.getpid()
+        self._file = None
+        self._flushed_at = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def _check_fork(self):
+        if os.getpid() != self._pid:
+            # Forked worker: the parent's numbers are the parent's to report
+            self._pid = os.getpid()
+            self._values = {}
+            self._file = None
+
+    def values_for(self, metric):
+        self._check_fork()
+        return self._values.setdefault(metric.name, {})
+
+    # Multi-process storage
+
+    def _directory(self):
+        return getattr(settings, 'METRICS_DIR', '')
+
+    def maybe_flush(self):
+        if self._directory() and time.monotonic() - self._flushed_at >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        directory = self._directory()
+        if not directory:
+            return
+        with self.lock:
+            self._check_fork()
+            snapshot = {
+                name: [[list(key), value] for key, value in values.items()]
+                for name, values in self._values.items()
+            }
+            if self._file is None:
+                self._file = os.path.join(directory, f'metrics-{self._pid}-{uuid.uuid4().hex[:8]}.json')
+            path = self._file
+            self._flushed_at = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        _write(directory, path, snapshot)
+
+    def collect(self):
+        """{metric name: {label values: value}} summed over every process."""
+        directory = self._directory()
+        if not directory:
+            with self.lock:
+                return {
+                    name: {key: _copy(value) for key, value in values.items()}
+                    for name, values in self._values.items()
+                }
+        self.flush()
+        # Scrapes in other processes would otherwise count a file both in the archive and on its own
+        with _exclusive_lock(os.path.join(directory, LOCK_FILE)):
+            self._archive_dead(directory)
+            totals = {}
+            for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+                _merge(totals, _read(path))
+        return totals
+
+    def _archive_dead(self, directory):
+        dead = [
+            path for path in glob.glob(os.path.join(directory, 'metrics-*.json'))
+            if (match := PROCESS_FILE.search(path)) and not _is_running(int(match.group(1)))
+        ]
+        if not dead:
+            return
+        archive = os.path.join(directory, ARCHIVE_FILE)
+        totals = _merge({}, _read(archive))
+        for path in dead:
+            _merge(totals, _read(path))
+        _write(directory, archive, {
+            name: [[list(key), value] for key, value in values.items()] for name, values in totals.items()
+        })
+        for path in dead:
+            os.remove(path)
+
+    def render(self):
+        """Text exposition format (version 0.0.4)."""
+        values = self.collect()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for key, value in sorted(values.get(name, {}).items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.kind == 'counter':
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                    continue
+                bucket_counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{_labels(labels + [("le", _number(bound))])} {cumulative}')
+                lines.append(f'{name}_bucket{_labels(labels + [("le", "+Inf")])} {count}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+                lines.append(f'{name}_count{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+@contextmanager
+def _exclusive_lock(path):
+    """Hold an exclusive lock on `path` across processes (flock, or msvcrt.locking on Windows)."""
+    with open(path, 'ab') as stream:
+        if fcntl is not None:
+            fcntl.flock(stream, fcntl.LOCK_EX)  # Released when the file is closed
+            yield
+            return
+        stream.seek(0)  # msvcrt locks bytes from the current position; the first one stands for the file
+        while True:
+            try:
+                msvcrt.locking(stream.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:  # LK_LOCK gives up after about ten seconds; keep waiting like flock
+                continue
+        try:
+            yield
+        finally:
+            stream.seek(0)
+            msvcrt.locking(stream.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _is_running(pid):
+    if fcntl is None:
+        return _is_running_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, under another user
+    return True
+
+def _is_running_windows(pid):
+    # os.kill(pid, 0) would terminate the process on Windows
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return ctypes.get_last_error() == 5  # ERROR_ACCESS_DENIED: alive, under another user
+    try:
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        return exit_code.value == 259  # STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+def _read(path):
+    try:
+        with open(path) as stream:
+            return json.load(stream)
+    except (OSError, ValueError):
+        return {}  # Missing, or removed or replaced while listing
+
+def _write(directory, path, snapshot):
+    # Write then rename, so a scrape never reads half a file
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as stream:
+        json.dump(snapshot, stream)
+    os.replace(temporary, path)
+
+def _merge(totals, snapshot):
+    for name, entries in snapshot.items():
+        merged = totals.setdefault(name, {})
+        for key, value in entries:
+            key = tuple(key)
+            merged[key] = _add(merged.get(key), value)
+    return totals
+
+def _copy(value):
+    return [list(value[0]), value[1], value[2]] if isinstance(value, list) else value
+
+def _add(current, value):
+    if current is None:
+        return _copy(value)
+    if isinstance(value, list):
+        return [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]]
+    return current + value
+
+def _number(value):
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+registry = Registry()
+atexit.register(registry.flush)
+
+# Metrics of the app. Labels are URL names and handler names, never paths or ids,
+# so the number of series stays bounded.
+request_duration = Histogram(
+    registry, 'http_request_duration_seconds', 'Request wall time by URL name.', ['view', 'method'],
+)
+requests_total = Counter(
+    registry, 'http_requests_total', 'Requests by URL name and status code.', ['view', 'method', 'status'],
+)
+request_queries = Histogram(
+    registry, 'http_request_db_queries', 'Database queries per request by URL name.', ['view'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+signal_handler_duration = Histogram(
+    registry, 'signal_handler_duration_seconds', 'Time spent in model signal handlers.', ['handler'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+email_send_duration = Histogram(
+    registry, 'outbound_email_send_duration_seconds', 'Time to hand one email to the backend.', ['outcome'],
+)
+cache_lookups = Counter(
+    registry, 'cache_lookups_total', 'App-level cache lookups by cache and result (hit/miss).', ['cache', 'result'],
+)
+
+def timed_signal_handler(handler):
+    """Decorator (under @receiver) recording the handler's time in signal_handler_duration."""
+    name = f'{handler.__module__}.{handler.__name__}'
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with signal_handler_duration.time(handler=name):
+            return handler(*args, **kwargs)
+    return wrapper
+
+def count_cache_lookup(cache, hit):
+    cache_lookups.inc(cache=cache, result='hit' if hit else 'miss')
@@ -0,0 +1,158 @@
+import json
+import logging
+import time
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from travel import metrics as app_metrics
+from travel.instrumentation import RequestMetrics, current_metrics
+
+performance_logger = logging.getLogger('travel.performance')
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are only ever gzipped
+    brotli = None
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header; malformed q-values count as 0."""
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding.strip().lower()] = quality
+    return codings
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that negotiates brotli too (when the brotli package is installed)
+    and leaves responses shorter than settings.COMPRESSION_MIN_LENGTH alone, since
+    below about a packet the CPU is spent for nothing. Streaming responses are gzipped
+    as Django does.
+    """
+    brotli_quality = 5  # Most of brotli's gain over gzip at a fraction of the cost of the default 11
+
+    def negotiate(self, request):
+        codings = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        available = ['br', 'gzip'] if brotli is not None else ['gzip']  # Preferred first on a tie
+        quality = {coding: codings.get(coding, codings.get('*', 0.0)) for coding in available}
+        best = max(available, key=lambda coding: quality[coding])
+        return best if quality[best] > 0 else None
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+            return response
+
+        coding = self.negotiate(request)
+        if coding != 'br' or response.streaming:
+            if coding is None:
+                patch_vary_headers(response, ('Accept-Encoding',))
+                return response
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed_content = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+        # Weak ETag, as GZipMiddleware does, so If-None-Match still matches
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+class PerformanceMiddleware:
+    """
+    Per-request telemetry: wall time, DB query count and time, view and render time,
+    response bytes, and statements repeated PERF_DUPLICATE_QUERY_THRESHOLD or more
+    times (the signature of an N+1). View time is the view's own work less its
+    queries, which for DRF views is mostly serialization; it is measured from
+    process_view to process_template_response, so only views returning DRF or
+    template responses have it. Sent as a Server-Timing header when DEBUG is on,
+    otherwise as one JSON log line on the 'travel.performance' logger (PERF_LOG_LEVEL
+    above INFO silences it); always aggregated per URL name into the /metrics
+    histograms (see travel.metrics). Placed first, so the numbers cover the whole
+    stack and bytes are what is sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with RequestMetrics().capture() as metrics:
+            response = self.get_response(request)
+        self.report(request, response, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.view_started()
+        return None
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that as its own phase
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.view_finished()
+            started = time.perf_counter()
+            def rendered(response):
+                metrics.phases['render'] += time.perf_counter() - started
+            response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, metrics):
+        total = metrics.elapsed()
+        duplicates = metrics.duplicate_statements(settings.PERF_DUPLICATE_QUERY_THRESHOLD)
+        size = None if response.streaming else len(response.content)
+        match = request.resolver_match
+        view = match.view_name if match and match.view_name else 'unmatched'
+
+        app_metrics.request_duration.observe(total, view=view, method=request.method)
+        app_metrics.requests_total.inc(view=view, method=request.method, status=response.status_code)
+        app_metrics.request_queries.observe(metrics.queries, view=view)
+        app_metrics.registry.maybe_flush()
+
+        if settings.DEBUG:
+            timings = [
+                f'total;dur={total * 1000:.1f}',
+                f'db;dur={metrics.phases["db"] * 1000:.1f};desc="{metrics.queries} queries"',
+                f'view;dur={metrics.phases["view"] * 1000:.1f}',
+                f'render;dur={metrics.phases["render"] * 1000:.1f}',
+            ]
+            if duplicates:
+                repeated = sum(count for _, count in duplicates)
+                timings.append(f'dup;desc="{len(duplicates)} statements repeated, {repeated} executions"')
+            response['Server-Timing'] = ', '.join(timings)
+        else:
+            performance_logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_ms': round(metrics.phases['db'] * 1000, 2),
+                'queries': metrics.queries,
+                'view_ms': round(metrics.phases['view'] * 1000, 2),
+                'render_ms': round(metrics.phases['render'] * 1000, 2),
+                'bytes': size,
+                'duplicates': [{'sql': sql[:300], 'count': count} for sql, count in duplicates],
+            }))
+        if duplicates:
+            performance_logger.warning(
+                f"{request.method} {request.path}: {len(duplicates)} statements run repeatedly "
+                f"(possible N+1), most repeated {duplicates[0][1]}x: {duplicates[0][0][:300]}"
+            )
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,8 +29,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'travel.middleware.PerformanceMiddleware',  # First, so its timings cover everything below
     'corsheaders.middleware.CorsMiddleware',  # Added before CommonMiddleware
     'django.middleware.security.SecurityMiddleware',
+    'travel.middleware.CompressionMiddleware',  # gzip/brotli, before anything that reads the body
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -67,22 +70,105 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'travel.wsgi.application'
 
-# Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('DB_NAME'),
-        'USER': config('DB_USER'),
-        'PASSWORD': config('DB_PASSWORD'),
-        'HOST': config('DB_HOST'),
-        'PORT': config('DB_PORT'),
+# Database. DB_ENGINE=sqlite runs on a local file instead of Postgres, e.g. for the
+# benchmark / query-budget suites (python manage.py test Journal Users).
+if config('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME'),
+            'USER': config('DB_USER'),
+            'PASSWORD': config('DB_PASSWORD'),
+            'HOST': config('DB_HOST'),
+            'PORT': config('DB_PORT'),
+        }
+    }
+
+# Cache (follow graph, user cache, response versions, token blacklist). Their
+# invalidations must reach every worker process, so a shared Redis is required
+# outside DEBUG; the process-local fallback is only for a single dev server.
+REDIS_URL = config('REDIS_URL', default='')
+if not REDIS_URL and not DEBUG:
+    raise ImproperlyConfigured('REDIS_URL must be set when DEBUG is off')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Process-local on purpose: login throttles must keep working if Redis is slow or down
+CACHES['throttle'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'throttle',
 }
 
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    'DEFAULT_AUTHENTICATION_CLASSES': ('Users.authentication.CachedJWTAuthentication',),
+    # orjson-backed when orjson is installed, DRF's json otherwise (see travel.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'travel.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'travel.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Token buckets for the password-hashing views (see Users.throttling)
+    'DEFAULT_THROTTLE_RATES': {
+        'hashing_ip': config('HASHING_IP_RATE', default='30/min'),
+        'hashing_account': config('HASHING_ACCOUNT_RATE', default='10/min'),
+    },
+    # Reverse proxies in front of the app. Throttles key on the client address they
+    # append to X-Forwarded-For; with 0, on REMOTE_ADDR, so a client cannot pick its
+    # own bucket by sending the header itself.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
+# Password-hashing requests allowed in flight per worker process; more get a 429
+HASHING_CONCURRENCY = config('HASHING_CONCURRENCY', default=2, cast=int)
+
+# Statements run this many times in one request are reported as a possible N+1
+# (see travel.middleware.PerformanceMiddleware)
+PERF_DUPLICATE_QUERY_THRESHOLD = config('PERF_DUPLICATE_QUERY_THRESHOLD', default=5, cast=int)
+# Level of the 'travel.performance' logger; WARNING keeps only the N+1 warnings (e.g. in CI)
+PERF_LOG_LEVEL = config('PERF_LOG_LEVEL', default='INFO')
+
+# /metrics (see travel.metrics): scrapers send "Authorization: Bearer <METRICS_TOKEN>";
+# the endpoint is off while it is empty. With several worker processes, point
+# METRICS_DIR at a directory they share (emptied on deploy) so a scrape sees all of them.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_DIR = config('METRICS_DIR', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # One JSON line per request outside DEBUG, for the log pipeline to parse
+        'travel.performance': {'handlers': ['console'], 'level': PERF_LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# Responses smaller than this are sent uncompressed (see travel.middleware)
+COMPRESSION_MIN_LENGTH = config('COMPRESSION_MIN_LENGTH', default=1024, cast=int)
+
 from datetime import timedelta
 
 #Change Token Lifetimes
@@ -92,6 +178,8 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Blacklist checked in memory, user read from the cache (see Users.authentication)
+    'TOKEN_REFRESH_SERIALIZER': 'Users.authentication.FilteredTokenRefreshSerializer',
 }
 
 # Password validation
@@ -129,4 +217,9 @@ FRONTEND_URL = "http://localhost:5173"
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 RESEND_API_KEY = config("RESEND_API_KEY")
-DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL")
\ No newline at end of file
+DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL")
+
+# Used by the send_queued_emails worker (see Users.utils.outbox). For local runs use
+# django.core.mail.backends.console.EmailBackend or .filebased.EmailBackend.
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='Users.utils.email_backends.ResendEmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
\ No newline at end of file
@@ -0,0 +1,139 @@
+import logging
+import os
+import statistics
+import sys
+import time
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Shared pieces of the test suites in Journal/tests.py and Users/tests.py: users for
+# behaviour tests, and the dataset and helpers of the endpoint benchmark / query-budget
+# suites. The benchmark dataset size comes from the environment, e.g.
+#   BENCH_USERS=200 BENCH_JOURNALS_PER_USER=10 python manage.py test Journal Users
+# Query counts must not grow with it; that is what the budgets check. The suites run
+# against the configured Postgres, or SQLite with DB_ENGINE=sqlite (see settings).
+
+def bench_setting(name, default):
+    return int(os.environ.get(f'BENCH_{name}', default))
+
+DATASET = {
+    'users': bench_setting('USERS', 30),
+    'journals_per_user': bench_setting('JOURNALS_PER_USER', 4),
+    'follows_per_user': bench_setting('FOLLOWS_PER_USER', 12),
+    'likes_per_journal': bench_setting('LIKES_PER_JOURNAL', 5),
+    'comments_per_journal': bench_setting('COMMENTS_PER_JOURNAL', 3),
+    'replies_per_comment': bench_setting('REPLIES_PER_COMMENT', 2),
+    'shares_per_user': bench_setting('SHARES_PER_USER', 2),
+}
+ROUNDS = bench_setting('ROUNDS', 5)
+
+def make_user(name, **fields):
+    """A verified user without a usable password (no hashing), for tests that authenticate with tokens."""
+    from Users.models import CustomUser
+
+    return CustomUser.objects.create_user(
+        email=f'{name}@example.com', password=None, first_name=name.title(), last_name='Test',
+        is_verified=True, **fields,
+    )
+
+def seed_dataset():
+    """
+    Users following each other in a ring, with journals, likes, threaded comments and
+    shares, created through the ORM so signals keep counters and feeds as in production.
+    Returns the users, the first of which is staff.
+    """
+    from Journal.models import Comment, Journal, Like, SharedJournal
+    from Users.models import CustomUser, Follow
+    from Users.utils.suggestions import refresh_queued
+
+    size = DATASET
+    users = [
+        CustomUser.objects.create_user(
+            email=f'bench{index}@example.com', password=None, first_name=f'User{index}',  # No hashing, tokens only
+            last_name='Bench', is_verified=True, is_staff=index == 0,
+        )
+        for index in range(size['users'])
+    ]
+    journals = [
+        Journal.objects.create(user=user, title=f'Trip {index} of {user.first_name}', content='Long day on the road. ' * 20)
+        for user in users for index in range(size['journals_per_user'])
+    ]
+    for position, user in enumerate(users):
+        for step in range(1, min(size['follows_per_user'], len(users) - 1) + 1):
+            Follow.objects.create(follower=user, followed=users[(position + step) % len(users)])
+    for position, journal in enumerate(journals):
+        for step in range(min(size['likes_per_journal'], len(users))):
+            Like.objects.create(user=users[(position + step) % len(users)], journal=journal)
+        for step in range(size['comments_per_journal']):
+            comment = Comment.objects.create(
+                user=users[(position + step) % len(users)], journal=journal, content='Great photos!'
+            )
+            for reply in range(size['replies_per_comment']):
+                Comment.objects.create(
+                    user=users[(position + reply + 1) % len(users)], journal=journal, parent=comment, content='Agreed'
+                )
+    for position, user in enumerate(users):
+        for step in range(1, size['shares_per_user'] + 1):
+            SharedJournal.objects.create(user=user, journal=journals[(position * 7 + step) % len(journals)])
+    refresh_queued(batch_size=len(users))  # What the refresh_queued_suggestions worker does
+    return users
+
+class EndpointBenchmarkMixin:
+    """
+    benchmark() times ROUNDS warm GETs of an endpoint as `user` (through JWT
+    authentication, like a real client), fails when any of them ran more queries
+    than its budget, and reports p50/p95 latency and queries after the test class.
+    """
+    query_budgets = {}  # Endpoint name -> maximum queries per request
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.benchmark_results = []
+        # Keep the per-request JSON lines out of the report; N+1 warnings still show
+        performance_logger = logging.getLogger('travel.performance')
+        cls.addClassCleanup(performance_logger.setLevel, performance_logger.level)
+        performance_logger.setLevel(logging.WARNING)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.benchmark_results:
+            vendor = connection.vendor
+            lines = [f"\n{cls.__name__} on {vendor} ({ROUNDS} rounds, dataset {DATASET})"]
+            lines.append(f"{'endpoint':<22} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'budget':>7}")
+            for name, p50, p95, queries, budget in cls.benchmark_results:
+                lines.append(f"{name:<22} {p50:>8.2f} {p95:>8.2f} {queries:>8} {budget:>7}")
+            sys.stderr.write('\n'.join(lines) + '\n')
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()  # Caches outlive the test transaction; start every test cold
+
+    def benchmark(self, name, url, user):
+        budget = self.query_budgets[name]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        response = client.get(url)  # Warm-up: fill the app caches the way steady traffic would
+        self.assertEqual(response.status_code, 200, f"{name}: {response.status_code} {getattr(response, 'data', '')}")
+
+        timings = []
+        counts = []
+        for _ in range(ROUNDS):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+            self.assertLessEqual(
+                len(queries), budget,
+                f"{name} ran {len(queries)} queries, budget is {budget}:\n"
+                + '\n'.join(query['sql'] for query in queries.captured_queries),
+            )
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        self.benchmark_results.append((name, statistics.median(timings), p95, max(counts), budget))
+        return response
@@ -0,0 +1,208 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from travel import metrics, middleware
+from travel.middleware import CompressionMiddleware, parse_accept_encoding
+from travel.renderers import FastJSONParser, FastJSONRenderer
+from travel.testing import make_user
+
+class RendererTests(SimpleTestCase):
+    """orjson-backed renderer and parser match DRF's JSON output and input (travel.renderers)."""
+
+    data = {
+        'id': 7,
+        'title': 'Café \u2028 line',
+        'score': Decimal('1.50'),
+        'created_at': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'counts': {1: 'one', 2: 'two'},
+        'tags': ['road', None, True],
+    }
+
+    def test_renders_what_drf_renders(self):
+        fast, stock = FastJSONRenderer().render(self.data), JSONRenderer().render(self.data)
+        self.assertEqual(json.loads(fast), json.loads(stock))
+        self.assertNotIn('\u2028'.encode(), fast)  # Escaped, so the output stays valid JavaScript
+
+    def test_integers_beyond_64_bits_fall_back_to_drf(self):
+        data = {'id': 99999999999999999999999}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_uses_drf(self):
+        rendered = FastJSONRenderer().render(self.data, 'application/json; indent=2')
+        self.assertEqual(rendered, JSONRenderer().render(self.data, 'application/json; indent=2'))
+
+    def test_parser_round_trips_the_renderer(self):
+        rendered = FastJSONRenderer().render(self.data)
+        self.assertEqual(FastJSONParser().parse(BytesIO(rendered)), json.loads(JSONRenderer().render(self.data)))
+
+    def test_parser_handles_other_encodings_and_rejects_invalid_json(self):
+        body = '{"title": "Café"}'.encode('latin-1')
+        self.assertEqual(FastJSONParser().parse(BytesIO(body), parser_context={'encoding': 'latin-1'}), {'title': 'Café'})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"title": '))
+
+@override_settings(COMPRESSION_MIN_LENGTH=200)
+class CompressionTests(SimpleTestCase):
+    """Content-Encoding negotiation and the size threshold (travel.middleware.CompressionMiddleware)."""
+
+    body = b'{"title": "Road trip"}' * 50
+
+    def respond(self, accept_encoding, body=None):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: HttpResponse(self.body if body is None else body))(request)
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(
+            parse_accept_encoding('gzip;q=0.5, BR, identity;q=bad, '),
+            {'gzip': 0.5, 'br': 1.0, 'identity': 0.0},
+        )
+
+    def test_gzips_when_accepted(self):
+        response = self.respond('gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_refused_codings_leave_the_body_alone(self):
+        for accept_encoding in ('', 'identity', 'gzip;q=0', '*;q=0'):
+            response = self.respond(accept_encoding)
+            self.assertFalse(response.has_header('Content-Encoding'), accept_encoding)
+            self.assertEqual(response.content, self.body)
+            self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_short_responses_are_not_compressed(self):
+        response = self.respond('gzip', body=self.body[:199])
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.body[:199])
+
+    def test_brotli_is_preferred_on_a_tie_and_loses_to_a_higher_q(self):
+        compression = CompressionMiddleware(lambda request: HttpResponse())
+        negotiate = lambda header: compression.negotiate(RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header))
+        with mock.patch.object(middleware, 'brotli', mock.Mock()):
+            self.assertEqual(negotiate('gzip, br'), 'br')
+            self.assertEqual(negotiate('*'), 'br')
+            self.assertEqual(negotiate('br;q=0.5, gzip'), 'gzip')
+        with mock.patch.object(middleware, 'brotli', None):
+            self.assertEqual(negotiate('br'), None)
+            self.assertEqual(negotiate('br, gzip;q=0.1'), 'gzip')
+
+class PerformanceMiddlewareTests(TestCase):
+    """Per-request telemetry: Server-Timing in DEBUG, a JSON log line otherwise (travel.middleware)."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('reader'))
+
+    @override_settings(DEBUG=True)
+    def test_debug_responses_carry_server_timing(self):
+        response = self.client.get('/api/Users/profile/')
+        self.assertEqual(response.status_code, 200)
+        phases = dict(item.strip().split(';', 1) for item in response['Server-Timing'].split(','))
+        self.assertEqual(set(phases), {'total', 'db', 'view', 'render'})
+        self.assertRegex(phases['db'], r'^dur=[\d.]+;desc="[1-9]\d* queries"$')
+
+    def test_other_responses_log_one_json_line(self):
+        with self.assertLogs('travel.performance', 'INFO') as logs:
+            response = self.client.get('/api/Users/profile/')
+        self.assertFalse(response.has_header('Server-Timing'))
+        [line] = logs.records
+        entry = json.loads(line.getMessage())
+        self.assertEqual((entry['view'], entry['status']), ('profile', 200))
+        self.assertGreater(entry['queries'], 0)
+        self.assertGreater(entry['view_ms'], 0)
+
+class MetricsTests(SimpleTestCase):
+    """Multi-process metrics files, their archive, and the /metrics endpoint (travel.metrics)."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(METRICS_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.registry = metrics.Registry()
+        self.requests = metrics.Counter(self.registry, 'requests_total', 'Requests.', ['view'])
+        self.latency = metrics.Histogram(self.registry, 'latency_seconds', 'Latency.', buckets=(0.1, 1))
+
+    def write_process_file(self, pid, snapshot):
+        path = os.path.join(self.directory, f'metrics-{pid}-0123abcd.json')
+        with open(path, 'w') as stream:
+            json.dump(snapshot, stream)
+        return path
+
+    def only_this_process_runs(self):
+        return mock.patch.object(metrics, '_is_running', lambda pid: pid == os.getpid())
+
+    def test_scrapes_sum_processes_and_archive_the_dead_ones(self):
+        self.requests.inc(2, view='feed')
+        self.latency.observe(0.05)
+        dead = self.write_process_file(999999, {
+            'requests_total': [[['feed'], 3], [['explore'], 1]],
+            'latency_seconds': [[[], [[0, 1], 0.5, 1]]],
+        })
+        expected = {
+            'requests_total': {('feed',): 5, ('explore',): 1},
+            'latency_seconds': {(): [[1, 1], 0.55, 2]},
+        }
+        with self.only_this_process_runs():
+            self.assertEqual(self.registry.collect(), expected)
+            self.assertFalse(os.path.exists(dead))
+            self.assertTrue(os.path.exists(os.path.join(self.directory, metrics.ARCHIVE_FILE)))
+            self.assertEqual(self.registry.collect(), expected)  # Archived counts are not counted twice
+
+            self.requests.inc(view='feed')  # Counters stay monotonic across the archive
+            self.assertEqual(self.registry.collect()['requests_total'][('feed',)], 6)
+
+    def test_render_writes_cumulative_buckets(self):
+        for value in (0.05, 0.5, 5):
+            self.latency.observe(value)
+        with self.only_this_process_runs():
+            text = self.registry.render()
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 2\n', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3\n', text)
+        self.assertIn('latency_seconds_count 3\n', text)
+
+    def test_windows_lock_falls_back_to_msvcrt(self):
+        fake_msvcrt = mock.Mock(LK_LOCK='lock', LK_UNLCK='unlock')
+        fake_msvcrt.locking.side_effect = [OSError('busy'), None, None]  # Waits out a held lock
+        with mock.patch.object(metrics, 'fcntl', None), mock.patch.object(metrics, 'msvcrt', fake_msvcrt, create=True):
+            with metrics._exclusive_lock(os.path.join(self.directory, metrics.LOCK_FILE)):
+                self.assertEqual(fake_msvcrt.locking.call_count, 2)
+        self.assertEqual([call.args[1:] for call in fake_msvcrt.locking.call_args_list], [('lock', 1)] * 2 + [('unlock', 1)])
+
+class MetricsEndpointTests(SimpleTestCase):
+    """Bearer-token check of the /metrics endpoint (travel.views.metrics)."""
+
+    def get(self, **headers):
+        return self.client.get('/metrics', **headers)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_disabled_without_a_token(self):
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer ').status_code, 404)
+
+    @override_settings(METRICS_TOKEN='scrape-secret', METRICS_DIR='')
+    def test_requires_the_bearer_token(self):
+        for headers in ({}, {'HTTP_AUTHORIZATION': 'Bearer wrong'}, {'HTTP_AUTHORIZATION': 'scrape-secret'}):
+            response = self.get(**headers)
+            self.assertEqual(response.status_code, 401, headers)
+            self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+        response = self.get(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'# TYPE http_requests_total counter', response.content)
@@ -0,0 +1,18 @@
+import hmac
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from travel.metrics import registry
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus text exposition of travel.metrics, for scrapers presenting
+    `Authorization: Bearer <METRICS_TOKEN>`. Disabled (404) while no token is set.
+    """
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    expected = f'Bearer {settings.METRICS_TOKEN}'
+    if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected.encode()):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')